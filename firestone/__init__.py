@@ -0,0 +1,12 @@
+"""
+Firestone builds OpenAPI and AsyncAPI specs, CLIs and UIs from resource schemas.
+
+The specs can also be built in process, as dicts, then optionally rendered to YAML.
+"""
+
+from firestone.spec.asyncapi import build as build_asyncapi
+from firestone.spec.asyncapi import render as render_asyncapi
+from firestone.spec.openapi import build as build_openapi
+from firestone.spec.openapi import render as render_openapi
+
+__all__ = ["build_asyncapi", "build_openapi", "render_asyncapi", "render_openapi"]
@@ -12,10 +12,28 @@ from firestone_lib import cli as firestone_cli
 from firestone_lib import resource as firestone_rsrc
 
 from firestone import spec as firestone_spec
+from firestone.spec import _base as spec_base
+from firestone.spec import openapi as spec_openapi
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def write_if_changed(filename: str, content: str) -> bool:
+    """Write a file, unless it already has this content, and return whether it was written.
+
+    Leaving unchanged files untouched keeps their mtime, and the caches keyed on it, valid.
+    """
+    if os.path.exists(filename):
+        with io.open(filename, "r", encoding="utf-8") as fh:
+            if fh.read() == content:
+                return False
+
+    with io.open(filename, "w", encoding="utf-8") as fh:
+        fh.write(content)
+
+    return True
+
+
 @click.group()
 @click.option("--debug", help="Turn on debugging", is_flag=True)
 def main(debug):
@@ -28,6 +46,16 @@ def main(debug):
 
 
 @main.group()
+@click.option(
+    "--compression",
+    help="Comma delimited list of content encodings the API compresses payloads with, e.g. gzip,br",
+    type=firestone_cli.CommaDelimitedList(item_type=click.Choice(spec_base.CONTENT_ENCODINGS)),
+)
+@click.option(
+    "--compress-requests-over",
+    help="Compress request bodies larger than this many bytes, requires --compression",
+    type=int,
+)
 @click.option(
     "--description",
     "-d",
@@ -59,15 +87,28 @@ def main(debug):
     required=True,
 )
 @click.pass_context
-def generate(ctx, description, resources, summary, title, version):
+# pylint: disable=too-many-arguments
+def generate(
+    ctx, compression, compress_requests_over, description, resources, summary, title, version
+):
     """Upper command for gathering common resource information for the generators."""
+    if compress_requests_over and not compression:
+        raise click.UsageError("You must supply --compression when using --compress-requests-over")
+
     ctx.obj = {
+        "compression": None,
         "data": [],
         "desc": description,
         "summary": summary,
         "title": title,
         "version": version,
     }
+    if compression:
+        ctx.obj["compression"] = {
+            "encodings": compression,
+            "request_min_size": compress_requests_over,
+        }
+
     for rsrc in resources:
         _LOGGER.debug(f"rsrc: {rsrc}")
         rsrc_data = firestone_rsrc.get_resource_schema(rsrc)
@@ -102,10 +143,29 @@ def generate(ctx, description, resources, summary, title, version):
     show_default=True,
     default=firestone_spec.openapi.DEFAULT_VERSION,
 )
+@click.option(
+    "--dedup-schemas",
+    help="Replace schemas inlined more than once with $refs to shared components",
+    is_flag=True,
+)
+@click.option(
+    "--split-dir",
+    help=(
+        f"Write a spec of each resource to this directory, with a root {spec_openapi.SPLIT_ROOT} "
+        "referencing their paths, leaving unchanged files untouched"
+    ),
+    type=click.Path(file_okay=False, dir_okay=True, writable=True),
+)
 @click.pass_obj
-def openapi(rsrc_data, output, ui_server, prefix, version):
+# pylint: disable=too-many-arguments
+def openapi(rsrc_data, output, ui_server, prefix, version, dedup_schemas, split_dir):
     """Generate an OpenAPI specification for the given resource data."""
+    if split_dir and ui_server:
+        raise click.UsageError(
+            "--ui-server needs a single spec, it cannot be used with --split-dir"
+        )
 
+    dedup_report = {}
     openapi_spec = firestone_spec.openapi.generate(
         rsrc_data["data"],
         rsrc_data["title"],
@@ -114,8 +174,30 @@ def openapi(rsrc_data, output, ui_server, prefix, version):
         rsrc_data["version"],
         prefix=prefix,
         openapi_version=version,
+        compression=rsrc_data["compression"],
+        dedup_schemas=dedup_schemas,
+        dedup_report=dedup_report,
+        split=bool(split_dir),
     )
-    print(openapi_spec, file=output)
+    if split_dir:
+        if not os.path.exists(split_dir):
+            os.makedirs(split_dir)
+        written = [
+            filename
+            for filename, doc in openapi_spec.items()
+            if write_if_changed(os.path.join(split_dir, filename), doc + "\n")
+        ]
+        click.echo(
+            f"Wrote {len(written)} of {len(openapi_spec)} documents to {split_dir}", err=True
+        )
+    else:
+        print(openapi_spec, file=output)
+    if dedup_schemas:
+        click.echo(
+            f"Replaced {dedup_report['refs']} inline schemas with $refs to "
+            f"{dedup_report['schemas']} new components, saving {dedup_report['bytes_saved']} bytes",
+            err=True,
+        )
 
     if ui_server:
         # pylint: disable=import-outside-toplevel,import-error,no-member
@@ -138,8 +220,14 @@ def openapi(rsrc_data, output, ui_server, prefix, version):
     type=click.File("w"),
     default="-",
 )
+@click.option(
+    "--version",
+    help="Set the AsyncAPI spec version, 3.x defines each message once in components.messages",
+    show_default=True,
+    default=firestone_spec.asyncapi.DEFAULT_VERSION,
+)
 @click.pass_obj
-def asyncapi(rsrc_data, output):
+def asyncapi(rsrc_data, output, version):
     """Generate an AsyncAPI specification for the given resource data."""
 
     asyncapi_spec = firestone_spec.asyncapi.generate(
@@ -148,6 +236,7 @@ def asyncapi(rsrc_data, output):
         rsrc_data["desc"],
         rsrc_data["summary"],
         rsrc_data["version"],
+        asyncapi_version=version,
     )
     print(asyncapi_spec, file=output)
 
@@ -196,14 +285,56 @@ def asyncapi(rsrc_data, output):
     default="python",
     show_default=True,
 )
+@click.option(
+    "--cargo-features",
+    help="Build each Rust resource module only with the cargo feature of the same name",
+    is_flag=True,
+)
+@click.option(
+    "--cache-ttl",
+    help="Cache the responses of read commands on disk for this many seconds",
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--cache-max-size",
+    help="The most megabytes of cached responses kept, requires --cache-ttl",
+    type=click.IntRange(min=1),
+)
 @click.pass_obj
-def cli(rsrc_data, pkg, client_pkg, output, output_dir, as_modules, template, language):
+# pylint: disable=too-many-arguments,too-many-locals
+def cli(
+    rsrc_data,
+    pkg,
+    client_pkg,
+    output,
+    output_dir,
+    as_modules,
+    template,
+    language,
+    *,
+    cargo_features,
+    cache_ttl,
+    cache_max_size,
+):
     """Generate CLI script (Python Click-based or Rust Clap-based).
 
     This generated script can be used as standalone or added to console scripts.
     """
     language_lower = language.lower()
 
+    if cargo_features and (language_lower != "rust" or not as_modules):
+        raise click.UsageError("--cargo-features needs both --language rust and --as-modules")
+
+    if cache_max_size and not cache_ttl:
+        raise click.UsageError("You must supply --cache-ttl when using --cache-max-size")
+
+    cache = None
+    if cache_ttl:
+        cache = {
+            "ttl": cache_ttl,
+            "max_size": (cache_max_size or firestone_spec.cli.DEFAULT_CACHE_MAX_SIZE) * 1024**2,
+        }
+
     if language_lower == "rust":
         cli_spec = firestone_spec.cli_rust.generate(
             pkg,
@@ -215,6 +346,9 @@ def cli(rsrc_data, pkg, client_pkg, output, output_dir, as_modules, template, la
             rsrc_data["version"],
             as_modules,
             template=template,
+            compression=rsrc_data["compression"],
+            cargo_features=cargo_features,
+            cache=cache,
         )
         file_extension = "rs"
     else:  # python (default)
@@ -228,6 +362,8 @@ def cli(rsrc_data, pkg, client_pkg, output, output_dir, as_modules, template, la
             rsrc_data["version"],
             as_modules,
             template=template,
+            compression=rsrc_data["compression"],
+            cache=cache,
         )
         file_extension = "py"
 
@@ -241,9 +377,9 @@ def cli(rsrc_data, pkg, client_pkg, output, output_dir, as_modules, template, la
         os.makedirs(output_dir)
 
     for rsrc in cli_spec:
-        with io.open(
-            os.path.join(output_dir, f"{rsrc}.{file_extension}"), "w", encoding="utf-8"
-        ) as fh:
+        # Modules are named after their resource, other files already have an extension
+        filename = rsrc if os.path.splitext(rsrc)[1] else f"{rsrc}.{file_extension}"
+        with io.open(os.path.join(output_dir, filename), "w", encoding="utf-8") as fh:
             fh.write(cli_spec[rsrc])
 
     return None
@@ -260,6 +396,13 @@ def cli(rsrc_data, pkg, client_pkg, output, output_dir, as_modules, template, la
     help="The default backend base URL for API",
     default="https://localhost",
 )
+@click.option(
+    "--cache-ttl",
+    help="The number of seconds generated pages cache fetched resources for",
+    type=click.IntRange(min=0),
+    default=firestone_spec.streamlit.DEFAULT_CACHE_TTL,
+    show_default=True,
+)
 @click.option(
     "--col-mappings",
     "-C",
@@ -287,7 +430,10 @@ def cli(rsrc_data, pkg, client_pkg, output, output_dir, as_modules, template, la
     type=str,
 )
 @click.pass_obj
-def streamlit(rsrc_data, backend_url, col_mappings, output, output_dir, as_modules, template):
+# pylint: disable=too-many-arguments
+def streamlit(
+    rsrc_data, backend_url, cache_ttl, col_mappings, output, output_dir, as_modules, template
+):
     """Generate python, Click-based CLI script.
 
     This generated script can be used as standalone or added to console scripts.
@@ -303,6 +449,8 @@ def streamlit(rsrc_data, backend_url, col_mappings, output, output_dir, as_modul
         as_modules=as_modules,
         template=template,
         col_mappings=col_mappings,
+        compression=rsrc_data["compression"],
+        cache_ttl=cache_ttl,
     )
 
     if not as_modules:
@@ -6,6 +6,13 @@ import jinja2
 import yaml
 
 DEFAULT_CONTENT_TYPE = "application/json"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+# The content encodings that can be negotiated for compressed payloads
+CONTENT_ENCODINGS = ["br", "gzip", "zstd"]
+
+# The query params used to page through a listing, rather than to filter it
+PAGE_PARAMS = ["limit", "offset"]
 
 JINJA_ENV = jinja2.Environment(
     loader=jinja2.PackageLoader("firestone", package_path="schema"),
@@ -0,0 +1,119 @@
+"""
+Document the headers and responses of the compression and rate limiting of an OpenAPI spec.
+"""
+
+import copy
+import http.client
+
+
+def add_compression(paths: dict, components: dict, compression: dict):
+    """Document the content encodings used to compress responses and request bodies.
+
+    :param dict paths: the paths
+    :param dict components: the components
+    :param dict compression: the supported encodings and minimum request body size to compress
+    """
+    encodings = compression.get("encodings", [])
+    if not encodings:
+        return paths
+
+    components.setdefault("headers", {})
+    components["headers"]["Content-Encoding"] = {
+        "description": "The encoding used to compress the response, as negotiated by Accept-Encoding",
+        "schema": {"type": "string", "enum": encodings},
+    }
+    components["headers"]["Vary"] = {
+        "description": "The response varies on the Accept-Encoding request header",
+        "schema": {"type": "string", "example": "Accept-Encoding"},
+    }
+
+    request_min_size = compression.get("request_min_size")
+    for path in paths:
+        for opr in paths[path].values():
+            for response in opr.get("responses", {}).values():
+                if "content" not in response:
+                    continue
+                response.setdefault("headers", {}).update(
+                    {
+                        "Content-Encoding": {"$ref": "#/components/headers/Content-Encoding"},
+                        "Vary": {"$ref": "#/components/headers/Vary"},
+                    }
+                )
+
+            if request_min_size and "requestBody" in opr:
+                opr["requestBody"]["x-content-encoding"] = {
+                    "encodings": encodings,
+                    "minSize": request_min_size,
+                }
+
+    return paths
+
+
+def add_rate_limit(paths: dict, components: dict, rate_limit: dict):
+    """Document the rate limit headers and the 429 and 503 responses of rate limited paths.
+
+    :param dict paths: the paths
+    :param dict components: the components
+    :param dict rate_limit: the number of requests allowed per window of seconds
+    """
+    components.setdefault("headers", {})
+    components["headers"].update(
+        {
+            "RateLimit-Limit": {
+                "description": "The number of requests allowed in the current window",
+                "schema": {"type": "integer"},
+            },
+            "RateLimit-Remaining": {
+                "description": "The number of requests remaining in the current window",
+                "schema": {"type": "integer"},
+            },
+            "RateLimit-Reset": {
+                "description": "The number of seconds until the current window resets",
+                "schema": {"type": "integer"},
+            },
+            "Retry-After": {
+                "description": "The number of seconds to wait before retrying the request",
+                "schema": {"type": "integer"},
+            },
+        }
+    )
+
+    retry_headers = {"Retry-After": {"$ref": "#/components/headers/Retry-After"}}
+    components.setdefault("responses", {})
+    components["responses"]["TooManyRequests"] = {
+        "description": "Too many requests, retry after the given number of seconds",
+        "headers": {
+            **retry_headers,
+            **{
+                name: {"$ref": f"#/components/headers/{name}"}
+                for name in ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset"]
+            },
+        },
+    }
+    components["responses"]["ServiceUnavailable"] = {
+        "description": "The service is overloaded, retry after the given number of seconds",
+        "headers": copy.deepcopy(retry_headers),
+    }
+
+    for path in paths:
+        for opr in paths[path].values():
+            responses = opr.setdefault("responses", {})
+            for response in responses.values():
+                response.setdefault("headers", {}).update(
+                    {
+                        name: {"$ref": f"#/components/headers/{name}"}
+                        for name in ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset"]
+                    }
+                )
+            responses[http.client.TOO_MANY_REQUESTS.value] = {
+                "$ref": "#/components/responses/TooManyRequests"
+            }
+            responses[http.client.SERVICE_UNAVAILABLE.value] = {
+                "$ref": "#/components/responses/ServiceUnavailable"
+            }
+            opr["x-rate-limit"] = {
+                "limit": rate_limit["limit"],
+                "window": rate_limit.get("window", 1),
+            }
+
+    return paths
@@ -0,0 +1,124 @@
+"""
+Intern the schemas inlined more than once in an OpenAPI spec into shared components.
+"""
+
+import collections
+import copy
+import hashlib
+import json
+import logging
+
+# Repeated inline schemas serialized to at least this many bytes are interned into components
+INTERN_MIN_SIZE = 128
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _schema_subtrees(schema: dict, hint: str):
+    """Get the (container, key, schema, hint) of the sub-schemas of a schema."""
+    for name, prop in schema.get("properties", {}).items():
+        if isinstance(prop, dict):
+            yield schema["properties"], name, prop, name
+    if isinstance(schema.get("items"), dict):
+        yield schema, "items", schema["items"], hint
+    for keyword in ["allOf", "anyOf", "oneOf"]:
+        for i, sub_schema in enumerate(schema.get(keyword, [])):
+            yield schema[keyword], i, sub_schema, hint
+
+
+def _path_schemas(paths: dict):
+    """Get the (container, key, schema, hint) of the request and response schemas."""
+    for path, path_item in paths.items():
+        # Name schemas after the last resource or attribute of the path
+        hint = next((part for part in reversed(path.split("/")) if not part.startswith("{")), "")
+        for op in path_item.values():
+            for media_type in op.get("requestBody", {}).get("content", {}).values():
+                yield media_type, "schema", media_type["schema"], hint
+            for resp in op.get("responses", {}).values():
+                for media_type in resp.get("content", {}).values():
+                    yield media_type, "schema", media_type["schema"], hint
+
+
+def _walk_schemas(paths: dict, comp_schemas: dict, visit):
+    """Walk the sub-schemas of the components, then the schemas of the paths, outermost first.
+
+    The visit returns the schema to descend into, if any.
+    """
+    roots = []
+    for name, schema in comp_schemas.items():
+        roots.extend(_schema_subtrees(schema, name))
+    roots.extend(_path_schemas(paths))
+
+    stack = list(reversed(roots))
+    while stack:
+        container, key, schema, hint = stack.pop()
+        if "$ref" in schema:
+            continue
+        schema = visit(container, key, schema, hint)
+        if schema:
+            stack.extend(reversed(list(_schema_subtrees(schema, hint))))
+
+
+def intern_schemas(paths: dict, components: dict, min_size: int = INTERN_MIN_SIZE):
+    """Hoist the schemas inlined more than once in the paths into components.
+
+    Schemas are identified by a hash of their content, so equal copies are shared whether or not
+    they are the same object. Each copy is replaced by a `$ref` to an existing component with the
+    same content, or else to a new one named after where the schema was first found.
+
+    :param dict paths: the paths, modified in place
+    :param dict components: the components, modified in place
+    :param int min_size: only hoist schemas at least this many bytes serialized as JSON
+    :returns: a report of the new components, the copies replaced and the JSON bytes saved
+    """
+    dumps = {}
+
+    def dump(schema: dict) -> str:
+        if id(schema) not in dumps:
+            dumps[id(schema)] = (schema, json.dumps(schema, sort_keys=True, default=str))
+        return dumps[id(schema)][1]
+
+    def digest(schema: dict) -> str:
+        return hashlib.sha256(dump(schema).encode("utf-8")).hexdigest()
+
+    comp_schemas = components.setdefault("schemas", {})
+    comp_names = {digest(schema): name for name, schema in comp_schemas.items()}
+
+    counts = collections.Counter()
+
+    def count(_container, _key, schema, _hint):
+        if len(dump(schema)) >= min_size:
+            counts[digest(schema)] += 1
+        return schema
+
+    _walk_schemas(paths, comp_schemas, count)
+
+    report = {"schemas": 0, "refs": 0, "bytes_saved": 0}
+
+    def replace(container, key, schema, hint):
+        size = len(dump(schema))
+        schema_digest = digest(schema)
+        if size < min_size or (counts[schema_digest] < 2 and schema_digest not in comp_names):
+            return schema
+
+        # Only descend into a new component, the copies of a schema being interned with it
+        new_comp = None
+        if schema_digest not in comp_names:
+            name = hint if hint not in comp_schemas else f"{hint}_{schema_digest[:8]}"
+            new_comp = comp_schemas[name] = copy.deepcopy(schema)
+            comp_names[schema_digest] = name
+            report["schemas"] += 1
+            report["bytes_saved"] -= size
+
+        container[key] = {"$ref": f"#/components/schemas/{comp_names[schema_digest]}"}
+        report["refs"] += 1
+        report["bytes_saved"] += size - len(json.dumps(container[key]))
+        return new_comp
+
+    _walk_schemas(paths, comp_schemas, replace)
+    _LOGGER.info(
+        f"Replaced {report['refs']} inline schemas with $refs to {report['schemas']} new "
+        f"components, saving {report['bytes_saved']} bytes"
+    )
+
+    return report
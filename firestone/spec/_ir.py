@@ -0,0 +1,268 @@
+"""
+The intermediate representation (IR) of resources, shared by the CLI and UI generators.
+
+Each resource is walked once into its operations, with their HTTP params and the resource
+attributes they send, which every generator then projects onto its own target.
+"""
+
+import functools
+import logging
+
+from firestone.spec import _base as spec_base
+from firestone.spec import openapi as spec_openapi
+
+# The instance operations run for many keys at once, when given more than one
+MULTI_KEY_OPS = ("get", "delete")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_op_name(method: str, top_level: bool) -> str:
+    """Get operation name from HTTP method."""
+    if method == "get" and top_level:
+        return "list"
+    if method == "get":
+        return "get"
+    if method == "post":
+        return "create"
+    if method in ["put", "patch"]:
+        return "update"
+    if method == "delete":
+        return method
+
+    return None
+
+
+# pylint: disable=too-few-public-methods
+class Param:
+    """A path or query param of an operation."""
+
+    __slots__ = ("name", "location", "description", "schema", "required", "default", "spec")
+
+    def __init__(self, spec: dict):
+        self.name = spec["name"]
+        self.location = spec.get("in", "query")
+        self.description = spec.get("description")
+        self.schema = spec.get("schema", {"type": "string"})
+        self.required = spec.get("required", False)
+        self.default = spec.get("default")
+        # The param as returned by spec_openapi.get_params
+        self.spec = spec
+
+
+# pylint: disable=too-few-public-methods
+class Attr:
+    """An attribute of the resource sent in the body of an operation."""
+
+    __slots__ = ("name", "prop", "required", "is_key", "spec")
+
+    def __init__(self, name: str, prop: dict, required: bool = False, is_key: bool = False):
+        self.name = name
+        self.prop = prop
+        self.required = required
+        self.is_key = is_key
+        # The attribute as a param, for the generators' params_to_attrs
+        self.spec = {"name": name, **prop}
+
+
+# pylint: disable=too-many-instance-attributes,too-many-arguments
+class Operation:
+    """An operation on a resource, at the resource or the instance level."""
+
+    __slots__ = (
+        "name",
+        "method",
+        "level",
+        "id",
+        "path",
+        "description",
+        "params",
+        "attrs",
+        # The derived views, computed once on first access, are cached in it
+        "__dict__",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        level: str,
+        path: str,
+        description: str,
+        params: tuple,
+        attrs: tuple = (),
+    ):
+        self.name = name
+        self.method = method
+        self.level = level
+        self.id = spec_base.get_opid(path, method)
+        self.path = path
+        self.description = description
+        self.params = params
+        self.attrs = attrs
+
+    @property
+    def is_delete(self) -> bool:
+        """Whether this operation deletes."""
+        return self.method == "delete"
+
+    @functools.cached_property
+    def param_specs(self) -> list:
+        """The params as returned by spec_openapi.get_params."""
+        return [param.spec for param in self.params]
+
+    @functools.cached_property
+    def query_params(self) -> tuple:
+        """The query params."""
+        return tuple(param for param in self.params if param.location == "query")
+
+    @functools.cached_property
+    def paginated(self) -> bool:
+        """Whether this is a listing paged through with the page params."""
+        names = [param.name for param in self.query_params]
+        return self.name == "list" and all(name in names for name in spec_base.PAGE_PARAMS)
+
+    @functools.cached_property
+    def multi_key(self) -> bool:
+        """Whether this instance operation can be run for many keys at once."""
+        return self.level == "instance" and self.name in MULTI_KEY_OPS
+
+    @functools.cached_property
+    def required(self) -> list:
+        """The names of the required attributes."""
+        return [attr.name for attr in self.attrs if attr.required]
+
+
+# pylint: disable=too-many-instance-attributes
+class Resource:
+    """A resource and its operations."""
+
+    __slots__ = (
+        "name",
+        "baseurl",
+        "schema",
+        "key",
+        "streaming",
+        "rate_limit",
+        "default_query_params",
+        "operations",
+        # The derived views, computed once on first access, are cached in it
+        "__dict__",
+    )
+
+    def __init__(self, rsrc: dict):
+        self.name = rsrc["kind"]
+        self.baseurl = "/"
+        if rsrc.get("versionInPath", False):
+            self.baseurl += f"v{rsrc['apiVersion']}/"
+        self.baseurl += self.name
+        _LOGGER.debug(f"baseurl: {self.baseurl}")
+
+        self.schema = rsrc["schema"]
+        if self.schema["type"] == "array" and "key" not in self.schema:
+            raise spec_base.SchemaMissingAttribute(
+                "A 'key' is missing in schema {yaml.dump(schema)}"
+            )
+        self.key = self.schema.get("key")
+        self.streaming = rsrc.get("streaming", False)
+        self.rate_limit = rsrc.get("rate_limit")
+        self.default_query_params = rsrc.get("default_query_params", [])
+
+        methods = rsrc.get("methods", {})
+        descs = rsrc.get("descriptions", {})
+        self.operations = self._get_operations(
+            "resource", self.baseurl, methods.get("resource"), descs.get("resource", {})
+        ) + self._get_operations(
+            "instance", self.instance_baseurl, methods.get("instance"), descs.get("instance", {})
+        )
+
+    @property
+    def keys(self) -> list:
+        """The keys of this resource, as a list for spec_openapi.get_params."""
+        return [self.key] if self.key else []
+
+    @functools.cached_property
+    def key_names(self) -> list:
+        """The names of the keys."""
+        return [key["name"] for key in self.keys]
+
+    @functools.cached_property
+    def instance_baseurl(self) -> str:
+        """The baseurl of an instance of this resource."""
+        return "/".join([self.baseurl, f"{{{self.key['name']}}}"])
+
+    @functools.cached_property
+    def resource_ops(self) -> tuple:
+        """The resource level operations."""
+        return tuple(op for op in self.operations if op.level == "resource")
+
+    @functools.cached_property
+    def instance_ops(self) -> tuple:
+        """The instance level operations."""
+        return tuple(op for op in self.operations if op.level == "instance")
+
+    def get_op(self, name: str, level: str = "resource") -> Operation:
+        """Get an operation by name, or None."""
+        ops = self.resource_ops if level == "resource" else self.instance_ops
+        return next((op for op in ops if op.name == name), None)
+
+    def _get_attrs(self, check_required: bool = None) -> tuple:
+        """Get the attributes of the resource, required as per the schema if check_required."""
+        items = self.schema.get("items", {})
+        required = items.get("required", []) if check_required else []
+        props = items.get("properties", {})
+        return tuple(
+            Attr(name, props[name], required=name in required, is_key=name in self.key_names)
+            for name in props
+        )
+
+    def _get_operations(self, level: str, baseurl: str, methods: list, descs: dict) -> tuple:
+        """Get the operations of this level, for the methods requested, else all of them."""
+        top_level = level == "resource"
+        all_methods = (
+            spec_openapi.RSRC_HTTP_METHODS if top_level else spec_openapi.RSRC_INST_HTTP_METHODS
+        )
+        ops = []
+        for method in all_methods:
+            if methods and method not in methods:
+                _LOGGER.info(
+                    f"Skipping the definition of {method} in {level} generation, "
+                    "as it is not in the defined methods requested"
+                )
+                continue
+
+            op_name = get_op_name(method, top_level)
+            if not op_name:
+                continue
+
+            params = spec_openapi.get_params(
+                baseurl, method, self.schema, keys=self.keys, is_list=top_level or None
+            )
+            if top_level:
+                params.extend(self.default_query_params)
+            _LOGGER.debug(f"params: {params}")
+
+            attrs = ()
+            if op_name == "create":
+                attrs = self._get_attrs(check_required=True)
+            elif op_name == "update":
+                attrs = self._get_attrs()
+
+            ops.append(
+                Operation(
+                    op_name,
+                    method,
+                    level,
+                    baseurl,
+                    descs.get(method, f"{op_name.capitalize()} operation for {self.name}"),
+                    tuple(Param(param) for param in params),
+                    attrs=attrs,
+                )
+            )
+
+        return tuple(ops)
+
+
+def get_resources(rsrc_data: list) -> list:
+    """Get the IR of each resource."""
+    return [Resource(rsrc) for rsrc in rsrc_data]
@@ -0,0 +1,128 @@
+"""
+Convert names from resource schemas into identifiers for the generated code.
+
+The conversions are memoized, the same names being converted for every attribute, enum value and
+operation across all resources.
+"""
+
+import functools
+import keyword
+
+# The Rust keywords, which are escaped as raw identifiers
+RUST_KEYWORDS = frozenset(
+    [
+        "abstract",
+        "as",
+        "async",
+        "await",
+        "become",
+        "box",
+        "break",
+        "const",
+        "continue",
+        "crate",
+        "do",
+        "dyn",
+        "else",
+        "enum",
+        "extern",
+        "false",
+        "final",
+        "fn",
+        "for",
+        "if",
+        "impl",
+        "in",
+        "let",
+        "loop",
+        "macro",
+        "match",
+        "mod",
+        "move",
+        "mut",
+        "override",
+        "priv",
+        "pub",
+        "ref",
+        "return",
+        "self",
+        "Self",
+        "static",
+        "struct",
+        "super",
+        "trait",
+        "true",
+        "try",
+        "type",
+        "typeof",
+        "unsafe",
+        "unsized",
+        "use",
+        "virtual",
+        "where",
+        "while",
+        "yield",
+    ]
+)
+
+# The Python keywords, which are suffixed with an underscore
+PYTHON_KEYWORDS = frozenset(keyword.kwlist)
+
+# The characters separating words in names
+_SEPARATORS = str.maketrans({"-": "_", " ": "_"})
+
+
+class NameCollision(Exception):
+    """Different names convert to the same identifier."""
+
+
+@functools.lru_cache(maxsize=None)
+def to_snake_case(name: str) -> str:
+    """Convert a name to a snake_case Rust identifier, e.g. "first-name" -> "first_name"."""
+    snake = name.translate(_SEPARATORS)
+    if snake in RUST_KEYWORDS:
+        return f"r#{snake}"
+    return snake
+
+
+@functools.lru_cache(maxsize=None)
+def to_pascal_case(name: str) -> str:
+    """Convert a name to PascalCase, e.g. "admin-roles" -> "AdminRoles"."""
+    return "".join(part.capitalize() for part in name.translate(_SEPARATORS).split("_"))
+
+
+@functools.lru_cache(maxsize=None)
+def to_upper_snake_case(name: str) -> str:
+    """Convert a name to UPPER_SNAKE_CASE, e.g. "read-write" -> "READ_WRITE"."""
+    return name.upper().translate(_SEPARATORS)
+
+
+@functools.lru_cache(maxsize=None)
+def to_python_name(name: str) -> str:
+    """Convert a name to a Python identifier, e.g. "first-name" -> "first_name"."""
+    py_name = name.replace("-", "_")
+    if py_name in PYTHON_KEYWORDS:
+        return f"{py_name}_"
+    return py_name
+
+
+def check_collisions(names, convert, where: str) -> dict:
+    """Check that the different names convert to different identifiers.
+
+    Returns the identifier for each name, or raises NameCollision naming the clashing names and
+    where they are, e.g. "the 'persons' list command".
+    """
+    idents = {}
+    by_ident = {}
+    for name in names:
+        if name in idents:
+            continue
+        ident = convert(name)
+        if ident in by_ident:
+            raise NameCollision(
+                f"'{by_ident[ident]}' and '{name}' both convert to '{ident}' in {where}"
+            )
+        idents[name] = ident
+        by_ident[ident] = name
+
+    return idents
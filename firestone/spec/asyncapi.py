@@ -1,5 +1,5 @@
 """
-Generate AsyncAPI 2.5 Spec
+Generate AsyncAPI 2.5 or 3.0 Spec
 """
 
 # TODO: fix dupe code
@@ -8,11 +8,25 @@ Generate AsyncAPI 2.5 Spec
 import enum
 import copy
 import logging
+import types
+import urllib.parse
 
 from firestone.spec import _base as spec_base
 
 _LOGGER = logging.getLogger(__name__)
 
+DEFAULT_VERSION = "2.5.0"
+
+# The header carrying the monotonically increasing version of snapshot and delta messages
+VERSION_HEADER = {
+    "description": "The version of the resource after this message is applied",
+    "type": "integer",
+}
+
+
+# The methods of the subscribe and publish bindings
+BINDING_METHODS = ("get", "post")
+
 
 class OperationType(enum.Enum):
     """The operation type for a channel."""
@@ -21,6 +35,13 @@ class OperationType(enum.Enum):
     PUBLISH = "publish"
 
 
+# The AsyncAPI 3.0 action of each operation type, from the point of view of the application
+V3_ACTIONS = {
+    "subscribe": "send",
+    "publish": "receive",
+}
+
+
 class SupportedBindingType(enum.Enum):
     """The supported binding type for an operation."""
 
@@ -84,51 +105,204 @@ def get_message(
     return message
 
 
-def get_binding(
-    meta: dict,
+def get_delta_message(
+    rsrc_name: str,
     schema: dict,
-    method: str,
+    content_type: str,
+    comp_name: str,
+    key: dict = None,
+    attr_name: str = None,
+    is_list: bool = None,
 ):
-    """Get a binding for the operation.
+    """Get a delta message, carrying only the changed fields, for the operation.
+
+    :param str rsrc_name: the resource name
+    :param dict schema: the schema for this resource name
+    :param str content_type: the content type for the messages
+    :param str comp_name: the component name the changed fields reference
+    :param dict key: the key of the resource, used to identify changed list items
+    :param str attr_name: the attribute name, when this is an instance attribute channel
+    :param bool is_list: this schema is for a list
+    """
+    comp_ref = f"#/components/schemas/{comp_name}"
+    if attr_name:
+        changes = {"$ref": f"{comp_ref}/properties/{attr_name}"}
+    else:
+        props = schema["items"].get("properties", {}) if "items" in schema else {}
+        changes = {
+            "type": "object",
+            "properties": {prop: {"$ref": f"{comp_ref}/properties/{prop}"} for prop in props},
+        }
+
+    payload = {"type": "object", "required": ["changes"], "properties": {}}
+    if is_list and key:
+        key_schema = copy.deepcopy(key.get("schema") or {"type": "string"})
+        changes["properties"][key["name"]] = key_schema
+        changes["required"] = [key["name"]]
+        payload["properties"]["changes"] = {"type": "array", "items": changes}
+        payload["properties"]["deleted"] = {
+            "description": f"The {key['name']} of each deleted {rsrc_name}",
+            "type": "array",
+            "items": copy.deepcopy(key_schema),
+        }
+    else:
+        payload["properties"]["changes"] = changes
+
+    return {
+        "name": f"{rsrc_name}_delta",
+        "contentType": content_type,
+        "headers": {
+            "type": "object",
+            "required": ["version", "base_version"],
+            "properties": {
+                "version": copy.deepcopy(VERSION_HEADER),
+                "base_version": {
+                    "description": "The version this delta applies to, resync when it is not the last one seen",
+                    "type": "integer",
+                },
+            },
+        },
+        "payload": payload,
+    }
+
+
+def get_resync_message(rsrc_name: str, content_type: str):
+    """Get the message a subscriber publishes to request a new snapshot after missing a delta.
+
+    :param str rsrc_name: the resource name
+    :param str content_type: the content type for the messages
+    """
+    return {
+        "name": f"{rsrc_name}_resync",
+        "contentType": content_type,
+        "payload": {
+            "type": "object",
+            "required": ["last_version"],
+            "properties": {
+                "last_version": {
+                    "description": "The last version applied by the subscriber",
+                    "type": "integer",
+                },
+            },
+        },
+    }
+
+
+def get_lookup_message(rsrc_name: str, content_type: str):
+    """Get the message requesting the resource at the channel address, replied to with a snapshot.
+
+    :param str rsrc_name: the resource name
+    :param str content_type: the content type for the messages
+    """
+    return {
+        "name": f"{rsrc_name}_lookup",
+        "contentType": content_type,
+        "payload": {
+            "description": f"A request for the {rsrc_name} at the channel address",
+            "type": "object",
+        },
+    }
+
+
+def get_query(query_params: list, method: str) -> dict:
+    """Get the query object of a binding, from the query params available to this method.
+
+    :param list query_params: the query params, some limited to the methods they list
+    :param str method: the method being used in this binding
+    """
+    query = {"type": "object", "required": [], "properties": {}}
+    for param in query_params:
+        _LOGGER.debug(f"param: {param}")
+        methods = param.get("methods", [])
+        if methods and method not in methods:
+            continue
+
+        param_name = param["name"]
+        if param.get("required", False) and param_name not in query["required"]:
+            query["required"].append(param_name)
+
+        query["properties"][param_name] = {
+            "description": param["description"],
+            **param.get("schema", {"type": "string"}),
+        }
+
+    return query
+
+
+def get_queries(meta: dict, schema: dict) -> types.MappingProxyType:
+    """Get the query object of each binding method, computed once per schema.
+
+    The resource and its default query params are left untouched, and the query objects are
+    shared by every channel of this schema.
 
     :param dict meta: the meta data in the resource
     :param dict schema: the schema for this resource name
-    :param str method: the method being used in this binging
     """
-    query_params = schema.get("query_params", [])
-    default_query_params = meta.get("default_query_params")
-    query_params.extend(default_query_params)
-
-    query = {}
-    if "query_params" in schema:
-        query = {"type": "object", "required": [], "properties": {}}
-        for param in query_params:
-            _LOGGER.debug(f"param: {param}")
-            methods = param.get("methods", [])
-            _LOGGER.debug(f"methods: {methods}")
-            if methods:
-                del param["methods"]
-            if methods and method not in methods:
-                continue
-
-            param_name = param["name"]
-            required = param.get("required", False)
-            if required and param_name not in query["required"]:
-                query["required"].append(param_name)
-
-            query["properties"][param_name] = {
-                "description": param["description"],
-            }
-            query["properties"][param_name].update(param.get("schema", {"type": "string"}))
+    if "query_params" not in schema:
+        return types.MappingProxyType({})
+
+    query_params = [*schema["query_params"], *(meta.get("default_query_params") or [])]
+    return types.MappingProxyType(
+        {method: get_query(query_params, method) for method in BINDING_METHODS}
+    )
+
+
+# pylint: disable=too-few-public-methods
+class ChannelContext:
+    """The meta data of a resource, and the query objects shared by the channels of a schema."""
+
+    __slots__ = ("meta", "_queries")
+
+    def __init__(self, meta: dict):
+        self.meta = meta
+        self._queries = {}
+
+    def get_queries(self, schema: dict) -> types.MappingProxyType:
+        """Get the query object of each binding method of a schema, computed once per schema."""
+        if id(schema) not in self._queries:
+            # Hold on to the schema, so its id is not reused while cached
+            self._queries[id(schema)] = (schema, get_queries(self.meta, schema))
+        return self._queries[id(schema)][1]
 
+
+def get_binding(
+    queries: types.MappingProxyType,
+    method: str,
+):
+    """Get a binding for the operation.
+
+    :param MappingProxyType queries: the query object of each method, from get_queries
+    :param str method: the method being used in this binging
+    """
     return {
         "method": method,
-        "query": query,
+        "query": queries.get(method, {}),
     }
 
 
+def get_channel_params(baseurl: str, keys: list = None) -> dict:
+    """Get the parameters of a channel, for the keys in its baseurl.
+
+    :param str baseurl: the baseurl to use for channels
+    :param list keys: the keys dict for the instance of this resource
+    """
+    params = {}
+    _LOGGER.debug(f"keys: {keys}")
+    for key in keys or []:
+        key_name = key["name"]
+        _LOGGER.debug(f"key_name: {key_name}: {baseurl}")
+        if key_name not in baseurl:
+            continue
+        params[key_name] = {
+            "description": key["description"],
+            "schema": key.get("schema") or {"type": "string"},
+        }
+
+    return params
+
+
 def get_channel(
-    meta: dict,
+    ctx: ChannelContext,
     baseurl: str,
     schema: dict,
     descs: dict,
@@ -139,7 +313,7 @@ def get_channel(
 ):
     """Get a channel for the given info.
 
-    :param dict meta: the meta data in the resource
+    :param ChannelContext ctx: the meta data in the resource, and its shared query objects
     :param str baseurl: the baseurl to use for channels
     :param dict schema: the schema for this resource name
     :param dict descs: the descriptions
@@ -153,23 +327,12 @@ def get_channel(
 
     # TODO: send what operation types, as a list
     if not rsrc_name:
-        rsrc_name = meta["name"]
+        rsrc_name = ctx.meta["name"]
 
     channel = {
         "description": f"Channel for {baseurl}",
-        "parameters": {},
+        "parameters": get_channel_params(baseurl, keys),
     }
-    _LOGGER.debug(f"keys: {keys}")
-    if keys:
-        for key in keys:
-            key_name = key["name"]
-            _LOGGER.debug(f"key_name: {key_name}: {baseurl}")
-            if key_name not in baseurl:
-                continue
-            channel["parameters"][key_name] = {
-                "description": key["description"],
-                "schema": key.get("schema") or {"type": "string"},
-            }
     _LOGGER.debug(f"channel: {channel}")
 
     # 1. Add subscribers, i.e. get
@@ -183,7 +346,25 @@ def get_channel(
         is_list=is_list,
     )
 
-    binding = get_binding(meta, schema, method)
+    deltas = ctx.meta.get("asyncapi", {}).get("deltas", False)
+    if deltas:
+        message["headers"] = {
+            "type": "object",
+            "required": ["version"],
+            "properties": {"version": copy.deepcopy(VERSION_HEADER)},
+        }
+        delta_message = get_delta_message(
+            rsrc_name,
+            schema,
+            spec_base.DEFAULT_CONTENT_TYPE,
+            rsrc_name,
+            key=keys[-1] if keys else None,
+            attr_name=attr_name,
+            is_list=is_list,
+        )
+        message = {"oneOf": [message, delta_message]}
+
+    binding = get_binding(ctx.get_queries(schema), method)
     _LOGGER.debug(f"binding: {binding}")
     channel[OperationType.SUBSCRIBE.value] = {
         "operationId": spec_base.get_opid(baseurl, OperationType.SUBSCRIBE.value),
@@ -204,7 +385,11 @@ def get_channel(
         comp_name=rsrc_name,
         attr_name=attr_name,
     )
-    binding = get_binding(meta, schema, method)
+    if deltas:
+        message = {
+            "oneOf": [message, get_resync_message(rsrc_name, spec_base.DEFAULT_CONTENT_TYPE)]
+        }
+    binding = get_binding(ctx.get_queries(schema), method)
     _LOGGER.debug(f"binding: {binding}")
 
     channel[OperationType.PUBLISH.value] = {
@@ -221,7 +406,7 @@ def get_channel(
 
 
 def add_resource_level(
-    meta: dict,
+    ctx: ChannelContext,
     baseurl: str,
     schema: dict,
     channels: dict,
@@ -230,7 +415,7 @@ def add_resource_level(
 ):
     """Add resource level channels.
 
-    :param dict meta: the meta data in the resource
+    :param ChannelContext ctx: the meta data in the resource, and its shared query objects
     :param str baseurl: the baseurl to use for channels
     :param dict schema: the schema for this resource name
     :param dict channels: the channels
@@ -249,14 +434,14 @@ def add_resource_level(
     rsrc_descs = schema.get("descriptions", {})
 
     channels[baseurl] = get_channel(
-        meta, baseurl, schema, rsrc_descs, keys=keys, rsrc_name=rsrc_name, is_list=True
+        ctx, baseurl, schema, rsrc_descs, keys=keys, rsrc_name=rsrc_name, is_list=True
     )
 
     return channels
 
 
 def add_instance_level(
-    meta: dict,
+    ctx: ChannelContext,
     baseurl: str,
     schema: dict,
     channels: dict,
@@ -265,7 +450,7 @@ def add_instance_level(
 ):
     """Add instance level channels.
 
-    :param dict meta: the meta data in the resource
+    :param ChannelContext ctx: the meta data in the resource, and its shared query objects
     :param str baseurl: the baseurl to use for channels
     :param dict schema: the schema for this resource name
     :param dict channels: the channels
@@ -285,14 +470,14 @@ def add_instance_level(
     rsrc_inst_descs = schema["items"].get("descriptions", {})
 
     channels[baseurl] = get_channel(
-        meta, baseurl, schema, rsrc_inst_descs, keys=keys, rsrc_name=rsrc_name
+        ctx, baseurl, schema, rsrc_inst_descs, keys=keys, rsrc_name=rsrc_name
     )
 
     return channels
 
 
 def add_instance_attrs_level(
-    meta: dict,
+    ctx: ChannelContext,
     baseurl: str,
     schema: dict,
     channels: dict,
@@ -302,7 +487,7 @@ def add_instance_attrs_level(
 ):
     """Add the instance attr level channels.
 
-    :param dict meta: the meta data in the resource
+    :param ChannelContext ctx: the meta data in the resource, and its shared query objects
     :param str baseurl: the baseurl to use for channels
     :param dict schema: the schema for this resource name
     :param dict channels: the channels
@@ -335,7 +520,7 @@ def add_instance_attrs_level(
             components["schemas"][prop] = prop_schema["schema"]["items"]
             _LOGGER.debug(f"components: {components}")
             get_channels(
-                meta,
+                ctx,
                 path,
                 prop_schema["schema"],
                 keys=keys,
@@ -345,7 +530,7 @@ def add_instance_attrs_level(
             )
         else:
             channels[path] = get_channel(
-                meta,
+                ctx,
                 path,
                 prop_schema,
                 rsrc_inst_descs,
@@ -356,7 +541,7 @@ def add_instance_attrs_level(
 
 
 def get_channels(
-    meta: dict,
+    ctx: ChannelContext,
     baseurl: str,
     schema: dict,
     keys: list = None,
@@ -369,7 +554,7 @@ def get_channels(
         channels = {}
     _LOGGER.debug(f"keys: {keys}")
 
-    asyncapi = meta.get("asyncapi", {})
+    asyncapi = ctx.meta.get("asyncapi", {})
 
     key = schema["key"]
     keys.append(key)
@@ -377,7 +562,7 @@ def get_channels(
     # 1. Add resource level channels
     if asyncapi.get("channels", {}).get("resources"):
         add_resource_level(
-            meta,
+            ctx,
             baseurl,
             schema,
             channels,
@@ -402,7 +587,7 @@ def get_channels(
     if asyncapi.get("channels", {}).get("instances"):
 
         add_instance_level(
-            meta,
+            ctx,
             instance_baseurl,
             schema,
             channels,
@@ -413,7 +598,7 @@ def get_channels(
     # 3. Add instance attribute level channels
     if asyncapi.get("channels", {}).get("instance_attrs"):
         add_instance_attrs_level(
-            meta,
+            ctx,
             instance_baseurl,
             schema,
             channels,
@@ -425,9 +610,237 @@ def get_channels(
     return channels
 
 
-# pylint: disable=too-many-locals
-def generate(rsrc_data: list, title: str, desc: str, summary: str, version: str):
-    """Generate an AsyncAPI spec based on the resource data sent and other meta data."""
+def get_channel_id(path: str) -> str:
+    """Get a unique AsyncAPI 3.0 channel id given the channel address."""
+    return path[1:].replace("/", "_").replace("{", "").replace("}", "")
+
+
+def get_message_id(message: dict) -> str:
+    """Get the id of a snapshot message in components.messages, after its payload."""
+    payload = message["payload"]
+    if payload.get("type") == "array":
+        return f"{message['name']}_list"
+    ref = payload.get("$ref", "")
+    if "/properties/" in ref:
+        return f"{message['name']}_{ref.rsplit('/', 1)[-1]}"
+    return message["name"]
+
+
+def add_component(comps: dict, comp_id: str, comp: dict) -> str:
+    """Add a component, unless the same one is already there, and return its id."""
+    unique_id = comp_id
+    count = 1
+    while unique_id in comps and comps[unique_id] != comp:
+        count += 1
+        unique_id = f"{comp_id}_{count}"
+    comps[unique_id] = comp
+
+    return unique_id
+
+
+def get_v3_parameter(param: dict) -> dict:
+    """Get an AsyncAPI 3.0 parameter, which has no schema, only its enum and default."""
+    v3_param = {"description": param["description"]}
+    for attr in ["enum", "default"]:
+        if attr in param.get("schema", {}):
+            v3_param[attr] = copy.deepcopy(param["schema"][attr])
+
+    return v3_param
+
+
+def get_v3_servers(servers: dict) -> dict:
+    """Get the AsyncAPI 3.0 servers, with a host and pathname in place of the url."""
+    v3_servers = {}
+    for name, server in servers.items():
+        v3_server = {attr: value for attr, value in server.items() if attr != "url"}
+        url = urllib.parse.urlsplit(server.get("url", ""))
+        if url.netloc:
+            v3_server["host"] = url.netloc
+            if url.path:
+                v3_server["pathname"] = url.path
+        else:
+            v3_server["host"] = server.get("url", "")
+        v3_servers[name] = v3_server
+
+    return v3_servers
+
+
+def get_v3_channel(path: str, channel: dict) -> dict:
+    """Get the AsyncAPI 3.0 channel of a 2.5 channel, before its messages are added."""
+    v3_channel = {"address": path, "description": channel["description"], "messages": {}}
+    if channel["parameters"]:
+        v3_channel["parameters"] = {
+            name: get_v3_parameter(param) for name, param in channel["parameters"].items()
+        }
+
+    return v3_channel
+
+
+def add_channel_message(
+    components: dict,
+    messages: dict,
+    v3_channel: dict,
+    chan_ref: dict,
+    msg_id: str,
+    message: dict,
+    headers_id: str = None,
+) -> dict:
+    """Add a message to the components and an AsyncAPI 3.0 channel, and get its reference.
+
+    :param dict components: the components, to add the headers of the message to
+    :param dict messages: the messages of the components, to add the message to
+    :param dict v3_channel: the 3.0 channel, referencing the message
+    :param dict chan_ref: the reference to the 3.0 channel
+    :param str msg_id: the id of the message in the components
+    :param dict message: the message
+    :param str headers_id: the id of the headers of the message in the component schemas
+    """
+    if "headers" in message:
+        headers_id = add_component(components["schemas"], headers_id, message["headers"])
+        message = {**message, "headers": {"$ref": f"#/components/schemas/{headers_id}"}}
+    msg_id = add_component(messages, msg_id, message)
+    v3_channel["messages"][msg_id] = {"$ref": f"#/components/messages/{msg_id}"}
+    return {"$ref": f"{chan_ref['$ref']}/messages/{msg_id}"}
+
+
+def get_v3_operation(
+    components: dict,
+    v3_channel: dict,
+    chan_ref: dict,
+    rsrc_name: str,
+    op_type: OperationType,
+    operation: dict,
+) -> dict:
+    """Get the AsyncAPI 3.0 operation of a 2.5 operation, adding its messages to the channel."""
+    snapshot, *others = operation["message"].get("oneOf", [operation["message"]])
+    msg_id = get_message_id(snapshot)
+    # A versioned snapshot differs from the message published
+    snapshot_id = f"{msg_id}_snapshot" if "headers" in snapshot else msg_id
+    msg_refs = [
+        add_channel_message(
+            components,
+            components["messages"],
+            v3_channel,
+            chan_ref,
+            snapshot_id,
+            snapshot,
+            headers_id="snapshot_headers",
+        )
+    ]
+    for message in others:
+        # The delta of the snapshot, or the resync request
+        is_delta = message["name"] == f"{snapshot['name']}_delta"
+        msg_refs.append(
+            add_channel_message(
+                components,
+                components["messages"],
+                v3_channel,
+                chan_ref,
+                f"{msg_id}_delta" if is_delta else message["name"],
+                message,
+                headers_id="delta_headers" if is_delta else None,
+            )
+        )
+
+    binding = operation["bindings"][SupportedBindingType.WS.value]
+    binding_id = add_component(
+        components["operationBindings"],
+        f"{rsrc_name}_{binding['method']}" if binding["query"] else binding["method"],
+        operation["bindings"],
+    )
+    return {
+        "action": V3_ACTIONS[op_type.value],
+        "channel": chan_ref,
+        "description": operation["description"],
+        "messages": msg_refs,
+        "bindings": {"$ref": f"#/components/operationBindings/{binding_id}"},
+        "tags": operation["tags"],
+    }
+
+
+def get_v3_operations(
+    components: dict, v3_channel: dict, chan_ref: dict, path: str, channel: dict
+) -> dict:
+    """Get the AsyncAPI 3.0 operations of a 2.5 channel, adding their messages to the channel.
+
+    Instance channels also get a lookup replied to with the snapshot.
+    """
+    rsrc_name = channel[OperationType.SUBSCRIBE.value]["tags"][0]["name"]
+    operations = {}
+    snapshot_ref = None
+    for op_type in [OperationType.SUBSCRIBE, OperationType.PUBLISH]:
+        operation = channel[op_type.value]
+        v3_operation = get_v3_operation(
+            components, v3_channel, chan_ref, rsrc_name, op_type, operation
+        )
+        operations[operation["operationId"]] = v3_operation
+
+        # An instance is subscribed to with a snapshot of the whole resource
+        snapshot = operation["message"].get("oneOf", [operation["message"]])[0]
+        ref = snapshot["payload"].get("$ref", "")
+        if op_type == OperationType.SUBSCRIBE and ref and "/properties/" not in ref:
+            snapshot_ref = v3_operation["messages"][0]
+
+    if snapshot_ref:
+        lookup = get_lookup_message(rsrc_name, spec_base.DEFAULT_CONTENT_TYPE)
+        lookup_ref = add_channel_message(
+            components, components["messages"], v3_channel, chan_ref, lookup["name"], lookup
+        )
+        operations[spec_base.get_opid(path, "lookup")] = {
+            "action": "receive",
+            "channel": chan_ref,
+            "description": f"Look up the {rsrc_name} at {path}",
+            "messages": [lookup_ref],
+            "reply": {"channel": chan_ref, "messages": [snapshot_ref]},
+            "tags": channel[OperationType.SUBSCRIBE.value]["tags"],
+        }
+
+    return operations
+
+
+def get_v3(channels: dict, components: dict):
+    """Get the AsyncAPI 3.0 channels and operations, given the 2.5 channels.
+
+    Each message, and the headers and bindings they share, is defined once in the components,
+    then referenced by the channels, which the operations reference in turn.
+
+    :param dict channels: the 2.5 channels
+    :param dict components: the components, to add the messages to
+    """
+    components.setdefault("messages", {})
+    components.setdefault("operationBindings", {})
+    v3_channels = {}
+    operations = {}
+    for path, channel in channels.items():
+        chan_id = get_channel_id(path)
+        v3_channels[chan_id] = get_v3_channel(path, channel)
+        operations.update(
+            get_v3_operations(
+                components, v3_channels[chan_id], {"$ref": f"#/channels/{chan_id}"}, path, channel
+            )
+        )
+
+    return v3_channels, operations
+
+
+# pylint: disable=too-many-locals,too-many-arguments
+def build(
+    rsrc_data: list,
+    title: str,
+    desc: str,
+    summary: str,
+    version: str,
+    asyncapi_version: str = None,
+) -> dict:
+    """Build an AsyncAPI spec based on the resource data sent and other meta data.
+
+    An asyncapi_version of 3.x builds an AsyncAPI 3.0 spec, defaulting to 2.5. The spec is
+    returned as a dict, to be used as is or rendered to YAML with render.
+    """
+    # The summary is not part of the AsyncAPI info
+    del summary
+    if not asyncapi_version:
+        asyncapi_version = DEFAULT_VERSION
     components = {"schemas": {}}
     all_channels = {}
     servers = {}
@@ -451,11 +864,13 @@ def generate(rsrc_data: list, title: str, desc: str, summary: str, version: str)
         if "schema" in meta:
             del meta["schema"]
 
+        # The resource and instance level channels share the query objects of their bindings
         channels = get_channels(
-            meta,
+            ChannelContext(meta),
             baseurl,
             rschema,
             keys=[],
+            rsrc_name=rsrc_name,
             channels={},
             components=components,
         )
@@ -464,13 +879,53 @@ def generate(rsrc_data: list, title: str, desc: str, summary: str, version: str)
         _LOGGER.debug(f"channels: {channels}")
         all_channels.update(channels)
 
+    operations = None
+    if asyncapi_version.startswith("3."):
+        all_channels, operations = get_v3(all_channels, components)
+        servers = get_v3_servers(servers)
+
+    doc = {
+        "asyncapi": asyncapi_version,
+        "defaultContentType": spec_base.DEFAULT_CONTENT_TYPE,
+        "info": {"title": title, "description": desc, "version": version},
+        "servers": servers,
+        "components": components,
+        "channels": all_channels,
+    }
+    if operations:
+        doc["operations"] = operations
+
+    return doc
+
+
+def render(doc: dict) -> str:
+    """Render an AsyncAPI spec, as built by build, to YAML."""
     tmpl = spec_base.JINJA_ENV.get_template("asyncapi.jinja2")
     return tmpl.render(
-        title=title,
-        summary=summary,
-        description=desc,
-        version=version,
-        servers=servers,
-        components=components,
-        channels=all_channels,
+        asyncapi_version=doc["asyncapi"],
+        title=doc["info"]["title"],
+        description=doc["info"]["description"],
+        version=doc["info"]["version"],
+        servers=doc["servers"],
+        components=doc["components"],
+        channels=doc["channels"],
+        operations=doc.get("operations"),
+    )
+
+
+# pylint: disable=too-many-arguments
+def generate(
+    rsrc_data: list,
+    title: str,
+    desc: str,
+    summary: str,
+    version: str,
+    asyncapi_version: str = None,
+):
+    """Generate an AsyncAPI spec based on the resource data sent and other meta data.
+
+    An asyncapi_version of 3.x generates an AsyncAPI 3.0 spec, defaulting to 2.5.
+    """
+    return render(
+        build(rsrc_data, title, desc, summary, version, asyncapi_version=asyncapi_version)
     )
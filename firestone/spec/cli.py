@@ -10,7 +10,8 @@ import os
 import jinja2
 
 from firestone.spec import _base as spec_base
-from firestone.spec import openapi as spec_openapi
+from firestone.spec import _ir as ir
+from firestone.spec import _names as names
 
 PARAM_TYPE_TO_ATTR_TYPE = {
     "string": "str",
@@ -18,22 +19,20 @@ PARAM_TYPE_TO_ATTR_TYPE = {
     "boolean": "bool",
 }
 
-_LOGGER = logging.getLogger(__name__)
+# The identifiers of the output options added to every command
+OUTPUT_OPTIONS = frozenset(["output", "output_fmt", "raw"])
+
+# The identifiers of the cache options added to read commands, with a response cache
+CACHE_OPTIONS = frozenset(["no_cache", "refresh"])
 
+# The identifiers of the options, and of the keys read with them, of the instance commands run
+# for many keys at once
+MULTI_KEY_OPTIONS = frozenset(["concurrency", "keys", "keys_from"])
 
-def _get_op_name(method: str, top_level: bool) -> str:
-    if method == "get" and top_level:
-        return "list"
-    if method == "get":
-        return "get"
-    if method == "post":
-        return "create"
-    if method in ["put", "patch"]:
-        return "update"
-    if method == "delete":
-        return method
+# The default most megabytes of responses kept in the cache
+DEFAULT_CACHE_MAX_SIZE = 64
 
-    return None
+_LOGGER = logging.getLogger(__name__)
 
 
 def params_to_attrs(params: list, required: list = None, key_names: list = None):
@@ -60,10 +59,10 @@ def params_to_attrs(params: list, required: list = None, key_names: list = None)
             _LOGGER.debug(f"cli_type: {cli_type}")
             _LOGGER.debug(f"items_type: {items_type}")
             if param_type == "array" and items_type != "object":
+                cli_type = "cli.IntList" if items_type == "integer" else "cli.StrList"
                 _LOGGER.info(
-                    f"{param['name']} has items of type '{items_type}', setting click option to cli.StrList"
+                    f"{param['name']} has items of type '{items_type}', setting click option to {cli_type}"
                 )
-                cli_type = "cli.StrList"
         elif "enum" in param_schema:
             _LOGGER.info(f"{param['name']} is of type '{param_type}', creating click.Choice()")
             enums = '","'.join(param_schema["enum"])
@@ -93,197 +92,33 @@ def params_to_attrs(params: list, required: list = None, key_names: list = None)
     return attrs
 
 
-def get_resource_attrs(
-    schema: dict, params: dict = None, check_required: bool = None, key_names: list = None
-):
-    """Get resource attributes."""
-    if not key_names:
-        key_names = []
-    _LOGGER.debug(f"key_names: {key_names}")
-    props = schema.get("items", {}).get("properties", {})
-    # Filter out key fields from schema properties to avoid duplicates with path parameters
-    tmp_attrs = [{"name": attr, **(props[attr])} for attr in props if attr not in key_names]
-    if params:
-        tmp_attrs.extend(params)
-    _LOGGER.debug(f"tmp_attrs: {tmp_attrs}")
-
-    required = schema["items"].get("required", []) if check_required else []
-    _LOGGER.debug(f"required: {required}")
-
-    attrs = params_to_attrs(tmp_attrs, required, key_names=key_names)
-    _LOGGER.debug(f"attrs: {attrs}")
-
-    return attrs
+def get_attrs(rsrc: ir.Resource, op: ir.Operation) -> list:
+    """Get the Click attributes of an operation."""
+    if op.name == "create":
+        return params_to_attrs([attr.spec for attr in op.attrs], op.required)
+    if op.name == "update":
+        # The keys are path params rather than attributes
+        specs = [attr.spec for attr in op.attrs if not attr.is_key] + op.param_specs
+        return params_to_attrs(specs, op.required, key_names=rsrc.key_names)
 
-
-def get_instance_ops(
-    rsrc_name: str,
-    schema: dict,
-    baseurl: str,
-    methods: list = None,
-    descs: list = None,
-    keys: list = None,
-):
-    """Add the instance methods to the paths.
-
-    :param str rsrc_name: the resource name
-    :param dict schema: the schema for this resource name
-    :param str baseurl: the baseurl to use for paths
-    :param list methods: optional set of methods to create for
-    :param list keys: the keys for the instance of this resource
-    :param dict paths: the paths
-    """
-    _LOGGER.debug(f"keys: {keys}")
-    ops = []
-    top_level = False
-    for method in spec_openapi.RSRC_INST_HTTP_METHODS:
-        if methods and method not in methods:
-            _LOGGER.info(
-                f"Skipping the definition of {method} in resource instance generation, "
-                "as it is not in the defined methods requested"
-            )
-            continue
-
-        op_name = _get_op_name(method, top_level)
-        if not op_name:
-            continue
-        _LOGGER.info(f"Getting CLI attributes for {op_name}")
-
-        op = {}
-        op["name"] = op_name
-        op["id"] = spec_base.get_opid(baseurl, method)
-        op["description"] = descs.get(method, f"{op_name.capitalize()} operation for {rsrc_name}")
-
-        params = spec_openapi.get_params(baseurl, method, schema, keys=keys)
-        _LOGGER.debug(f"params: {params}")
-
-        key_names = [key["name"] for key in keys]
-        _LOGGER.debug(f"key_names: {key_names}")
-        attrs = params_to_attrs(params, key_names=key_names)
-
-        if op_name == "update":
-            attrs = get_resource_attrs(schema, params=params, key_names=key_names)
-
-        _LOGGER.debug(f"attrs: {attrs}")
-
-        op["attrs"] = attrs
-
-        ops.append(op)
-
-    return ops
+    key_names = rsrc.key_names if op.level == "instance" else None
+    return params_to_attrs(op.param_specs, key_names=key_names)
 
 
-def get_resource_ops(
-    rsrc_name: str,
-    schema: dict,
-    baseurl: str,
-    methods: list = None,
-    descs: list = None,
-    keys: list = None,
-    default_query_params: dict = None,
-):
-    """Add resource level methods to the ops.
-
-    :param str rsrc_name: the resource name
-    :param dict schema: the schema for this resource name
-    :param str baseurl: the baseurl to use for ops
-    :param list methods: optional set of methods to create for
-    :param list keys: the keys for the instance of this resource
-    :param dict default_query_params: the ops
-    """
-    _LOGGER.debug(f"keys: {keys}")
-    ops = []
-
-    top_level = True
-    for method in spec_openapi.RSRC_HTTP_METHODS:
-        if methods and method not in methods:
-            _LOGGER.info(
-                f"Skipping the definition of {method} in resource generation, "
-                "as it is not in the defined methods requested"
-            )
-            continue
-
-        op_name = _get_op_name(method, top_level)
-        if not op_name:
-            continue
-
-        op = {}
-        op["name"] = op_name
-        op["id"] = spec_base.get_opid(baseurl, method)
-        op["description"] = descs.get(method, f"{op_name.capitalize()} operation for {rsrc_name}")
-
-        # Add params and attributes
-        params = spec_openapi.get_params(baseurl, method, schema, keys=keys)
-        if default_query_params:
-            params.extend(default_query_params)
-        _LOGGER.debug(f"params: {params}")
-
-        attrs = params_to_attrs(params)
-
-        if op_name == "create":
-            check_required = True
-            attrs = get_resource_attrs(schema, check_required=check_required)
-        _LOGGER.debug(f"attrs: {attrs}")
-
-        op["attrs"] = attrs
-
-        ops.append(op)
-
-    return ops
-
-
-def get_ops(
-    rsrc: dict,
-    baseurl: str,
-    ops: dict = None,
-    keys: list = None,
-    default_query_params: dict = None,
-):
+def get_ops(rsrc: ir.Resource) -> dict:
     """Get the operations for this resource."""
-    rsrc_name = rsrc["kind"]
-    schema = rsrc["schema"]
-    methods = rsrc.get("methods", {})
-    descs = rsrc.get("descriptions", {})
-
-    if not ops:
-        ops = {}
-
-    if schema["type"] == "array" and not "key" in schema:
-        raise spec_base.SchemaMissingAttribute("A 'key' is missing in schema {yaml.dump(schema)}")
-
-    key = None
-    if "key" in schema:
-        key = schema["key"]
-        has_param = next((item for item in keys if item["name"] == key["name"]), None)
-        _LOGGER.debug(f"has_param: {has_param}")
-        if not has_param:
-            keys.append(key)
-
-    _LOGGER.debug(f"keys: {keys}")
-
-    # 1. Add operations to high-level baseurl
-    ops["resource"] = get_resource_ops(
-        rsrc_name,
-        schema,
-        baseurl,
-        methods=methods.get("resource", {}),
-        descs=descs.get("resource", {}),
-        keys=keys,
-        default_query_params=default_query_params,
-    )
-
-    instance_baseurl = "/".join([baseurl, f"{{{key['name']}}}"])
-    _LOGGER.debug(f"instance_baseurl: {instance_baseurl}")
-
-    # 2. Get instance operations
-    ops["instance"] = get_instance_ops(
-        rsrc_name,
-        schema,
-        instance_baseurl,
-        methods=methods.get("instance", {}),
-        descs=descs.get("instance", {}),
-        keys=keys,
-    )
+    ops = {"resource": [], "instance": []}
+    for op in rsrc.operations:
+        _LOGGER.info(f"Getting CLI attributes for {op.name}")
+        ops[op.level].append(
+            {
+                "name": op.name,
+                "id": op.id,
+                "description": op.description,
+                "multi_key": op.multi_key,
+                "attrs": get_attrs(rsrc, op),
+            }
+        )
 
     return ops
 
@@ -299,32 +134,48 @@ def generate(
     version: str,
     as_modules: bool = False,
     template: str = None,
+    *,
+    compression: dict = None,
+    cache: dict = None,
 ):
-    """Generate a Click based CLI script based on the resource data sent and other meta data."""
+    """Generate a Click based CLI script based on the resource data sent and other meta data.
+
+    With `cache`, of a `ttl` in seconds and a `max_size` in bytes, the read commands cache their
+    responses on disk and the commands mutating a resource invalidate its cached responses.
+    """
+    names.check_collisions([rsrc["kind"] for rsrc in rsrc_data], names.to_python_name, "resources")
+
     rsrcs = []
-    for rsrc in rsrc_data:
-        rsrc_name = rsrc["kind"]
-        baseurl = "/"
-        if rsrc.get("versionInPath", False):
-            baseurl += f"v{rsrc['apiVersion']}/"
-        baseurl += rsrc_name
-        _LOGGER.debug(f"baseurl: {baseurl}")
-
-        default_query_params = rsrc.get("default_query_params", [])
-        _LOGGER.debug(f"default_query_params: {default_query_params}")
-
-        ops = get_ops(
-            rsrc,
-            baseurl,
-            ops={},
-            keys=[],
-            default_query_params=default_query_params,
-        )
+    for rsrc in ir.get_resources(rsrc_data):
+        ops = get_ops(rsrc)
         _LOGGER.debug(f"ops: {ops}")
+        for op in ops["resource"] + ops["instance"]:
+            where = f"the '{rsrc.name}' {op['name']} command"
+            idents = names.check_collisions(
+                [attr["name"] for attr in op["attrs"]], names.to_python_name, where
+            )
+            cached = cache and (
+                op["name"] == "get" or (op["name"] == "list" and not rsrc.streaming)
+            )
+            for name, ident in idents.items():
+                if ident in OUTPUT_OPTIONS:
+                    raise names.NameCollision(
+                        f"'{name}' clashes with the --raw/--output options of {where}"
+                    )
+                if cached and ident in CACHE_OPTIONS:
+                    raise names.NameCollision(
+                        f"'{name}' clashes with the --no-cache/--refresh options of {where}"
+                    )
+                if op["multi_key"] and ident in MULTI_KEY_OPTIONS:
+                    raise names.NameCollision(
+                        f"'{name}' clashes with the --keys-from/--concurrency options of {where}"
+                    )
         rsrcs.append(
             {
-                "name": rsrc_name,
+                "name": rsrc.name,
                 "operations": ops,
+                "streaming": rsrc.streaming,
+                "rate_limit": rsrc.rate_limit,
             }
         )
 
@@ -353,6 +204,8 @@ def generate(
             pkg=pkg,
             client_pkg=client_pkg,
             rsrcs=rsrcs,
+            compression=compression,
+            cache=cache,
         )
 
     rendered_rsrcs = {}
@@ -367,6 +220,8 @@ def generate(
             pkg=pkg,
             client_pkg=client_pkg,
             rsrc=rsrc,
+            compression=compression,
+            cache=cache,
         )
         rendered_rsrcs[rsrc["name"]] = rendered
 
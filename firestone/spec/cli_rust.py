@@ -10,7 +10,8 @@ import os
 import jinja2
 
 from firestone.spec import _base as spec_base
-from firestone.spec import openapi as spec_openapi
+from firestone.spec import _ir as ir
+from firestone.spec import _names as names
 
 # Map OpenAPI types to Rust types
 PARAM_TYPE_TO_RUST_TYPE = {
@@ -19,75 +20,22 @@ PARAM_TYPE_TO_RUST_TYPE = {
     "boolean": "bool",
 }
 
-_LOGGER = logging.getLogger(__name__)
+# The files gating each resource module behind a cargo feature, by name, and their template
+CARGO_FEATURES_TEMPLATES = {
+    "mod": "cli_mod.rs.jinja2",
+    "features.toml": "cli_features.toml.jinja2",
+}
 
+# The fields of the cache flags added to read commands, with a response cache
+CACHE_ARGS = frozenset(["no_cache", "refresh"])
 
-def _get_op_name(method: str, top_level: bool) -> str:
-    """Get operation name from HTTP method."""
-    if method == "get" and top_level:
-        return "list"
-    if method == "get":
-        return "get"
-    if method == "post":
-        return "create"
-    if method in ["put", "patch"]:
-        return "update"
-    if method == "delete":
-        return method
-
-    return None
-
-
-def _to_snake_case(name: str) -> str:
-    """Convert a name to snake_case."""
-    snake = name.replace("-", "_").replace(" ", "_")
-    # Escape Rust keywords
-    rust_keywords = {
-        "type",
-        "match",
-        "self",
-        "Self",
-        "super",
-        "trait",
-        "impl",
-        "fn",
-        "const",
-        "static",
-        "let",
-        "mut",
-        "ref",
-        "move",
-        "as",
-        "use",
-        "pub",
-        "mod",
-        "crate",
-        "extern",
-        "where",
-        "unsafe",
-        "async",
-        "await",
-    }
-    if snake in rust_keywords:
-        return f"r#{snake}"
-    return snake
-
-
-def _to_pascal_case(name: str) -> str:
-    """Convert a name to PascalCase."""
-    parts = name.replace("-", "_").replace(" ", "_").split("_")
-    return "".join(part.capitalize() for part in parts)
-
-
-def _enum_value_to_variant(enum_value: str) -> str:
-    """Convert an enum value to a Rust enum variant name.
-
-    Examples:
-        "work" -> "Work"
-        "admin-roles" -> "AdminRoles"
-        "read-write" -> "ReadWrite"
-    """
-    return _to_pascal_case(enum_value)
+# The fields of the flags added to the instance commands run for many keys at once
+MULTI_KEY_ARGS = frozenset(["concurrency", "keys_from"])
+
+# The fields of the flags added to the list commands paging through all of the results
+PAGE_ARGS = frozenset(["output"])
+
+_LOGGER = logging.getLogger(__name__)
 
 
 # pylint: disable=too-many-locals,too-many-branches,too-many-statements,too-many-nested-blocks
@@ -134,7 +82,7 @@ def _enrich_attr_for_body(
         enum_variants = attr.get("enum_variants", [])
         # The model enum type for arrays - OpenAPI generator uses the property name in PascalCase
         # For example, "categories" becomes "Categories" not "CategoriesItem"
-        enum_item_type = f"crate::models::{op_name}_{comp_name}::{_to_pascal_case(attr_name)}"
+        enum_item_type = f"crate::models::{op_name}_{comp_name}::{names.to_pascal_case(attr_name)}"
         attr["enum_item_type"] = enum_item_type
 
         # Generate variant mappings for the array items
@@ -142,7 +90,7 @@ def _enrich_attr_for_body(
         for variant in enum_variants:
             variant_name = variant["name"]
             variant_value = variant["value"]
-            model_variant = _enum_value_to_variant(variant_value)
+            model_variant = names.to_pascal_case(variant_value)
             variant_mappings.append(
                 {
                     "cli_variant": variant_name,
@@ -154,7 +102,7 @@ def _enrich_attr_for_body(
     elif is_enum:
         # Enum conversion - generate match statement
         enum_variants = attr.get("enum_variants", [])
-        enum_model_type = f"crate::models::{op_name}_{comp_name}::{_to_pascal_case(attr_name)}"
+        enum_model_type = f"crate::models::{op_name}_{comp_name}::{names.to_pascal_case(attr_name)}"
         attr["enum_model_type"] = enum_model_type
 
         # Generate variant mappings
@@ -163,7 +111,7 @@ def _enrich_attr_for_body(
             variant_name = variant["name"]
             variant_value = variant["value"]
             # Convert enum value to PascalCase for model enum (e.g., "admin-ro" -> "AdminRo")
-            model_variant = _enum_value_to_variant(variant_value)
+            model_variant = names.to_pascal_case(variant_value)
             variant_mappings.append(
                 {
                     "cli_variant": variant_name,
@@ -231,7 +179,7 @@ def _enrich_attr_for_body(
                 ref_name = ref_parts[-1].replace(".yaml", "").replace(".json", "")
             else:
                 ref_name = attr_name
-            model_type = f"crate::models::{_to_pascal_case(ref_name)}"
+            model_type = f"crate::models::{names.to_pascal_case(ref_name)}"
             body_conversion = f"args.{rust_name}.as_ref().and_then(|s| serde_json::from_str::<{model_type}>(s).ok()).map(|p| Box::new(p))"
         elif param_schema.get("expose") is False or attr_name in key_names:
             # Fields with expose: false or key fields need Option<Option<Value>>
@@ -318,7 +266,7 @@ def params_to_attrs(params: list, required: list = None, key_names: list = None)
                 # Store enum info for body conversion
                 enum_variants = []
                 for enum_val in items_schema["enum"]:
-                    variant = enum_val.upper().replace("-", "_").replace(" ", "_")
+                    variant = names.to_upper_snake_case(enum_val)
                     enum_variants.append(
                         {
                             "name": variant,
@@ -332,11 +280,11 @@ def params_to_attrs(params: list, required: list = None, key_names: list = None)
                 rust_type = "Vec<String>"
         elif "enum" in param_schema:
             _LOGGER.info(f"{param['name']} is of type '{param_type}', creating enum")
-            rust_type = f"{_to_pascal_case(param['name'])}Enum"
+            rust_type = f"{names.to_pascal_case(param['name'])}Enum"
             # Pre-process enum values to Rust enum variant names
             enum_variants = []
             for enum_val in param_schema["enum"]:
-                variant = enum_val.upper().replace("-", "_").replace(" ", "_")
+                variant = names.to_upper_snake_case(enum_val)
                 enum_variants.append(
                     {
                         "name": variant,
@@ -355,7 +303,7 @@ def params_to_attrs(params: list, required: list = None, key_names: list = None)
         _LOGGER.debug(f"key_names: {key_names}")
 
         # Convert to snake_case for Rust
-        rust_name = _to_snake_case(param_name)
+        rust_name = names.to_snake_case(param_name)
 
         # Check if this is an array of enums
         is_enum_array = param_type == "array" and "enum" in param_schema.get("items", {})
@@ -390,264 +338,111 @@ def params_to_attrs(params: list, required: list = None, key_names: list = None)
     return attrs
 
 
-def get_resource_attrs(
-    schema: dict, params: dict = None, check_required: bool = None, key_names: list = None
-):
-    """Get resource attributes."""
-    _LOGGER.debug(f"key_names: {key_names}")
-    props = schema.get("items", {}).get("properties", {})
-    # Preserve original schema info for each property
-    tmp_attrs = []
-    for attr_name in props:
-        prop_data = props[attr_name]
-        attr_data = {"name": attr_name}
-        # Copy all properties
-        attr_data.update(prop_data)
-        # Preserve original schema structure before resolution
-        # Check if schema has $ref (before jsonref resolution)
-        if "schema" in prop_data:
-            schema_val = prop_data["schema"]
-            # Preserve the original schema dict (may contain $ref)
-            if isinstance(schema_val, dict):
-                attr_data["original_schema"] = schema_val
-            elif hasattr(schema_val, "__dict__"):
-                # Try to get dict representation
-                attr_data["original_schema"] = (
-                    dict(schema_val)
-                    if hasattr(schema_val, "__iter__") and not isinstance(schema_val, str)
-                    else {}
-                )
-            # Also keep resolved schema for type detection
-            attr_data["schema"] = schema_val
-        elif "$ref" in prop_data:
-            # $ref at top level
-            attr_data["original_schema"] = {"$ref": prop_data["$ref"]}
-            attr_data["schema"] = prop_data
-        elif prop_data.get("type"):
-            # Type info at top level
-            attr_data["original_schema"] = prop_data
-            attr_data["schema"] = prop_data
-        tmp_attrs.append(attr_data)
-
-    if params:
-        tmp_attrs.extend(params)
-    _LOGGER.debug(f"tmp_attrs: {tmp_attrs}")
-
-    required = schema["items"].get("required", []) if check_required else []
-    _LOGGER.debug(f"required: {required}")
-
-    attrs = params_to_attrs(tmp_attrs, required, key_names=key_names)
-    _LOGGER.debug(f"attrs: {attrs}")
-
-    return attrs
-
-
-# pylint: disable=too-many-locals
-def get_instance_ops(
-    rsrc_name: str,
-    schema: dict,
-    baseurl: str,
-    methods: list = None,
-    descs: list = None,
-    keys: list = None,
-):
-    """Add the instance methods to the paths.
-
-    :param str rsrc_name: the resource name
-    :param dict schema: the schema for this resource name
-    :param str baseurl: the baseurl to use for paths
-    :param list methods: optional set of methods to create for
-    :param list keys: the keys for the instance of this resource
-    :param dict paths: the paths
-    """
-    _LOGGER.debug(f"keys: {keys}")
-    ops = []
-    top_level = False
-    for method in spec_openapi.RSRC_INST_HTTP_METHODS:
-        if methods and method not in methods:
-            _LOGGER.info(
-                f"Skipping the definition of {method} in resource instance generation, "
-                "as it is not in the defined methods requested"
-            )
-            continue
-
-        op_name = _get_op_name(method, top_level)
-        if not op_name:
-            continue
-        _LOGGER.info(f"Getting CLI attributes for {op_name}")
-
-        op = {}
-        op["name"] = op_name
-        op["id"] = spec_base.get_opid(baseurl, method)
-        op["description"] = descs.get(method, f"{op_name.capitalize()} operation for {rsrc_name}")
-        op["is_delete"] = method == "delete"
-
-        params = spec_openapi.get_params(baseurl, method, schema, keys=keys)
-        _LOGGER.debug(f"params: {params}")
-
-        key_names = [key["name"] for key in keys]
-        _LOGGER.debug(f"key_names: {key_names}")
-        attrs = params_to_attrs(params, key_names=key_names)
-
-        if op_name == "update":
-            attrs = get_resource_attrs(schema, params=params, key_names=key_names)
-
-        # Deduplicate attributes by name
-        seen_names = {}
-        deduplicated_attrs = []
-        for attr in attrs:
-            attr_name = attr["name"]
-            if attr_name not in seen_names:
-                seen_names[attr_name] = True
-                deduplicated_attrs.append(attr)
-            elif not attr.get("argument"):
-                # If duplicate and not an argument, prefer the non-argument one
-                # Replace the existing one
-                for i, existing_attr in enumerate(deduplicated_attrs):
-                    if existing_attr["name"] == attr_name:
-                        deduplicated_attrs[i] = attr
-                        break
-
-        _LOGGER.debug(f"attrs: {deduplicated_attrs}")
-
-        op["attrs"] = deduplicated_attrs
-
-        ops.append(op)
-
-    return ops
-
-
-# pylint: disable=too-many-locals
-def get_resource_ops(
-    rsrc_name: str,
-    schema: dict,
-    baseurl: str,
-    methods: list = None,
-    descs: list = None,
-    keys: list = None,
-    default_query_params: dict = None,
-):
-    """Add resource level methods to the ops.
-
-    :param str rsrc_name: the resource name
-    :param dict schema: the schema for this resource name
-    :param str baseurl: the baseurl to use for ops
-    :param list methods: optional set of methods to create for
-    :param list keys: the keys for the instance of this resource
-    :param dict default_query_params: the ops
-    """
-    _LOGGER.debug(f"keys: {keys}")
-    ops = []
-
-    top_level = True
-    for method in spec_openapi.RSRC_HTTP_METHODS:
-        if methods and method not in methods:
-            _LOGGER.info(
-                f"Skipping the definition of {method} in resource generation, "
-                "as it is not in the defined methods requested"
+def _attr_to_param(attr: ir.Attr) -> dict:
+    """Convert a resource attribute to a param, preserving its original schema."""
+    prop_data = attr.prop
+    attr_data = dict(attr.spec)
+    # Preserve original schema structure before resolution
+    # Check if schema has $ref (before jsonref resolution)
+    if "schema" in prop_data:
+        schema_val = prop_data["schema"]
+        # Preserve the original schema dict (may contain $ref)
+        if isinstance(schema_val, dict):
+            attr_data["original_schema"] = schema_val
+        elif hasattr(schema_val, "__dict__"):
+            # Try to get dict representation
+            attr_data["original_schema"] = (
+                dict(schema_val)
+                if hasattr(schema_val, "__iter__") and not isinstance(schema_val, str)
+                else {}
             )
-            continue
-
-        op_name = _get_op_name(method, top_level)
-        if not op_name:
-            continue
-
-        op = {}
-        op["name"] = op_name
-        op["id"] = spec_base.get_opid(baseurl, method)
-        op["description"] = descs.get(method, f"{op_name.capitalize()} operation for {rsrc_name}")
-        op["is_delete"] = method == "delete"
-
-        # Add params and attributes
-        params = spec_openapi.get_params(baseurl, method, schema, keys=keys)
-        if default_query_params:
-            params.extend(default_query_params)
-        _LOGGER.debug(f"params: {params}")
-
-        attrs = params_to_attrs(params)
-
-        if op_name == "create":
-            check_required = True
-            attrs = get_resource_attrs(schema, check_required=check_required)
-
-        # Deduplicate attributes by name
-        seen_names = {}
-        deduplicated_attrs = []
-        for attr in attrs:
-            attr_name = attr["name"]
-            if attr_name not in seen_names:
-                seen_names[attr_name] = True
-                deduplicated_attrs.append(attr)
-            elif not attr.get("argument"):
-                # If duplicate and not an argument, prefer the non-argument one
-                for i, existing_attr in enumerate(deduplicated_attrs):
-                    if existing_attr["name"] == attr_name:
-                        deduplicated_attrs[i] = attr
-                        break
-
-        _LOGGER.debug(f"attrs: {deduplicated_attrs}")
-
-        op["attrs"] = deduplicated_attrs
-
-        ops.append(op)
+        # Also keep resolved schema for type detection
+        attr_data["schema"] = schema_val
+    elif "$ref" in prop_data:
+        # $ref at top level
+        attr_data["original_schema"] = {"$ref": prop_data["$ref"]}
+        attr_data["schema"] = prop_data
+    elif prop_data.get("type"):
+        # Type info at top level
+        attr_data["original_schema"] = prop_data
+        attr_data["schema"] = prop_data
+
+    return attr_data
+
+
+def get_attrs(rsrc: ir.Resource, op: ir.Operation) -> list:
+    """Get the Clap attributes of an operation, deduplicated by name."""
+    key_names = rsrc.key_names if op.level == "instance" else None
+    if op.name == "create":
+        attrs = params_to_attrs([_attr_to_param(attr) for attr in op.attrs], op.required)
+    elif op.name == "update":
+        specs = [_attr_to_param(attr) for attr in op.attrs] + op.param_specs
+        attrs = params_to_attrs(specs, op.required, key_names=key_names)
+    else:
+        attrs = params_to_attrs(op.param_specs, key_names=key_names)
+
+    # Deduplicate attributes by name
+    seen_names = {}
+    deduplicated_attrs = []
+    for attr in attrs:
+        attr_name = attr["name"]
+        if attr_name not in seen_names:
+            seen_names[attr_name] = True
+            deduplicated_attrs.append(attr)
+        elif not attr.get("argument"):
+            # If duplicate and not an argument, prefer the non-argument one
+            for i, existing_attr in enumerate(deduplicated_attrs):
+                if existing_attr["name"] == attr_name:
+                    deduplicated_attrs[i] = attr
+                    break
+
+    _LOGGER.debug(f"attrs: {deduplicated_attrs}")
+    return deduplicated_attrs
+
+
+def get_ops(rsrc: ir.Resource) -> dict:
+    """Get the operations for this resource."""
+    ops = {"resource": [], "instance": []}
+    for op in rsrc.operations:
+        _LOGGER.info(f"Getting CLI attributes for {op.name}")
+        ops[op.level].append(
+            {
+                "name": op.name,
+                "id": op.id,
+                "description": op.description,
+                "multi_key": op.multi_key,
+                "is_delete": op.is_delete,
+                "paginated": op.paginated,
+                "attrs": get_attrs(rsrc, op),
+            }
+        )
 
     return ops
 
 
-def get_ops(
-    rsrc: dict,
-    baseurl: str,
-    ops: dict = None,
-    keys: list = None,
-    default_query_params: dict = None,
-):
-    """Get the operations for this resource."""
-    rsrc_name = rsrc["kind"]
-    schema = rsrc["schema"]
-    methods = rsrc.get("methods", {})
-    descs = rsrc.get("descriptions", {})
-
-    if not ops:
-        ops = {}
-
-    if schema["type"] == "array" and "key" not in schema:
-        raise spec_base.SchemaMissingAttribute("A 'key' is missing in schema {yaml.dump(schema)}")
-
-    key = None
-    if "key" in schema:
-        key = schema["key"]
-        has_param = next((item for item in keys if item["name"] == key["name"]), None)
-        _LOGGER.debug(f"has_param: {has_param}")
-        if not has_param:
-            keys.append(key)
-
-    _LOGGER.debug(f"keys: {keys}")
-
-    # 1. Add operations to high-level baseurl
-    ops["resource"] = get_resource_ops(
-        rsrc_name,
-        schema,
-        baseurl,
-        methods=methods.get("resource", {}),
-        descs=descs.get("resource", {}),
-        keys=keys,
-        default_query_params=default_query_params,
-    )
-
-    instance_baseurl = "/".join([baseurl, f"{{{key['name']}}}"])
-    _LOGGER.debug(f"instance_baseurl: {instance_baseurl}")
-
-    # 2. Get instance operations
-    ops["instance"] = get_instance_ops(
-        rsrc_name,
-        schema,
-        instance_baseurl,
-        methods=methods.get("instance", {}),
-        descs=descs.get("instance", {}),
-        keys=keys,
+def _check_collisions(rsrc_name: str, op: dict, cache: bool = False):
+    """Check the arguments and enum values of an operation convert to distinct Rust identifiers."""
+    where = f"the '{rsrc_name}' {op['name']} command"
+    idents = names.check_collisions(
+        [attr["name"] for attr in op["attrs"]], names.to_snake_case, where
     )
-
-    return ops
+    cached = cache and (op["name"] == "get" or (op["name"] == "list" and not op["paginated"]))
+    for name, ident in idents.items():
+        if cached and ident in CACHE_ARGS:
+            raise names.NameCollision(
+                f"'{name}' clashes with the --no-cache/--refresh flags of {where}"
+            )
+        if op["multi_key"] and ident in MULTI_KEY_ARGS:
+            raise names.NameCollision(
+                f"'{name}' clashes with the --keys-from/--concurrency flags of {where}"
+            )
+        if op["paginated"] and ident in PAGE_ARGS:
+            raise names.NameCollision(f"'{name}' clashes with the --output flag of {where}")
+    for attr in op["attrs"]:
+        values = attr.get("enum_values", [])
+        values_where = f"the '{attr['name']}' values of {where}"
+        names.check_collisions(values, names.to_upper_snake_case, values_where)
+        names.check_collisions(values, names.to_pascal_case, values_where)
 
 
 # pylint: disable=too-many-locals,too-many-arguments
@@ -661,51 +456,42 @@ def generate(
     version: str,
     as_modules: bool = False,
     template: str = None,
+    *,
+    compression: dict = None,
+    cargo_features: bool = False,
+    cache: dict = None,
 ):
-    """Generate a Clap based CLI script based on the resource data sent and other meta data."""
+    """Generate a Clap based CLI script based on the resource data sent and other meta data.
+
+    With `cargo_features`, the modules also get a `mod` module building each resource only with
+    the cargo feature of the same name, and the `features.toml` defining those features.
+
+    With `cache`, of a `ttl` in seconds and a `max_size` in bytes, the get and unpaged list
+    commands cache their output on disk and the commands mutating a resource invalidate it.
+    """
+    names.check_collisions([rsrc["kind"] for rsrc in rsrc_data], names.to_pascal_case, "resources")
+
     rsrcs = []
-    for rsrc in rsrc_data:
-        rsrc_name = rsrc["kind"]
-        baseurl = "/"
-        if rsrc.get("versionInPath", False):
-            baseurl += f"v{rsrc['apiVersion']}/"
-        baseurl += rsrc_name
-        _LOGGER.debug(f"baseurl: {baseurl}")
-
-        default_query_params = rsrc.get("default_query_params", [])
-        _LOGGER.debug(f"default_query_params: {default_query_params}")
-
-        # Extract keys before calling get_ops
-        schema = rsrc["schema"]
-        keys = []
-        if "key" in schema:
-            key = schema["key"]
-            keys.append(key)
-
-        ops = get_ops(
-            rsrc,
-            baseurl,
-            ops={},
-            keys=keys,
-            default_query_params=default_query_params,
-        )
+    for rsrc in ir.get_resources(rsrc_data):
+        rsrc_name = rsrc.name
+        ops = get_ops(rsrc)
         _LOGGER.debug(f"ops: {ops}")
 
         # Add PascalCase names for Rust
-        rsrc_pascal = _to_pascal_case(rsrc_name)
-        rsrc_upper = rsrc_name.upper().replace("-", "_").replace(" ", "_")
+        rsrc_pascal = names.to_pascal_case(rsrc_name)
+        rsrc_upper = names.to_upper_snake_case(rsrc_name)
 
         # Calculate component name (singular form)
         comp_name = rsrc_name if not rsrc_name.endswith("s") else rsrc_name[:-1]
-        comp_name_pascal = _to_pascal_case(comp_name)
+        comp_name_pascal = names.to_pascal_case(comp_name)
 
         # Process operations to add PascalCase names and enrich attributes
         processed_ops = {}
-        key_names = [key["name"] for key in keys] if keys else []
+        key_names = rsrc.key_names
         for op_type in ["resource", "instance"]:
             processed_ops[op_type] = []
             for op in ops.get(op_type, []):
-                op_pascal = _to_pascal_case(op["name"])
+                op_pascal = names.to_pascal_case(op["name"])
                 # Enrich attributes with body conversion metadata
                 enriched_attrs = []
                 for attr in op.get("attrs", []):
@@ -739,6 +525,7 @@ def generate(
                     "attrs": enriched_attrs,
                     "query_params": query_params,  # Explicit list of all query params for API calls
                 }
+                _check_collisions(rsrc_name, processed_op, cache=bool(cache))
                 processed_ops[op_type].append(processed_op)
 
         rsrcs.append(
@@ -749,6 +536,7 @@ def generate(
                 "comp_name": comp_name,
                 "comp_name_pascal": comp_name_pascal,
                 "operations": processed_ops,
+                "rate_limit": rsrc.rate_limit,
             }
         )
 
@@ -780,6 +568,8 @@ def generate(
             pkg=pkg,
             client_pkg=rust_client_pkg,
             rsrcs=rsrcs,
+            compression=compression,
+            cache=cache,
         )
 
     # Convert Python-style client_pkg to Rust-style (dots to underscores)
@@ -797,7 +587,12 @@ def generate(
             pkg=pkg,
             client_pkg=rust_client_pkg,
             rsrc=rsrc,
+            cache=cache,
         )
         rendered_rsrcs[rsrc["name"]] = rendered
 
+    if cargo_features:
+        for name, tmpl_name in CARGO_FEATURES_TEMPLATES.items():
+            rendered_rsrcs[name] = spec_base.JINJA_ENV.get_template(tmpl_name).render(rsrcs=rsrcs)
+
     return rendered_rsrcs
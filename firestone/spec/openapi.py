@@ -8,8 +8,11 @@ Generate OpenAPI 3.0 Spec
 import copy
 import http.client
 import logging
+import urllib.parse
 
 from firestone.spec import _base as spec_base
+from firestone.spec import _headers as spec_headers
+from firestone.spec import _intern as spec_intern
 
 DEFAULT_VERSION = "3.0.0"
 
@@ -22,6 +25,15 @@ RSRC_INST_HTTP_METHODS = ["delete", "get", "head", "patch", "put"]
 # This is a list of all HTTP methods supported on attributes of an instance of a resource
 RSRC_ATTR_HTTP_METHODS = ["delete", "get", "head", "put"]
 
+# This is a list of all property types that can be marked as filterable
+FILTER_TYPES = ["boolean", "integer", "string"]
+
+# This is a list of all orders the sortable properties can be sorted in
+SORT_ORDERS = ["asc", "desc"]
+
+# The root document of a split spec, which references the path items of each resource document
+SPLIT_ROOT = "openapi.yaml"
+
 _LOGGER = logging.getLogger(__name__)
 
 # TODO add support for JSON Patch: https://www.jvt.me/posts/2022/05/29/openapi-json-patch/
@@ -46,6 +58,7 @@ def get_responses(
     comp_name: str = None,
     attr_name: bool = None,
     is_list: bool = None,
+    streaming: bool = None,
 ):
     """Set schema for a given operation type."""
     if method == "head":
@@ -86,6 +99,12 @@ def get_responses(
             "items": {"$ref": schema_value},
         }
 
+        # Streamed lists are newline delimited, each line being a single item
+        if streaming:
+            responses[resp_code_enum.value]["content"][spec_base.NDJSON_CONTENT_TYPE] = {
+                "schema": {"$ref": schema_value},
+            }
+
     return responses
 
 
@@ -107,6 +126,7 @@ def get_method_op(
     comp_name: str = None,
     attr_name: str = None,
     is_list: bool = None,
+    streaming: bool = None,
 ):
     """Get the specified method section for the paths."""
     if not desc:
@@ -123,6 +143,7 @@ def get_method_op(
     _LOGGER.debug(f"comp_name: {comp_name}")
     _LOGGER.debug(f"attr_name: {attr_name}")
     _LOGGER.debug(f"is_list: {is_list}")
+    _LOGGER.debug(f"streaming: {streaming}")
     opr["responses"] = get_responses(
         method,
         schema,
@@ -130,6 +151,7 @@ def get_method_op(
         comp_name=comp_name,
         attr_name=attr_name,
         is_list=is_list,
+        streaming=streaming,
     )
 
     request_schema = None
@@ -175,12 +197,105 @@ def get_method_op(
     return opr
 
 
+def get_filter_params(schema: dict):
+    """Get the filter and sort query params for the filterable and sortable properties.
+
+    Every filterable property gets an exact match and an `_in` match on a list of values,
+    integers a `_min` and `_max` range and strings a `_prefix` match.
+
+    :param dict schema: the schema for this resource name
+    """
+    parameters = []
+    sortable = []
+    props = schema.get("items", {}).get("properties", {})
+    for prop in sorted(props):
+        prop_schema = props[prop]
+        if prop_schema.get("sortable"):
+            sortable.append(prop)
+        if not prop_schema.get("filterable"):
+            continue
+
+        prop_type = prop_schema.get("type", "string")
+        if prop_type not in FILTER_TYPES or "schema" in prop_schema:
+            _LOGGER.info(f"{prop} is of type '{prop_type}', which can not be filtered on")
+            continue
+
+        value_schema = {"type": prop_type}
+        if "enum" in prop_schema:
+            value_schema["enum"] = prop_schema["enum"]
+
+        parameters.append(
+            {
+                "name": prop,
+                "in": "query",
+                "required": False,
+                "schema": value_schema,
+                "description": f"Filter by {prop} equal to the value",
+            }
+        )
+        parameters.append(
+            {
+                "name": f"{prop}_in",
+                "in": "query",
+                "required": False,
+                "style": "form",
+                "explode": False,
+                "schema": {"type": "array", "items": copy.deepcopy(value_schema)},
+                "description": f"Filter by {prop} equal to any of the values",
+            }
+        )
+        if prop_type == "integer":
+            for suffix, comparison in [("min", "greater"), ("max", "less")]:
+                parameters.append(
+                    {
+                        "name": f"{prop}_{suffix}",
+                        "in": "query",
+                        "required": False,
+                        "schema": {"type": prop_type},
+                        "description": f"Filter by {prop} {comparison} than or equal to the value",
+                    }
+                )
+        elif prop_type == "string" and "enum" not in prop_schema:
+            parameters.append(
+                {
+                    "name": f"{prop}_prefix",
+                    "in": "query",
+                    "required": False,
+                    "schema": {"type": prop_type},
+                    "description": f"Filter by {prop} starting with the value",
+                }
+            )
+
+    if sortable:
+        parameters.append(
+            {
+                "name": "sort",
+                "in": "query",
+                "required": False,
+                "schema": {"type": "string", "enum": sortable},
+                "description": "Sort by this field",
+            }
+        )
+        parameters.append(
+            {
+                "name": "order",
+                "in": "query",
+                "required": False,
+                "schema": {"type": "string", "enum": SORT_ORDERS},
+                "description": "The order to sort in, ascending by default",
+            }
+        )
+
+    return parameters
+
+
 def get_params(
     baseurl: str,
     method: str,
     schema: dict,
     keys: list = None,
     param_schema: dict = None,
+    is_list: bool = None,
 ):
     """Get the parameters for this method."""
     parameters = []
@@ -207,6 +322,11 @@ def get_params(
 
             parameters.append(new_params)
 
+    # Handle filter and sort params, only listing can be filtered
+    if is_list and method == "get":
+        parameters.extend(get_filter_params(schema))
+        parameters = _dedup_params(parameters)
+
     # Handle path params
     _LOGGER.debug(f"keys: {keys}")
     if keys:
@@ -238,6 +358,8 @@ def add_resource_methods(
     default_query_params: dict = None,
     orig_rsrc_name: str = None,
     security: dict = None,
+    *,
+    streaming: bool = None,
 ):
     """Add resource level methods to the paths.
 
@@ -247,6 +369,7 @@ def add_resource_methods(
     :param dict paths: the paths
     :param list keys: the keys for the instance of this resource
     :param dict default_query_params: the paths
+    :param bool streaming: also offer list responses as NDJSON
     """
     if not descs:
         descs = {}
@@ -271,6 +394,7 @@ def add_resource_methods(
             desc=descs.get(method),
             comp_name=comp_name,
             is_list=(method == "get"),
+            streaming=streaming,
         )
         paths[baseurl][method]["tags"] = [orig_rsrc_name or rsrc_name]
 
@@ -280,7 +404,7 @@ def add_resource_methods(
             paths[baseurl][method]["security"] = [{security_scheme: []}]
 
         # Add parameters
-        params = get_params(baseurl, method, schema, keys=keys)
+        params = get_params(baseurl, method, schema, keys=keys, is_list=True)
         if default_query_params:
             params.extend(default_query_params)
             params = _dedup_params(params)
@@ -371,6 +495,17 @@ def add_instance_attr_methods(
     :param dict default_query_params: the paths
     """
     inst_methods = methods.get("instance_attrs", [])
+    attr_methods = []
+    for method in RSRC_ATTR_HTTP_METHODS:
+        if inst_methods and method not in inst_methods:
+            _LOGGER.info(
+                f"Skipping the definition of {method} in resource instance attribute generation, "
+                "as it is not in the defined methods requested"
+            )
+            continue
+        attr_methods.append(method)
+
+    comp_name = rsrc_name if not rsrc_name.endswith("s") else rsrc_name[:-1]
     for prop in schema["items"]["properties"]:
         path = "/".join([baseurl, prop])
         _LOGGER.debug(f"path: {path}")
@@ -379,16 +514,43 @@ def add_instance_attr_methods(
         if "expose" in prop_schema and not prop_schema["expose"]:
             continue
 
-        paths[path] = {}
-        for method in RSRC_ATTR_HTTP_METHODS:
-            if inst_methods and method not in inst_methods:
-                _LOGGER.info(
-                    f"Skipping the definition of {method} in resource instance attribute generation, "
-                    "as it is not in the defined methods requested"
-                )
-                continue
+        # Recursively get paths for a sub-resource, whose resource level methods make up this
+        # path, expanding it once rather than once per method
+        _LOGGER.debug(f"prop: {prop}")
+        if attr_methods and "schema" in prop_schema:
+            if "descriptions" in prop_schema["schema"]:
+                del prop_schema["schema"]["descriptions"]
+            if "descriptions" in prop_schema["schema"]["items"]:
+                del prop_schema["schema"]["items"]["descriptions"]
+
+            components = add_rsrc_components(
+                components, prop, methods, prop_schema["schema"], security
+            )
+            components["schemas"][prop] = prop_schema["schema"]["items"]
+
+            get_paths(
+                prop,
+                prop_schema["schema"],
+                path,
+                paths,
+                keys=keys,
+                default_query_params=default_query_params,
+                components=components,
+                orig_rsrc_name=orig_rsrc_name,
+                security=security,
+            )
+
+            # Refer to the sub-resource from this sub-resource, and its component
+            if rsrc_name in components["schemas"]:
+                for name in [rsrc_name, comp_name]:
+                    if prop in components["schemas"].get(name, {}).get("properties", {}):
+                        components["schemas"][name]["properties"][prop] = {
+                            "$ref": f"#/components/schemas/{prop}"
+                        }
+            continue
 
-            comp_name = rsrc_name if not rsrc_name.endswith("s") else rsrc_name[:-1]
+        paths[path] = {}
+        for method in attr_methods:
             inst_attr_op = get_method_op(
                 path, method, prop_schema, comp_name=comp_name, attr_name=prop
             )
@@ -411,39 +573,6 @@ def add_instance_attr_methods(
             paths[path][method]["tags"] = [orig_rsrc_name or rsrc_name]
             _LOGGER.debug(f"paths[{path}][{method}]: {paths[path][method]}")
 
-            # Recursively get paths for this property
-            _LOGGER.debug(f"prop: {prop}")
-            if "schema" in prop_schema:
-                if "descriptions" in prop_schema["schema"]:
-                    del prop_schema["schema"]["descriptions"]
-                if "descriptions" in prop_schema["schema"]["items"]:
-                    del prop_schema["schema"]["items"]["descriptions"]
-
-                components = add_rsrc_components(
-                    components, prop, methods, prop_schema["schema"], security
-                )
-                components["schemas"][prop] = prop_schema["schema"]["items"]
-
-                if (
-                    rsrc_name in components["schemas"]
-                    and prop in components["schemas"][rsrc_name]["properties"]
-                ):
-                    components["schemas"][rsrc_name]["properties"][prop] = {
-                        "$ref": f"#/components/schemas/{prop}"
-                    }
-
-                get_paths(
-                    prop,
-                    prop_schema["schema"],
-                    path,
-                    paths,
-                    keys=keys,
-                    default_query_params=default_query_params,
-                    components=components,
-                    orig_rsrc_name=orig_rsrc_name,
-                    security=security,
-                )
-
 
 def get_paths(
     rsrc_name: str,
@@ -462,6 +591,7 @@ def get_paths(
     schema = rsrc["schema"] if "schema" in rsrc else rsrc
     methods = rsrc.get("methods", {})
     descs = rsrc.get("descriptions", {})
+    streaming = rsrc.get("streaming", False)
 
     if not paths:
         paths = {}
@@ -489,6 +619,7 @@ def get_paths(
         default_query_params=default_query_params,
         orig_rsrc_name=orig_rsrc_name,
         security=security,
+        streaming=streaming,
     )
     _LOGGER.debug(f"paths[{baseurl}]: {paths[baseurl]}")
 
@@ -580,19 +711,60 @@ def add_rsrc_components(
     return components
 
 
-# pylint: disable=too-many-locals
-def generate(
+def _get_refs(value):
+    """Get the (section, name) of each component referenced in a value."""
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/components/"):
+            section, name = ref.split("/")[2:4]
+            yield section, name
+        for item in value.values():
+            yield from _get_refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _get_refs(item)
+
+
+def get_used_components(paths: dict, components: dict) -> dict:
+    """Get the components the paths reference, directly or through other components."""
+    used = {}
+    stack = list(_get_refs(paths))
+    while stack:
+        section, name = stack.pop()
+        if name in used.get(section, {}) or name not in components.get(section, {}):
+            continue
+        used.setdefault(section, {})[name] = components[section][name]
+        stack.extend(_get_refs(components[section][name]))
+
+    # Security requirements name their schemes, rather than reference them
+    if "securitySchemes" in components:
+        used["securitySchemes"] = components["securitySchemes"]
+
+    return {section: dict(sorted(comps.items())) for section, comps in sorted(used.items())}
+
+
+def get_path_ref(filename: str, path: str) -> dict:
+    """Get a reference to a path item of another document, as a JSON pointer URI fragment."""
+    pointer = urllib.parse.quote(path.replace("~", "~0").replace("/", "~1"), safe="~")
+    return {"$ref": f"{filename}#/paths/{pointer}"}
+
+
+# pylint: disable=too-many-locals,too-many-arguments
+def _build(
     rsrc_data: list,
     title: str,
     desc: str,
-    summary: str,
     version: str,
     prefix: str = None,
     openapi_version: str = None,
+    compression: dict = None,
+    dedup_schemas: bool = False,
+    dedup_report: dict = None,
 ):
-    """Generate an OpenAPI spec based on the resource data sent and other meta data."""
+    """Build the OpenAPI document, and the paths of each resource in it."""
     components = {"schemas": {}}
     all_paths = {}
+    rsrc_paths = {}
     for rsrc in rsrc_data:
         rsrc_name = rsrc["kind"]
         baseurl = "/"
@@ -632,20 +804,143 @@ def generate(
             security=security,
         )
         _LOGGER.debug(f"paths: {paths}")
+
+        rate_limit = rsrc.get("rate_limit")
+        if rate_limit:
+            spec_headers.add_rate_limit(paths, components, rate_limit)
+
         all_paths.update(paths)
+        rsrc_paths[rsrc_name] = list(paths)
+
+    if compression:
+        spec_headers.add_compression(all_paths, components, compression)
+
+    if dedup_schemas:
+        # Intern copies, as the paths and components share schemas with the resources
+        all_paths, components = copy.deepcopy((all_paths, components))
+        report = spec_intern.intern_schemas(all_paths, components)
+        if dedup_report is not None:
+            dedup_report.update(report)
 
-    servers = []
+    doc = {
+        "openapi": openapi_version or DEFAULT_VERSION,
+        "info": {"title": title, "description": desc, "version": version},
+    }
     if prefix:
-        servers.append({"url": prefix})
+        doc["servers"] = [{"url": prefix}]
+    doc["components"] = components
+    doc["paths"] = all_paths
+
+    return doc, rsrc_paths
+
 
+# pylint: disable=too-many-arguments
+def build(
+    rsrc_data: list,
+    title: str,
+    desc: str,
+    summary: str,
+    version: str,
+    prefix: str = None,
+    openapi_version: str = None,
+    compression: dict = None,
+    dedup_schemas: bool = False,
+    dedup_report: dict = None,
+) -> dict:
+    """Build an OpenAPI spec based on the resource data sent and other meta data.
+
+    The spec is returned as a dict, to be used as is or rendered to YAML with render. Unless
+    `dedup_schemas` is set, it shares its schemas with the resources, so copy it before changing
+    either of them.
+    """
+    # OpenAPI 3.0 has no summary in info
+    del summary
+    doc, _ = _build(
+        rsrc_data,
+        title,
+        desc,
+        version,
+        prefix=prefix,
+        openapi_version=openapi_version,
+        compression=compression,
+        dedup_schemas=dedup_schemas,
+        dedup_report=dedup_report,
+    )
+
+    return doc
+
+
+def render(doc: dict) -> str:
+    """Render an OpenAPI spec, as built by build, to YAML."""
     tmpl = spec_base.JINJA_ENV.get_template("openapi.jinja2")
     return tmpl.render(
-        title=title,
-        summary=summary,
-        description=desc,
-        version=version,
-        components=components,
-        paths=all_paths,
-        servers=servers,
+        title=doc["info"]["title"],
+        description=doc["info"]["description"],
+        version=doc["info"]["version"],
+        components=doc.get("components"),
+        paths=doc["paths"],
+        servers=doc.get("servers"),
+        openapi_version=doc["openapi"],
+    )
+
+
+# pylint: disable=too-many-arguments
+def generate(
+    rsrc_data: list,
+    title: str,
+    desc: str,
+    summary: str,
+    version: str,
+    prefix: str = None,
+    openapi_version: str = None,
+    *,
+    compression: dict = None,
+    dedup_schemas: bool = False,
+    dedup_report: dict = None,
+    split: bool = False,
+):
+    """Generate an OpenAPI spec based on the resource data sent and other meta data.
+
+    With `dedup_schemas`, the schemas inlined more than once are interned into components, and
+    `dedup_report`, if given, is updated with the report of spec_intern.intern_schemas.
+
+    With `split`, a dict of the documents by file name is returned instead: a spec of each
+    resource, with its paths and the components they use, and the SPLIT_ROOT spec referencing
+    their path items.
+    """
+    # OpenAPI 3.0 has no summary in info
+    del summary
+    doc, rsrc_paths = _build(
+        rsrc_data,
+        title,
+        desc,
+        version,
+        prefix=prefix,
         openapi_version=openapi_version,
+        compression=compression,
+        dedup_schemas=dedup_schemas,
+        dedup_report=dedup_report,
     )
+    if not split:
+        return render(doc)
+
+    docs = {}
+    root = {**doc, "components": {}, "paths": {}}
+    for rsrc_name, path_names in rsrc_paths.items():
+        filename = f"{rsrc_name}.yaml"
+        paths = {path: doc["paths"][path] for path in path_names}
+        docs[filename] = render(
+            {
+                **doc,
+                "info": {**doc["info"], "title": f"{title} ({rsrc_name})"},
+                "components": get_used_components(paths, doc["components"]),
+                "paths": paths,
+            }
+        )
+        root["paths"].update({path: get_path_ref(filename, path) for path in path_names})
+
+    if "securitySchemes" in doc["components"]:
+        root["components"]["securitySchemes"] = doc["components"]["securitySchemes"]
+    docs[SPLIT_ROOT] = render(root)
+
+    return docs
@@ -13,7 +13,8 @@ import jinja2
 from firestone_lib import utils
 
 from firestone.spec import _base as spec_base
-from firestone.spec import openapi as spec_openapi
+from firestone.spec import _ir as ir
+from firestone.spec import _names as names
 
 PARAM_TYPE_TO_ATTR_TYPE = {
     "string": "TextColumn",
@@ -24,22 +25,13 @@ PARAM_TYPE_TO_ATTR_TYPE = {
     "enum": "SelectboxColumn",
 }
 
-_LOGGER = logging.getLogger(__name__)
-
+# The default number of seconds generated pages cache fetched resources for
+DEFAULT_CACHE_TTL = 60
 
-def _get_op_name(method: str, top_level: bool) -> str:
-    if method == "get" and top_level:
-        return "list"
-    if method == "get":
-        return "get"
-    if method == "post":
-        return "create"
-    if method in ["put", "patch"]:
-        return "update"
-    if method == "delete":
-        return method
+# The name of the app module navigating between the page modules
+APP_MODULE = "app"
 
-    return None
+_LOGGER = logging.getLogger(__name__)
 
 
 def params_to_attrs(params: list, required: list = None, key_names: list = None):
@@ -93,186 +85,73 @@ def params_to_attrs(params: list, required: list = None, key_names: list = None)
     return attrs
 
 
-def get_resource_attrs(
-    schema: dict, params: dict = None, check_required: bool = None, key_names: list = None
-):
-    """Get resource attributes."""
-    _LOGGER.debug(f"key_names: {key_names}")
-    props = schema.get("items", {}).get("properties", {})
-    tmp_attrs = [{"name": attr, **(props[attr])} for attr in props]
-    if params:
-        tmp_attrs.extend(params)
-    _LOGGER.debug(f"tmp_attrs: {tmp_attrs}")
-
-    required = schema["items"].get("required", []) if check_required else []
-    _LOGGER.debug(f"required: {required}")
-
-    attrs = params_to_attrs(tmp_attrs, required, key_names=key_names)
-    _LOGGER.debug(f"attrs: {attrs}")
+def get_query_widgets(params: list, paginated: bool = None):
+    """Convert the query params for listing resources to filter and sort widgets.
 
-    return attrs
-
-
-def get_instance_ops(
-    rsrc_name: str,
-    schema: dict,
-    baseurl: str,
-    methods: list = None,
-    descs: list = None,
-    keys: list = None,
-):
-    """Add the instance methods to the paths.
-
-    :param str rsrc_name: the resource name
-    :param dict schema: the schema for this resource name
-    :param str baseurl: the baseurl to use for paths
-    :param list methods: optional set of methods to create for
-    :param list keys: the keys for the instance of this resource
-    :param dict paths: the paths
+    :param list params: the query params for listing resources
+    :param bool paginated: whether the listing is paged through with the page params
     """
-    _LOGGER.debug(f"keys: {keys}")
-    ops = []
-    top_level = False
-    for method in spec_openapi.RSRC_INST_HTTP_METHODS:
-        if methods and method not in methods:
-            _LOGGER.info(
-                f"Skipping the definition of {method} in resource instance generation, "
-                "as it is not in the defined methods requested"
-            )
-            continue
-
-        op_name = _get_op_name(method, top_level)
-        if not op_name:
-            continue
-        _LOGGER.info(f"Getting streamlit attributes for {op_name}")
-
-        op = {}
-        op["name"] = op_name
-        op["id"] = spec_base.get_opid(baseurl, method)
-        op["description"] = descs.get(method, f"{op_name.capitalize()} operation for {rsrc_name}")
-
-        params = spec_openapi.get_params(baseurl, method, schema, keys=keys)
-        _LOGGER.debug(f"params: {params}")
-
-        key_names = [key["name"] for key in keys]
-        _LOGGER.debug(f"key_names: {key_names}")
-        attrs = params_to_attrs(params, key_names=key_names)
-
-        if op_name == "update":
-            attrs = get_resource_attrs(schema, params=params, key_names=key_names)
-
-        _LOGGER.debug(f"attrs: {attrs}")
-
-        op["attrs"] = attrs
-
-        ops.append(op)
-
-    return ops
-
-
-def get_resource_ops(
-    rsrc_name: str,
-    schema: dict,
-    baseurl: str,
-    methods: list = None,
-    descs: list = None,
-    keys: list = None,
-):
-    """Add resource level methods to the ops.
-
-    :param str rsrc_name: the resource name
-    :param dict schema: the schema for this resource name
-    :param str baseurl: the baseurl to use for ops
-    :param list methods: optional set of methods to create for
-    :param list keys: the keys for the instance of this resource
-    """
-    _LOGGER.debug(f"keys: {keys}")
-    ops = []
-
-    top_level = True
-    for method in spec_openapi.RSRC_HTTP_METHODS:
-        if methods and method not in methods:
-            _LOGGER.info(
-                f"Skipping the definition of {method} in resource generation, "
-                "as it is not in the defined methods requested"
-            )
+    widgets = []
+    for param in params:
+        if param.get("in", "query") != "query" or param["name"] in [w["name"] for w in widgets]:
             continue
-
-        op_name = _get_op_name(method, top_level)
-        if not op_name:
+        if paginated and param["name"] in spec_base.PAGE_PARAMS:
             continue
 
-        op = {}
-        op["name"] = op_name
-        op["id"] = spec_base.get_opid(baseurl, method)
-        op["description"] = descs.get(method, f"{op_name.capitalize()} operation for {rsrc_name}")
-
-        # Add params and attributes
-        params = []
-        attrs = params_to_attrs(params)
-
-        if op_name == "create":
-            check_required = True
-            attrs = get_resource_attrs(schema, check_required=check_required)
-        _LOGGER.debug(f"attrs: {attrs}")
+        param_schema = param.get("schema", {"type": "string"})
+        param_type = param_schema.get("type", "string")
+        options = param_schema.get("enum")
+        if param_type == "boolean":
+            options = ["true", "false"]
+
+        widget = "text_input"
+        if param_type == "array":
+            options = param_schema.get("items", {}).get("enum")
+            widget = "multiselect" if options else widget
+        elif options:
+            widget = "selectbox"
+        elif param_type == "integer":
+            widget = "number_input"
+        _LOGGER.debug(f"{param['name']} is of type '{param_type}', using a {widget}")
+
+        widgets.append(
+            {
+                "name": param["name"],
+                "pretty_name": utils.split_capitalize(param["name"]),
+                "description": param.get("description"),
+                "widget": widget,
+                "options": options,
+            }
+        )
+    return widgets
 
-        op["attrs"] = attrs
 
-        ops.append(op)
+def get_attrs(rsrc: ir.Resource, op: ir.Operation) -> list:
+    """Get the column attributes of an operation."""
+    if op.name == "create":
+        return params_to_attrs([attr.spec for attr in op.attrs], op.required)
+    if op.level == "resource":
+        return []
 
-    return ops
+    specs = op.param_specs
+    if op.name == "update":
+        specs = [attr.spec for attr in op.attrs] + specs
+    return params_to_attrs(specs, op.required, key_names=rsrc.key_names)
 
 
-def get_ops(
-    rsrc: dict,
-    baseurl: str,
-    ops: dict = None,
-    keys: list = None,
-):
+def get_ops(rsrc: ir.Resource) -> dict:
     """Get the operations for this resource."""
-    rsrc_name = rsrc["kind"]
-    schema = rsrc["schema"]
-    methods = rsrc.get("methods", {})
-    descs = rsrc.get("descriptions", {})
-
-    if not ops:
-        ops = {}
-
-    if schema["type"] == "array" and not "key" in schema:
-        raise spec_base.SchemaMissingAttribute("A 'key' is missing in schema {yaml.dump(schema)}")
-
-    key = None
-    if "key" in schema:
-        key = schema["key"]
-        has_param = next((item for item in keys if item["name"] == key["name"]), None)
-        _LOGGER.debug(f"has_param: {has_param}")
-        if not has_param:
-            keys.append(key)
-
-    _LOGGER.debug(f"keys: {keys}")
-
-    # 1. Add operations to high-level baseurl
-    ops["resource"] = get_resource_ops(
-        rsrc_name,
-        schema,
-        baseurl,
-        methods=methods.get("resource", {}),
-        descs=descs.get("resource", {}),
-        keys=keys,
-    )
-
-    instance_baseurl = "/".join([baseurl, f"{{{key['name']}}}"])
-    _LOGGER.debug(f"instance_baseurl: {instance_baseurl}")
-
-    # 2. Get instance operations
-    ops["instance"] = get_instance_ops(
-        rsrc_name,
-        schema,
-        instance_baseurl,
-        methods=methods.get("instance", {}),
-        descs=descs.get("instance", {}),
-        keys=keys,
-    )
+    ops = {"resource": [], "instance": []}
+    for op in rsrc.operations:
+        _LOGGER.info(f"Getting streamlit attributes for {op.name}")
+        ops[op.level].append(
+            {
+                "name": op.name,
+                "id": op.id,
+                "description": op.description,
+                "attrs": get_attrs(rsrc, op),
+            }
+        )
 
     return ops
 
@@ -288,36 +167,39 @@ def generate(
     as_modules: bool = False,
     template: str = None,
     col_mappings: dict = None,
+    *,
+    compression: dict = None,
+    cache_ttl: int = DEFAULT_CACHE_TTL,
 ):
     """Generate a streamlit based WebUI script based on the resource data sent and other meta data."""
     if not col_mappings:
         col_mappings = {}
     _LOGGER.debug(f"col_mappings: {col_mappings}")
+    class_names = names.check_collisions(
+        [rsrc["kind"] for rsrc in rsrc_data], names.to_pascal_case, "resources"
+    )
 
     rsrcs = []
-    for rsrc in rsrc_data:
-        rsrc_name = rsrc["kind"]
-        baseurl = "/"
-        if rsrc.get("versionInPath", False):
-            baseurl += f"v{rsrc['apiVersion']}/"
-        baseurl += rsrc_name
-        _LOGGER.debug(f"baseurl: {baseurl}")
-
-        ops = get_ops(
-            rsrc,
-            baseurl,
-            ops={},
-            keys=[],
-        )
+    for rsrc in ir.get_resources(rsrc_data):
+        ops = get_ops(rsrc)
         _LOGGER.debug(f"ops: {ops}")
+
+        # Only fetch the visible page of listings that can be paged through
+        list_op = rsrc.get_op("list")
+        params = list_op.param_specs if list_op else []
+        paginated = bool(list_op and list_op.paginated)
         rsrcs.append(
             {
-                "name": rsrc_name,
-                "key": rsrc["schema"]["key"],
-                "pretty_name": utils.split_capitalize(rsrc_name),
-                "baseurl": baseurl,
+                "name": rsrc.name,
+                "class_name": class_names[rsrc.name],
+                "key": rsrc.key,
+                "pretty_name": utils.split_capitalize(rsrc.name),
+                "baseurl": rsrc.baseurl,
                 "operations": ops,
-                "col_mapping": col_mappings.get(rsrc_name),
+                "col_mapping": col_mappings.get(rsrc.name),
+                "rate_limit": rsrc.rate_limit,
+                "paginated": paginated,
+                "query_widgets": get_query_widgets(params, paginated=paginated),
             }
         )
 
@@ -344,6 +226,8 @@ def generate(
             version=version,
             rsrcs=rsrcs,
             backend_url=backend_url,
+            compression=compression,
+            cache_ttl=cache_ttl,
         )
 
     rendered_rsrcs = {}
@@ -357,7 +241,16 @@ def generate(
             version=version,
             rsrc=rsrc,
             backend_url=backend_url,
+            compression=compression,
+            cache_ttl=cache_ttl,
         )
         rendered_rsrcs[rsrc["name"]] = rendered
 
+    if APP_MODULE in rendered_rsrcs:
+        _LOGGER.warning(f"A resource is named '{APP_MODULE}', skipping the app module")
+        return rendered_rsrcs
+
+    app_tmpl = spec_base.JINJA_ENV.get_template("streamlit_app.py.jinja2")
+    rendered_rsrcs[APP_MODULE] = app_tmpl.render(title=title, rsrcs=rsrcs)
+
     return rendered_rsrcs
@@ -0,0 +1,33 @@
+"""
+Resources shared by the tests of the firestone.spec generators.
+"""
+
+import copy
+
+# A resource keyed by foo_key, with the methods of every command
+RSRC = {
+    "kind": "foo",
+    "apiVersion": "v1",
+    "schema": {
+        "type": "array",
+        "key": {"name": "foo_key", "schema": {"type": "string"}},
+        "items": {
+            "type": "object",
+            "properties": {
+                "foo_key": {"type": "string"},
+                "name": {"type": "string"},
+            },
+        },
+    },
+    "methods": {
+        "resource": ["get", "post"],
+        "instance": ["get", "put", "delete"],
+    },
+}
+
+
+def get_rsrc(**attrs) -> dict:
+    """Get a copy of RSRC, with the given attributes of the resource replaced."""
+    rsrc = copy.deepcopy(RSRC)
+    rsrc.update(copy.deepcopy(attrs))
+    return rsrc
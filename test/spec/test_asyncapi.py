@@ -0,0 +1,370 @@
+"""
+Test the firestone.spec.asyncapi module.
+"""
+
+import copy
+import unittest
+
+import yaml
+
+import firestone
+from firestone.spec import asyncapi
+
+KEY = {"name": "foo_key", "description": "The foo key", "schema": {"type": "string"}}
+
+SCHEMA = {
+    "type": "array",
+    "key": KEY,
+    "items": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "age": {"type": "integer"},
+        },
+    },
+}
+
+RSRC = {
+    "kind": "foo",
+    "apiVersion": "v1",
+    "default_query_params": [],
+    "asyncapi": {
+        "channels": {"resources": True, "instances": True, "instance_attrs": True},
+    },
+    "schema": SCHEMA,
+}
+
+
+# pylint: disable=duplicate-code
+class TestAsyncAPIGetDeltaMessage(unittest.TestCase):
+    """Test all aspects of firestone.spec.asyncapi.get_delta_message"""
+
+    def test_list(self):
+        """Test a list delta carries changed items, by key, and deleted keys."""
+        message = asyncapi.get_delta_message(
+            "foo", SCHEMA, "application/json", "foo", key=KEY, is_list=True
+        )
+
+        self.assertEqual(message["name"], "foo_delta")
+        self.assertEqual(message["headers"]["required"], ["version", "base_version"])
+        changes = message["payload"]["properties"]["changes"]
+        self.assertEqual(changes["type"], "array")
+        self.assertEqual(changes["items"]["required"], ["foo_key"])
+        self.assertEqual(
+            changes["items"]["properties"]["name"],
+            {"$ref": "#/components/schemas/foo/properties/name"},
+        )
+        self.assertEqual(message["payload"]["properties"]["deleted"]["items"], {"type": "string"})
+
+    def test_instance(self):
+        """Test an instance delta only carries the changed fields."""
+        message = asyncapi.get_delta_message("foo", SCHEMA, "application/json", "foo", key=KEY)
+
+        changes = message["payload"]["properties"]["changes"]
+        self.assertEqual(changes["type"], "object")
+        self.assertNotIn("required", changes)
+        self.assertEqual(sorted(changes["properties"]), ["age", "name"])
+        self.assertNotIn("deleted", message["payload"]["properties"])
+
+    def test_instance_attr(self):
+        """Test an instance attribute delta carries the new attribute value."""
+        message = asyncapi.get_delta_message(
+            "foo",
+            SCHEMA["items"]["properties"]["age"],
+            "application/json",
+            "foo",
+            attr_name="age",
+        )
+
+        self.assertEqual(
+            message["payload"]["properties"]["changes"],
+            {"$ref": "#/components/schemas/foo/properties/age"},
+        )
+
+
+class TestAsyncAPIGetQueries(unittest.TestCase):
+    """Test all aspects of firestone.spec.asyncapi.get_queries"""
+
+    def setUp(self):
+        self.schema = copy.deepcopy(SCHEMA)
+        self.schema["query_params"] = [
+            {
+                "name": "city",
+                "description": "Filter by city",
+                "required": True,
+                "methods": ["get"],
+            },
+        ]
+        self.meta = {
+            "default_query_params": [
+                {"name": "limit", "description": "Limit", "schema": {"type": "integer"}},
+            ],
+        }
+
+    def test_methods(self):
+        """Test the params limited to some methods are only in the queries of those methods."""
+        queries = asyncapi.get_queries(self.meta, self.schema)
+
+        self.assertEqual(queries["get"]["required"], ["city"])
+        self.assertEqual(list(queries["get"]["properties"]), ["city", "limit"])
+        self.assertEqual(
+            queries["get"]["properties"]["limit"], {"description": "Limit", "type": "integer"}
+        )
+        self.assertEqual(queries["post"]["required"], [])
+        self.assertEqual(list(queries["post"]["properties"]), ["limit"])
+
+    def test_no_mutation(self):
+        """Test the resource query params are left untouched, however often queried."""
+        schema = copy.deepcopy(self.schema)
+        meta = copy.deepcopy(self.meta)
+        for _ in range(3):
+            asyncapi.get_queries(meta, schema)
+
+        self.assertEqual(schema, self.schema)
+        self.assertEqual(meta, self.meta)
+
+    def test_no_default_query_params(self):
+        """Test a resource without default query params."""
+        queries = asyncapi.get_queries({"default_query_params": None}, self.schema)
+
+        self.assertEqual(list(queries["get"]["properties"]), ["city"])
+
+    def test_no_query_params(self):
+        """Test a schema without query params has no queries."""
+        queries = asyncapi.get_queries(self.meta, SCHEMA)
+
+        self.assertEqual(asyncapi.get_binding(queries, "get"), {"method": "get", "query": {}})
+
+    def test_context(self):
+        """Test the context computes the query objects of each schema once."""
+        ctx = asyncapi.ChannelContext(self.meta)
+        queries = ctx.get_queries(self.schema)
+
+        self.assertIs(ctx.get_queries(self.schema), queries)
+        self.assertEqual(dict(queries), dict(asyncapi.get_queries(self.meta, self.schema)))
+        self.assertEqual(dict(ctx.get_queries(SCHEMA)), {})
+
+
+class TestAsyncAPIGetChannel(unittest.TestCase):
+    """Test all aspects of firestone.spec.asyncapi.get_channel"""
+
+    def test_no_deltas(self):
+        """Test only snapshot messages are used by default."""
+        meta = copy.deepcopy(RSRC)
+        channel = asyncapi.get_channel(
+            asyncapi.ChannelContext(meta),
+            "/foo",
+            copy.deepcopy(SCHEMA),
+            {},
+            keys=[KEY],
+            rsrc_name="foo",
+            is_list=True,
+        )
+
+        self.assertEqual(channel["subscribe"]["message"]["name"], "foo")
+        self.assertNotIn("headers", channel["subscribe"]["message"])
+        self.assertEqual(channel["publish"]["message"]["name"], "foo")
+
+    def test_deltas(self):
+        """Test subscribers get snapshot and delta messages, and publishers can resync."""
+        meta = copy.deepcopy(RSRC)
+        meta["asyncapi"]["deltas"] = True
+        channel = asyncapi.get_channel(
+            asyncapi.ChannelContext(meta),
+            "/foo",
+            copy.deepcopy(SCHEMA),
+            {},
+            keys=[KEY],
+            rsrc_name="foo",
+            is_list=True,
+        )
+
+        snapshot, delta = channel["subscribe"]["message"]["oneOf"]
+        self.assertEqual(snapshot["name"], "foo")
+        self.assertEqual(snapshot["headers"]["required"], ["version"])
+        self.assertEqual(delta["name"], "foo_delta")
+
+        publish, resync = channel["publish"]["message"]["oneOf"]
+        self.assertEqual(publish["name"], "foo")
+        self.assertEqual(resync["name"], "foo_resync")
+        self.assertEqual(resync["payload"]["required"], ["last_version"])
+
+
+class TestAsyncAPIAddChannelMessage(unittest.TestCase):
+    """Test all aspects of firestone.spec.asyncapi.add_channel_message"""
+
+    def test_shared_headers(self):
+        """Test messages with the same headers share one component, referenced by the channel."""
+        components = {"schemas": {}, "messages": {}}
+        v3_channel = {"messages": {}}
+        chan_ref = {"$ref": "#/channels/foo"}
+        headers = {"type": "object", "properties": {"version": {"type": "integer"}}}
+        refs = [
+            asyncapi.add_channel_message(
+                components,
+                components["messages"],
+                v3_channel,
+                chan_ref,
+                msg_id,
+                {"name": msg_id, "headers": copy.deepcopy(headers)},
+                headers_id="snapshot_headers",
+            )
+            for msg_id in ["foo", "bar"]
+        ]
+
+        self.assertEqual(
+            refs, [{"$ref": "#/channels/foo/messages/foo"}, {"$ref": "#/channels/foo/messages/bar"}]
+        )
+        self.assertEqual(components["schemas"], {"snapshot_headers": headers})
+        self.assertEqual(
+            components["messages"]["bar"]["headers"],
+            {"$ref": "#/components/schemas/snapshot_headers"},
+        )
+        self.assertEqual(v3_channel["messages"]["foo"], {"$ref": "#/components/messages/foo"})
+
+
+class TestAsyncAPIGenerate(unittest.TestCase):
+    """Test all aspects of firestone.spec.asyncapi.generate"""
+
+    def test_generate(self):
+        """Test channels are generated for each level of the resource."""
+        spec = yaml.safe_load(
+            asyncapi.generate([copy.deepcopy(RSRC)], "Foo API", "Some Foo API", "Summary", "1.0")
+        )
+
+        self.assertIn("/foo", spec["channels"])
+        self.assertIn("/foo/{foo_key}", spec["channels"])
+        self.assertIn("/foo/{foo_key}/age", spec["channels"])
+        self.assertEqual(spec["channels"]["/foo"]["subscribe"]["tags"], [{"name": "foo"}])
+
+    def test_generate_deltas(self):
+        """Test every channel gets delta messages when enabled."""
+        rsrc = copy.deepcopy(RSRC)
+        rsrc["asyncapi"]["deltas"] = True
+        spec = yaml.safe_load(
+            asyncapi.generate([rsrc], "Foo API", "Some Foo API", "Summary", "1.0")
+        )
+
+        for channel in spec["channels"].values():
+            names = [msg["name"] for msg in channel["subscribe"]["message"]["oneOf"]]
+            self.assertEqual(names, ["foo", "foo_delta"])
+
+    def test_generate_shared_queries(self):
+        """Test the channels of a resource share its query objects, leaving it untouched."""
+        rsrc = copy.deepcopy(RSRC)
+        rsrc["schema"]["query_params"] = [{"name": "city", "description": "Filter by city"}]
+        rsrc["default_query_params"] = [{"name": "limit", "description": "Limit"}]
+        orig = copy.deepcopy(rsrc)
+        spec = yaml.safe_load(
+            asyncapi.generate([rsrc], "Foo API", "Some Foo API", "Summary", "1.0")
+        )
+
+        self.assertEqual(rsrc, orig)
+        for path in ["/foo", "/foo/{foo_key}"]:
+            query = spec["channels"][path]["subscribe"]["bindings"]["ws"]["query"]
+            self.assertEqual(list(query["properties"]), ["city", "limit"])
+
+
+class TestAsyncAPIBuild(unittest.TestCase):
+    """Test all aspects of firestone.spec.asyncapi.build"""
+
+    def test_build(self):
+        """Test the spec is built as a dict, rendered to the spec generated."""
+        args = ("Foo API", "Some Foo API", "Summary", "1.0")
+        for version in [None, "3.0.0"]:
+            doc = firestone.build_asyncapi([copy.deepcopy(RSRC)], *args, asyncapi_version=version)
+
+            self.assertEqual(doc["asyncapi"], version or asyncapi.DEFAULT_VERSION)
+            self.assertEqual(doc["info"]["title"], "Foo API")
+            self.assertIn("foo", doc["components"]["schemas"])
+            self.assertEqual(doc.get("operations") is not None, version is not None)
+            self.assertEqual(
+                firestone.render_asyncapi(doc),
+                asyncapi.generate([copy.deepcopy(RSRC)], *args, asyncapi_version=version),
+            )
+
+
+class TestAsyncAPIGenerateV3(unittest.TestCase):
+    """Test all aspects of firestone.spec.asyncapi.generate for AsyncAPI 3.0"""
+
+    def generate(self, rsrc):
+        """Generate an AsyncAPI 3.0 spec for the resource."""
+        return yaml.safe_load(
+            asyncapi.generate(
+                [rsrc], "Foo API", "Some Foo API", "Summary", "1.0", asyncapi_version="3.0.0"
+            )
+        )
+
+    def test_generate(self):
+        """Test messages are defined once and referenced by channels, then operations."""
+        spec = self.generate(copy.deepcopy(RSRC))
+
+        self.assertEqual(spec["asyncapi"], "3.0.0")
+        self.assertEqual(
+            sorted(spec["components"]["messages"]),
+            ["foo", "foo_age", "foo_list", "foo_lookup", "foo_name"],
+        )
+        channel = spec["channels"]["foo_foo_key"]
+        self.assertEqual(channel["address"], "/foo/{foo_key}")
+        self.assertEqual(channel["parameters"], {"foo_key": {"description": "The foo key"}})
+        self.assertEqual(channel["messages"]["foo"], {"$ref": "#/components/messages/foo"})
+
+        subscribe = spec["operations"]["foo_foo_key_subscribe"]
+        self.assertEqual(subscribe["action"], "send")
+        self.assertEqual(subscribe["channel"], {"$ref": "#/channels/foo_foo_key"})
+        self.assertEqual(subscribe["messages"], [{"$ref": "#/channels/foo_foo_key/messages/foo"}])
+        self.assertEqual(spec["operations"]["foo_foo_key_publish"]["action"], "receive")
+
+    def test_lookup(self):
+        """Test only instance channels can be looked up, replied to with the snapshot."""
+        spec = self.generate(copy.deepcopy(RSRC))
+
+        lookup = spec["operations"]["foo_foo_key_lookup"]
+        self.assertEqual(
+            lookup["messages"], [{"$ref": "#/channels/foo_foo_key/messages/foo_lookup"}]
+        )
+        self.assertEqual(
+            lookup["reply"],
+            {
+                "channel": {"$ref": "#/channels/foo_foo_key"},
+                "messages": [{"$ref": "#/channels/foo_foo_key/messages/foo"}],
+            },
+        )
+        lookups = [opid for opid in spec["operations"] if opid.endswith("_lookup")]
+        self.assertEqual(lookups, ["foo_foo_key_lookup"])
+
+    def test_deltas(self):
+        """Test the delta and resync messages, and their headers, are shared."""
+        rsrc = copy.deepcopy(RSRC)
+        rsrc["asyncapi"]["deltas"] = True
+        spec = self.generate(rsrc)
+
+        messages = spec["components"]["messages"]
+        self.assertIn("foo_list_delta", messages)
+        self.assertIn("foo_age_delta", messages)
+        self.assertEqual(
+            messages["foo_delta"]["headers"], {"$ref": "#/components/schemas/delta_headers"}
+        )
+        self.assertEqual(
+            messages["foo_snapshot"]["headers"],
+            {"$ref": "#/components/schemas/snapshot_headers"},
+        )
+        self.assertNotIn("headers", messages["foo"])
+        self.assertEqual(
+            sorted(msg_id for msg_id in messages if msg_id.startswith("foo_resync")),
+            ["foo_resync"],
+        )
+
+    def test_servers(self):
+        """Test the server urls are split into a host and a pathname."""
+        rsrc = copy.deepcopy(RSRC)
+        rsrc["asyncapi"]["servers"] = {"dev": {"url": "ws://localhost:8080/ws", "protocol": "ws"}}
+        spec = self.generate(rsrc)
+
+        self.assertEqual(
+            spec["servers"]["dev"], {"host": "localhost:8080", "pathname": "/ws", "protocol": "ws"}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
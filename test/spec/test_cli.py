@@ -0,0 +1,697 @@
+"""
+Test the firestone.spec.cli module.
+"""
+
+import ast
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from unittest import mock
+
+import pycodestyle
+
+from firestone.spec import _names as names
+from firestone.spec import cli
+
+from . import fixtures
+
+
+# pylint: disable=duplicate-code
+class TestCliGenerate(unittest.TestCase):
+    """Test all aspects of firestone.spec.cli.generate"""
+
+    def _generate(self, rsrc, as_modules=False, compression=None, cache=None):
+        return cli.generate(
+            "test_pkg",
+            "test_pkg.client",
+            [rsrc],
+            "Test API",
+            "Test API Description",
+            "Test Summary",
+            "1.0",
+            as_modules=as_modules,
+            compression=compression,
+            cache=cache,
+        )
+
+    def test_basic_generation(self):
+        """Test basic Python CLI generation."""
+        result = self._generate(fixtures.get_rsrc())
+        self.assertIn("async def foo_get(", result)
+        self.assertIn("async def foo_post(", result)
+        self.assertNotIn("async def echo_ndjson(resp):", result)
+        self.assertIn("resp = await api_obj.foo_get_without_preload_content(**params)", result)
+        self.assertNotIn("Accept-Encoding", result)
+        compile(result, "main.py", "exec")
+
+    def test_streaming_list(self):
+        """Test list commands consume NDJSON when the resource is streaming."""
+        rsrc = fixtures.get_rsrc()
+        rsrc["streaming"] = True
+        result = self._generate(rsrc)
+        self.assertIn("async def echo_ndjson(resp):", result)
+        self.assertIn("await api_obj.foo_get_without_preload_content(", result)
+        self.assertIn('_headers={"Accept": "application/x-ndjson"}', result)
+        compile(result, "main.py", "exec")
+
+    def test_streaming_list_as_modules(self):
+        """Test list commands consume NDJSON when generating modules."""
+        rsrc = fixtures.get_rsrc()
+        rsrc["streaming"] = True
+        result = self._generate(rsrc, as_modules=True)
+        self.assertIn("foo", result)
+        self.assertIn("await api_obj.foo_get_without_preload_content(", result["foo"])
+        compile(result["foo"], "foo.py", "exec")
+
+    def test_filters(self):
+        """Test list commands get options for filterable and sortable properties."""
+        rsrc = fixtures.get_rsrc()
+        rsrc["schema"]["items"]["properties"]["name"]["filterable"] = True
+        rsrc["schema"]["items"]["properties"]["name"]["sortable"] = True
+        result = self._generate(rsrc)
+        self.assertIn('@click.option("--name-prefix",', result)
+        self.assertIn('@click.option("--name-in",', result)
+        self.assertIn('type=click.Choice(["name"])', result)
+        self.assertIn('type=click.Choice(["asc","desc"])', result)
+        self.assertIn(
+            '@click.option("--name-in", help="Filter by name equal to any of the values", type=cli.StrList',
+            result,
+        )
+        compile(result, "main.py", "exec")
+
+        # The values of integer properties are sent as integers
+        rsrc["schema"]["items"]["properties"]["age"] = {"type": "integer", "filterable": True}
+        result = self._generate(rsrc)
+        self.assertIn(
+            '@click.option("--age-in", help="Filter by age equal to any of the values", type=cli.IntList',
+            result,
+        )
+        self.assertIn('@click.option("--age-min",', result)
+
+    def test_output_options_collision(self):
+        """Test attributes clashing with the --raw and --output options are refused."""
+        rsrc = fixtures.get_rsrc()
+        rsrc["schema"]["items"]["properties"]["raw"] = {"type": "string"}
+        with self.assertRaises(names.NameCollision):
+            self._generate(rsrc)
+
+    def test_multi_key_collision(self):
+        """Test params clashing with the options of the multi-key commands are refused."""
+        rsrc = fixtures.get_rsrc()
+        rsrc["schema"]["query_params"] = [{"name": "keys-from", "methods": ["get"]}]
+        with self.assertRaises(names.NameCollision):
+            self._generate(rsrc)
+
+    def test_cache(self):
+        """Test a response cache is only generated when asked for."""
+        result = self._generate(fixtures.get_rsrc())
+        self.assertNotIn("class ResponseCache:", result)
+        self.assertNotIn("@cache_options", result)
+
+        result = self._generate(fixtures.get_rsrc(), cache={"ttl": 60, "max_size": 1024})
+        self.assertIn("CACHE_TTL = 60", result)
+        self.assertIn("CACHE_MAX_SIZE = 1024", result)
+        self.assertEqual(result.count("@cache_options"), 2)
+        self.assertEqual(result.count('@invalidates("foo")'), 3)
+        compile(result, "main.py", "exec")
+
+        # Only the read commands get the options
+        rsrc = fixtures.get_rsrc()
+        rsrc["schema"]["items"]["properties"]["no-cache"] = {"type": "string"}
+        self._generate(rsrc, cache={"ttl": 60, "max_size": 1024})
+        rsrc["schema"]["query_params"] = [{"name": "no-cache", "methods": ["get"]}]
+        self._generate(rsrc)
+        with self.assertRaises(names.NameCollision):
+            self._generate(rsrc, cache={"ttl": 60, "max_size": 1024})
+
+    def test_top_level_spacing(self):
+        """Test the top-level definitions are set apart by two blank lines, in both modes."""
+        rsrc = fixtures.get_rsrc(streaming=True, rate_limit={"limit": 10})
+        compression = {"encodings": ["gzip"]}
+        cache = {"ttl": 60, "max_size": 1024}
+        for code in [
+            self._generate(rsrc, compression=compression, cache=cache),
+            self._generate(rsrc, as_modules=True, compression=compression, cache=cache)["foo"],
+        ]:
+            checker = pycodestyle.Checker(
+                lines=code.splitlines(True), select=["E302", "E305"], quiet=True
+            )
+            self.assertEqual(checker.check_all(), 0)
+
+    def test_shared_helpers(self):
+        """Test the script and the modules get the same runtime helpers, bar the lazy imports."""
+        rsrc = fixtures.get_rsrc(streaming=True, rate_limit={"limit": 10})
+        compression = {"encodings": ["gzip"]}
+        cache = {"ttl": 60, "max_size": 1024}
+        script = self._generate(rsrc, compression=compression, cache=cache)
+        module = self._generate(rsrc, as_modules=True, compression=compression, cache=cache)["foo"]
+
+        def helpers(code):
+            code = code[code.index("def api_exc(") : code.index("async def echo_cached(")]
+            return re.sub(r' +exceptions = import_client\("exceptions"\)\n\n', "", code)
+
+        self.assertEqual(helpers(script), helpers(module))
+
+    def test_module_imports(self):
+        """Test the modules import only what they use."""
+
+        def unused(code):
+            tree = ast.parse(code)
+            imported = {
+                (alias.asname or alias.name).split(".")[0]
+                for node in ast.walk(tree)
+                if isinstance(node, (ast.Import, ast.ImportFrom))
+                for alias in node.names
+            }
+            used = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+            return imported - used
+
+        rsrc = fixtures.get_rsrc()
+        self.assertEqual(unused(self._generate(rsrc, as_modules=True)["foo"]), set())
+        module = self._generate(rsrc, as_modules=True, compression={"encodings": ["gzip"]})["foo"]
+        self.assertEqual(unused(module), set())
+        self.assertNotIn("from firestone_lib import cli", module)
+        self.assertNotIn("import foo as foo_model", module)
+        self.assertNotIn("import configuration", module)
+
+        rsrc["schema"]["items"]["properties"]["tags"] = {
+            "type": "array",
+            "items": {"type": "string"},
+        }
+        module = self._generate(rsrc, as_modules=True, cache={"ttl": 60, "max_size": 1024})["foo"]
+        self.assertEqual(unused(module), set())
+        self.assertIn("from firestone_lib import cli", module)
+
+    def test_rate_limit(self):
+        """Test rate limited resources pace and retry their requests."""
+        rsrc = fixtures.get_rsrc()
+        rsrc["rate_limit"] = {"limit": 10, "window": 2}
+        result = self._generate(rsrc)
+        self.assertIn("class TokenBucket:", result)
+        self.assertIn("def retry_delay(retry_after: str, attempt: int) -> float:", result)
+        self.assertIn("TokenBucket(10, 2)", result)
+        compile(result, "main.py", "exec")
+
+        # Only the idempotent requests are retried, so a create is never sent twice
+        start = result.index("RETRY_STATUSES = ")
+        end = result.index("\n", result.index("rest_client.request = throttled_request", start))
+        namespace = {"asyncio": asyncio, "time": time, "_LOGGER": mock.Mock()}
+        exec(result[start:end], namespace)  # pylint: disable=exec-used
+        namespace["retry_delay"] = lambda retry_after, attempt: 0
+        for method, sent in (("POST", 1), ("GET", 6), ("put", 6)):
+            request = mock.AsyncMock(return_value=mock.Mock(status=429))
+            rest_client = mock.Mock(request=request)
+            namespace["throttle"](rest_client, namespace["TokenBucket"](100, 1))
+            resp = asyncio.run(rest_client.request(method, "http://api/foo"))
+            self.assertEqual(resp.status, 429)
+            self.assertEqual(request.await_args_list, [mock.call(method, "http://api/foo")] * sent)
+
+        result = self._generate(fixtures.get_rsrc(), as_modules=True)
+        self.assertNotIn("TokenBucket", result["foo"])
+
+    def test_compression(self):
+        """Test compressed responses are negotiated when compression is configured."""
+        result = self._generate(fixtures.get_rsrc(), compression={"encodings": ["gzip", "br"]})
+        self.assertIn("for enc in ['gzip', 'br']", result)
+        self.assertIn('aclient.set_default_header("Accept-Encoding", ACCEPT_ENCODING)', result)
+        self.assertNotIn("CompressingSession", result)
+        compile(result, "main.py", "exec")
+
+    def test_compression_requests(self):
+        """Test large request bodies are compressed over the minimum size."""
+        result = self._generate(
+            fixtures.get_rsrc(),
+            as_modules=True,
+            compression={"encodings": ["gzip"], "request_min_size": 1024},
+        )
+        self.assertIn("REQUEST_MIN_SIZE = 1024", result["foo"])
+        self.assertIn("aclient.rest_client.pool_manager = CompressingSession(", result["foo"])
+        compile(result["foo"], "foo.py", "exec")
+
+        # The session takes the method and URL positionally, as aiohttp_retry does
+        code = result["foo"]
+        start = code.index("class CompressingSession:")
+        namespace = {}
+        exec(code[start : code.index("\n\n\n", start)], namespace)  # pylint: disable=exec-used
+        calls = []
+        session = namespace["CompressingSession"](None, 1024)
+        session.session = mock.Mock(request=lambda *args, **kwargs: calls.append((args, kwargs)))
+        session.request("POST", "http://api/foo", data=b"x" * 2048, trace_request_ctx=None)
+        session.request("POST", "http://api/foo", data=b"x")
+        self.assertEqual(
+            calls,
+            [
+                (
+                    ("POST", "http://api/foo"),
+                    {"data": b"x" * 2048, "trace_request_ctx": None, "compress": "gzip"},
+                ),
+                (("POST", "http://api/foo"), {"data": b"x"}),
+            ],
+        )
+
+
+# The modules of a fake API client, each logging that it was imported
+FAKE_CLIENT = {
+    "api_client.py": """
+        import fake_pkg.client.models
+
+
+        class ApiClient:
+            def __init__(self, configuration=None):
+                self.configuration = configuration
+
+            async def close(self):
+                pass
+    """,
+    "configuration.py": """
+        class Configuration:
+            def __init__(self, host=None):
+                self.host = host
+                self.access_token = None
+    """,
+    "exceptions.py": """
+        class ApiException(Exception):
+            pass
+    """,
+}
+
+# The eager __init__ of the client packages, importing every API and model as the generator's do
+FAKE_CLIENT_INIT = """
+    \"""A fake client.\"""
+
+    __version__ = "1.0.0"
+
+    from fake_pkg.client.api_client import ApiClient
+    from fake_pkg.client.configuration import (
+        Configuration,
+        Configuration as Config,
+    )
+    from .exceptions import ApiException
+"""
+
+FAKE_API = """
+    import json
+
+    ETAG = '"v1"'
+    RECORDS = [{{"foo_key": "a", "name": "x", "tags": ["t"]}}, {{"foo_key": "b", "name": None}}]
+
+
+    class {clazz}Api:
+        def __init__(self, api_client=None):
+            self.api_client = api_client
+
+        async def {name}_get(self, **params):
+            return [Resp(record) for record in RECORDS]
+
+        async def {name}_get_without_preload_content(self, **params):
+            return RawResp(json.dumps(RECORDS).encode("utf-8"))
+
+        async def {name}_foo_key_get(self, foo_key, **params):
+            return Resp({{"foo_key": foo_key}})
+
+        async def {name}_foo_key_get_without_preload_content(self, foo_key, _headers=None, **params):
+            etag = (_headers or {{}}).get("If-None-Match")
+            open({log!r}, "a").write(f"call:get:{{foo_key}}:{{etag}}\\n")
+            if foo_key == "missing":
+                return RawResp(b"no such foo", status=404)
+            return RawResp(json.dumps({{"foo_key": foo_key}}).encode("utf-8"), etag=etag)
+
+        async def {name}_foo_key_delete(self, foo_key, **params):
+            open({log!r}, "a").write(f"call:delete:{{foo_key}}\\n")
+
+        async def {name}_foo_key_delete_without_preload_content(self, foo_key, **params):
+            open({log!r}, "a").write(f"call:delete:{{foo_key}}\\n")
+            return RawResp(b"")
+
+
+    class Resp:
+        def __init__(self, data):
+            self.data = data
+
+        def to_dict(self):
+            return self.data
+
+
+    class RawResp:
+        content_type = "application/json"
+
+        def __init__(self, body, etag=None, status=200):
+            self.body = body
+            self.status = status
+            self.reason = "OK" if status < 400 else "Not Found"
+            self.content = self
+            self.headers = {{"ETag": ETAG}}
+            if etag == ETAG:
+                self.status = 304
+                self.body = b""
+
+        async def read(self):
+            return self.body
+
+        async def text(self):
+            return self.body.decode("utf-8")
+
+        async def iter_any(self):
+            yield self.body[:3]
+            yield self.body[3:]
+
+        def release(self):
+            pass
+"""
+
+
+class FakeCliTestCase(unittest.TestCase):
+    """Generate a CLI of NUM_RSRCS resources over a fake client logging its imports"""
+
+    NUM_RSRCS = 1
+    CACHE = None
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.imports = os.path.join(self.tmpdir.name, "imports.log")
+        self.cache_home = os.path.join(self.tmpdir.name, "cache")
+
+        modules = dict(FAKE_CLIENT)
+        apis = []
+        models = []
+        rsrcs = []
+        for idx in range(self.NUM_RSRCS):
+            name = f"foo{idx}"
+            rsrc = fixtures.get_rsrc()
+            rsrc["kind"] = name
+            rsrcs.append(rsrc)
+            modules[f"api/{name}_api.py"] = FAKE_API.format(
+                clazz=name.capitalize(), name=name, log=self.imports
+            )
+            apis.append(f"from fake_pkg.client.api.{name}_api import {name.capitalize()}Api\n")
+            for model in [f"create_{name}", f"update_{name}"]:
+                clazz = model.title().replace("_", "")
+                modules[f"models/{model}.py"] = f"class {clazz}:\n    pass\n"
+                models.append(f"from fake_pkg.client.models.{model} import {clazz}\n")
+        modules["api/__init__.py"] = "".join(apis)
+        modules["models/__init__.py"] = "".join(models)
+        modules["__init__.py"] = textwrap.dedent(FAKE_CLIENT_INIT) + "".join(apis + models)
+
+        modules = {"__init__.py": "", **{f"client/{name}": mod for name, mod in modules.items()}}
+        for filename, content in modules.items():
+            path = os.path.join(self.tmpdir.name, "fake_pkg", filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                # The package __init__ are left as generated, their imports show when they run
+                if not filename.endswith("__init__.py"):
+                    fh.write(f"open({self.imports!r}, 'a').write(__name__ + '\\n')\n")
+                fh.write(textwrap.dedent(content))
+
+        self.main = os.path.join(self.tmpdir.name, "main.py")
+        with open(self.main, "w", encoding="utf-8") as fh:
+            fh.write(
+                cli.generate(
+                    "fake_pkg",
+                    "fake_pkg.client",
+                    rsrcs,
+                    "Test API",
+                    "Test API Description",
+                    "Test Summary",
+                    "1.0",
+                    cache=self.CACHE,
+                )
+            )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _run(self, *args, stdin=None, script=None):
+        env = dict(os.environ, PYTHONPATH=self.tmpdir.name, XDG_CACHE_HOME=self.cache_home)
+        result = subprocess.run(
+            [sys.executable, script or self.main, *args],
+            input=stdin,
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+            env=env,
+        )
+        imported = []
+        if os.path.exists(self.imports):
+            with open(self.imports, encoding="utf-8") as fh:
+                imported = [line for line in fh.read().split() if line.startswith("fake_pkg.")]
+        return result.stdout, imported
+
+    def _calls(self):
+        with open(self.imports, encoding="utf-8") as fh:
+            return [line[5:] for line in fh.read().split() if line.startswith("call:")]
+
+
+class TestCliLazyStartup(FakeCliTestCase):
+    """Test the generated firestone.spec.cli.generate CLI only imports the resource invoked"""
+
+    NUM_RSRCS = 150
+
+    def test_help(self):
+        """Test the help lists every resource without importing the client."""
+        stdout, imported = self._run("--help")
+
+        self.assertIn("foo0", stdout)
+        self.assertIn(f"foo{self.NUM_RSRCS - 1}", stdout)
+        self.assertEqual(imported, [])
+
+    def test_command(self):
+        """Test a command only imports the API and models of its resource."""
+        stdout, imported = self._run("foo7", "get", "bar")
+
+        self.assertEqual(stdout.strip(), '{"foo_key": "bar"}')
+        self.assertEqual(
+            sorted(imported),
+            [
+                "fake_pkg.client.api.foo7_api",
+                "fake_pkg.client.api_client",
+                "fake_pkg.client.configuration",
+                "fake_pkg.client.exceptions",
+                "fake_pkg.client.models.create_foo7",
+                "fake_pkg.client.models.update_foo7",
+            ],
+        )
+
+    def test_exports(self):
+        """Test the names the client __init__ sets, however it imports them, resolve on access."""
+        script = os.path.join(self.tmpdir.name, "exports.py")
+        with open(script, "w", encoding="utf-8") as fh:
+            fh.write(textwrap.dedent(f"""
+                    import runpy
+
+                    runpy.run_path({self.main!r})["import_client"]("exceptions")
+                    import fake_pkg.client as client
+
+                    print(client.__version__, client.Config.__name__, client.ApiException.__name__)
+                    print(client.api.Foo3Api.__name__, client.models.CreateFoo3.__name__)
+                    """))
+        stdout, imported = self._run(script=script)
+
+        self.assertEqual(stdout, "1.0.0 Configuration ApiException\nFoo3Api CreateFoo3\n")
+        self.assertEqual(
+            sorted(imported),
+            [
+                "fake_pkg.client.api.foo3_api",
+                "fake_pkg.client.configuration",
+                "fake_pkg.client.exceptions",
+                "fake_pkg.client.models.create_foo3",
+            ],
+        )
+
+    def test_unknown_init(self):
+        """Test a client __init__ doing more than importing is imported as is."""
+        init = os.path.join(self.tmpdir.name, "fake_pkg", "client", "__init__.py")
+        with open(init, "a", encoding="utf-8") as fh:
+            fh.write(f"open({self.imports!r}, 'a').write(__name__ + '\\n')\n")
+        stdout, imported = self._run("foo7", "get", "bar")
+
+        self.assertEqual(stdout.strip(), '{"foo_key": "bar"}')
+        self.assertIn("fake_pkg.client", imported)
+        self.assertIn("fake_pkg.client.api.foo0_api", imported)
+
+
+class TestCliOutput(FakeCliTestCase):
+    """Test the --raw and --output options of the generated firestone.spec.cli.generate CLI"""
+
+    def test_json(self):
+        """Test the response is re-encoded as compact JSON."""
+        stdout, _ = self._run("foo0", "list", "--output", "json")
+
+        self.assertEqual(
+            stdout,
+            '[{"foo_key":"a","name":"x","tags":["t"]},{"foo_key":"b","name":null}]\n',
+        )
+
+    def test_ndjson(self):
+        """Test each record is echoed on its own line."""
+        stdout, _ = self._run("foo0", "list", "-o", "ndjson")
+
+        self.assertEqual(
+            stdout, '{"foo_key":"a","name":"x","tags":["t"]}\n{"foo_key":"b","name":null}\n'
+        )
+
+    def test_csv(self):
+        """Test the records are echoed as CSV, over the union of their keys."""
+        stdout, _ = self._run("foo0", "list", "-o", "csv")
+
+        self.assertEqual(stdout, 'foo_key,name,tags\na,x,"[""t""]"\nb,,\n')
+
+    def test_table(self):
+        """Test a single record is echoed as an aligned table."""
+        stdout, _ = self._run("foo0", "get", "bar", "-o", "table")
+
+        self.assertEqual(stdout, "foo_key\nbar\n")
+
+    def test_table_list(self):
+        """Test the records are echoed as an aligned table."""
+        stdout, _ = self._run("foo0", "list", "-o", "table")
+
+        self.assertEqual(stdout, 'foo_key  name  tags\na        x     ["t"]\nb\n')
+
+    def test_raw(self):
+        """Test the response body is streamed as is."""
+        stdout, _ = self._run("foo0", "get", "bar", "--raw")
+
+        self.assertEqual(stdout, '{"foo_key": "bar"}')
+
+    def test_raw_and_output(self):
+        """Test --raw and --output are mutually exclusive."""
+        with self.assertRaises(subprocess.CalledProcessError) as ctx:
+            self._run("foo0", "get", "bar", "--raw", "-o", "json")
+
+        self.assertIn("mutually exclusive", ctx.exception.stderr)
+
+
+class TestCliCache(FakeCliTestCase):
+    """Test the response cache of the generated firestone.spec.cli.generate CLI"""
+
+    CACHE = {"ttl": 3600, "max_size": 1024**2}
+
+    def _expire(self):
+        """Mark the cached entries as stored long ago."""
+        cache_dir = os.path.join(self.cache_home, "fake_pkg", "foo0")
+        for filename in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, filename)
+            with open(path, "rb") as fh:
+                header = json.loads(fh.readline())
+                body = fh.read()
+            header["stored"] = 0
+            with open(path, "wb") as fh:
+                fh.write(json.dumps(header).encode("utf-8") + b"\n" + body)
+
+    def test_cached(self):
+        """Test a repeated read is served from the cache."""
+        first, _ = self._run("foo0", "get", "bar")
+        second, _ = self._run("foo0", "get", "bar")
+        other, _ = self._run("foo0", "get", "baz", "-o", "csv")
+
+        self.assertEqual(first, '{"foo_key": "bar"}\n')
+        self.assertEqual(second, first)
+        self.assertEqual(other, "foo_key\nbaz\n")
+        self.assertEqual(self._calls(), ["get:bar:None", "get:baz:None"])
+
+    def test_revalidate(self):
+        """Test a stale entry is revalidated with its ETag."""
+        self._run("foo0", "get", "bar")
+        self._expire()
+        stdout, _ = self._run("foo0", "get", "bar", "--raw")
+        self._run("foo0", "get", "bar")
+
+        self.assertEqual(stdout, '{"foo_key": "bar"}')
+        self.assertEqual(self._calls(), ["get:bar:None", 'get:bar:"v1"'])
+
+    def test_refresh(self):
+        """Test --refresh fetches the response again and --no-cache skips the cache."""
+        stdout, _ = self._run("foo0", "get", "bar", "--no-cache")
+        self.assertEqual(stdout, '{"foo_key": "bar"}\n')
+        self.assertFalse(os.path.exists(self.cache_home))
+
+        self._run("foo0", "get", "bar")
+        self._run("foo0", "get", "bar", "--refresh")
+        self._run("foo0", "get", "bar")
+
+        self.assertEqual(self._calls(), ["get:bar:None", "get:bar:None"])
+
+    def test_invalidate(self):
+        """Test a mutating command invalidates the cached responses of its resource."""
+        self._run("foo0", "get", "bar")
+        self._run("foo0", "delete", "bar")
+        self._run("foo0", "get", "bar")
+
+        self.assertEqual(self._calls(), ["get:bar:None", "delete:bar", "get:bar:None"])
+
+
+class TestCliMultiKey(FakeCliTestCase):
+    """Test the instance commands of the generated firestone.spec.cli.generate CLI for many keys"""
+
+    def _records(self, stdout):
+        return sorted((json.loads(line) for line in stdout.splitlines()), key=lambda r: r["key"])
+
+    def test_many(self):
+        """Test each key is echoed as a line of NDJSON with its result."""
+        stdout, _ = self._run("foo0", "get", "b", "a", "c", "--concurrency", "2")
+
+        self.assertEqual(
+            self._records(stdout),
+            [
+                {"key": "a", "result": {"foo_key": "a"}},
+                {"key": "b", "result": {"foo_key": "b"}},
+                {"key": "c", "result": {"foo_key": "c"}},
+            ],
+        )
+        self.assertEqual(sorted(self._calls()), ["get:a:None", "get:b:None", "get:c:None"])
+
+    def test_keys_from(self):
+        """Test more keys are read from stdin, one per line."""
+        stdout, _ = self._run("foo0", "delete", "a", "--keys-from", "-", stdin="b\n\n c\n")
+
+        self.assertEqual(
+            self._records(stdout),
+            [
+                {"key": "a", "result": None},
+                {"key": "b", "result": None},
+                {"key": "c", "result": None},
+            ],
+        )
+        self.assertEqual(sorted(self._calls()), ["delete:a", "delete:b", "delete:c"])
+
+    def test_errors(self):
+        """Test the failed keys are echoed with their error and do not stop the others."""
+        with self.assertRaises(subprocess.CalledProcessError) as ctx:
+            self._run("foo0", "get", "a", "missing")
+
+        self.assertEqual(
+            self._records(ctx.exception.stdout),
+            [
+                {"key": "a", "result": {"foo_key": "a"}},
+                {
+                    "key": "missing",
+                    "error": {"status": 404, "reason": "Not Found", "body": "no such foo"},
+                },
+            ],
+        )
+        self.assertIn("1 of 2 keys failed", ctx.exception.stderr)
+
+    def test_output(self):
+        """Test many keys are only echoed as NDJSON, and a key is needed."""
+        stdout, _ = self._run("foo0", "get", "a", "b", "-o", "ndjson")
+        self.assertEqual(len(stdout.splitlines()), 2)
+
+        with self.assertRaises(subprocess.CalledProcessError) as ctx:
+            self._run("foo0", "get", "a", "b", "-o", "csv")
+        self.assertIn("only output as NDJSON", ctx.exception.stderr)
+
+        with self.assertRaises(subprocess.CalledProcessError) as ctx:
+            self._run("foo0", "get")
+        self.assertIn("Missing keys", ctx.exception.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
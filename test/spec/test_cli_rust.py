@@ -2,11 +2,21 @@
 Test the firestone.spec.cli_rust module.
 """
 
+import copy
+import os
+import shutil
+import subprocess
+import tempfile
 import unittest
-from unittest import mock
 
+from firestone_lib import resource as firestone_rsrc
+
+from firestone.spec import _ir as ir
+from firestone.spec import _names as names
 from firestone.spec import cli_rust
 
+from . import fixtures
+
 
 class TestCliRustParamsToAttrs(unittest.TestCase):
     """Test all aspects of firestone.spec.cli_rust.params_to_attrs"""
@@ -139,212 +149,96 @@ class TestCliRustParamsToAttrs(unittest.TestCase):
         self.assertEqual(attrs[0]["type"], "String")  # Objects are passed as JSON strings
 
 
-class TestCliRustGetResourceAttrs(unittest.TestCase):
-    """Test all aspects of firestone.spec.cli_rust.get_resource_attrs"""
+RSRC = fixtures.get_rsrc(methods={"resource": ["get", "post"], "instance": ["get", "put"]})
+RSRC["schema"]["query_params"] = [
+    {
+        "name": "query_param",
+        "description": "A query parameter",
+        "schema": {"type": "string"},
+        "methods": ["get"],
+    }
+]
+RSRC["schema"]["items"]["properties"]["age"] = {"type": "integer"}
+RSRC["schema"]["items"]["required"] = ["name"]
+
+
+class TestCliRustGetAttrs(unittest.TestCase):
+    """Test all aspects of firestone.spec.cli_rust.get_attrs"""
+
+    def _get_attrs(self, op_name, level="resource"):
+        rsrc = ir.Resource(copy.deepcopy(RSRC))
+        return cli_rust.get_attrs(rsrc, rsrc.get_op(op_name, level=level))
 
     def test_basic_properties(self):
-        """Test get_resource_attrs with basic properties."""
-        schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string"},
-                    "age": {"type": "integer"},
-                },
-            },
-        }
-        attrs = cli_rust.get_resource_attrs(schema)
-        self.assertIsNotNone(attrs)
-        self.assertEqual(len(attrs), 2)
-        names = [attr["name"] for attr in attrs]
-        self.assertIn("name", names)
-        self.assertIn("age", names)
+        """Test create takes the properties, required as per the schema."""
+        attrs = {attr["name"]: attr for attr in self._get_attrs("create")}
+        self.assertEqual(sorted(attrs), ["age", "foo_key", "name"])
+        self.assertTrue(attrs["name"]["required"])
+        self.assertFalse(attrs["age"]["required"])
+        self.assertEqual(attrs["age"]["type"], "i64")
 
     def test_excludes_key_names(self):
-        """Test get_resource_attrs excludes key names to avoid duplicates."""
-        schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "foo_key": {"type": "string"},
-                    "name": {"type": "string"},
-                },
-            },
-        }
-        attrs = cli_rust.get_resource_attrs(schema, key_names=["foo_key"])
-        self.assertIsNotNone(attrs)
-        names = [attr["name"] for attr in attrs]
-        # Note: get_resource_attrs filters key_names in params_to_attrs via the argument flag
-        # but the key may still appear if it's in the schema properties
-        # The key should be marked as argument=True
+        """Test update takes the key once, as an argument."""
+        attrs = self._get_attrs("update", level="instance")
         key_attrs = [attr for attr in attrs if attr["name"] == "foo_key"]
-        if key_attrs:
-            # If it appears, it should be marked as an argument
-            self.assertTrue(key_attrs[0]["argument"])
-        self.assertIn("name", names)
+        self.assertEqual(len(key_attrs), 1)
+        self.assertTrue(key_attrs[0]["argument"])
+        self.assertFalse(any(attr["required"] for attr in attrs if attr["name"] == "name"))
 
     def test_with_params(self):
-        """Test get_resource_attrs with additional params."""
-        schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string"},
-                },
-            },
-        }
-        params = [
-            {
-                "name": "query_param",
-                "description": "A query parameter",
-                "schema": {"type": "string"},
-            }
-        ]
-        attrs = cli_rust.get_resource_attrs(schema, params=params)
-        names = [attr["name"] for attr in attrs]
-        self.assertIn("name", names)
-        self.assertIn("query_param", names)
-
-
-class TestCliRustGetInstanceOps(unittest.TestCase):
-    """Test all aspects of firestone.spec.cli_rust.get_instance_ops"""
-
-    @mock.patch("firestone.spec.cli_rust.spec_openapi.get_params")
-    def test_update_operation(self, get_params_mock):
-        """Test get_instance_ops generates update operation correctly."""
-        # Mock get_params to return path parameter
-        get_params_mock.return_value = [
-            {
-                "name": "foo_key",
-                "description": "A key",
-                "schema": {"type": "string"},
-                "required": True,
-            }
-        ]
-        schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "foo_key": {"type": "string"},
-                    "name": {"type": "string"},
-                },
-            },
-        }
-        keys = [{"name": "foo_key", "schema": {"type": "string"}}]
-        ops = cli_rust.get_instance_ops(
-            "foo",
-            schema,
-            "/foo/{foo_key}",
-            methods=["put"],
-            descs={},
-            keys=keys,
-        )
-        self.assertIsNotNone(ops)
-        update_ops = [op for op in ops if op["name"] == "update"]
-        self.assertEqual(len(update_ops), 1)
-        update_op = update_ops[0]
-        # Check that foo_key appears only once (as argument, not in body)
-        attrs = update_op["attrs"]
-        key_attrs = [attr for attr in attrs if attr["name"] == "foo_key"]
-        # Should appear only once (as path parameter)
+        """Test list takes the query params."""
+        attrs = self._get_attrs("list")
+        self.assertEqual([attr["name"] for attr in attrs], ["query_param"])
+        self.assertEqual(attrs[0]["in"], "query")
+
+
+class TestCliRustGetOps(unittest.TestCase):
+    """Test all aspects of firestone.spec.cli_rust.get_ops"""
+
+    def _get_ops(self, **methods):
+        rsrc = copy.deepcopy(RSRC)
+        rsrc["methods"] = methods
+        return cli_rust.get_ops(ir.Resource(rsrc))
+
+    def test_ops(self):
+        """Test the operations are projected from the resource IR."""
+        ops = cli_rust.get_ops(ir.Resource(copy.deepcopy(RSRC)))
+        self.assertEqual([op["name"] for op in ops["resource"]], ["list", "create"])
+        self.assertEqual([op["name"] for op in ops["instance"]], ["get", "update"])
+        self.assertFalse(ops["resource"][0]["paginated"])
+
+    def test_update_operation(self):
+        """Test the update operation takes the key once, as an argument."""
+        ops = self._get_ops(resource=["get"], instance=["put"])
+        self.assertEqual([op["name"] for op in ops["instance"]], ["update"])
+        update_op = ops["instance"][0]
+        self.assertEqual(update_op["id"], "foo_foo_key_put")
+        key_attrs = [attr for attr in update_op["attrs"] if attr["name"] == "foo_key"]
         self.assertEqual(len(key_attrs), 1)
-        self.assertTrue(key_attrs[0]["argument"])  # Should be marked as argument
+        self.assertTrue(key_attrs[0]["argument"])
 
-    @mock.patch("firestone.spec.cli_rust.spec_openapi.get_params")
-    def test_get_operation(self, get_params_mock):
-        """Test get_instance_ops generates get operation correctly."""
-        get_params_mock.return_value = [
-            {
-                "name": "foo_key",
-                "description": "A key",
-                "schema": {"type": "string"},
-                "required": True,
-            }
-        ]
-        schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "foo_key": {"type": "string"},
-                    "name": {"type": "string"},
-                },
-            },
-        }
-        keys = [{"name": "foo_key", "schema": {"type": "string"}}]
-        ops = cli_rust.get_instance_ops(
-            "foo",
-            schema,
-            "/foo/{foo_key}",
-            methods=["get"],
-            descs={},
-            keys=keys,
-        )
-        self.assertIsNotNone(ops)
-        get_ops = [op for op in ops if op["name"] == "get"]
-        self.assertEqual(len(get_ops), 1)
-        get_op = get_ops[0]
+    def test_get_operation(self):
+        """Test the get operation, run for many keys at once."""
+        ops = self._get_ops(resource=["get"], instance=["get"])
+        self.assertEqual([op["name"] for op in ops["instance"]], ["get"])
+        get_op = ops["instance"][0]
         self.assertEqual(get_op["id"], "foo_foo_key_get")
-
-
-class TestCliRustGetResourceOps(unittest.TestCase):
-    """Test all aspects of firestone.spec.cli_rust.get_resource_ops"""
-
-    @mock.patch("firestone.spec.cli_rust.spec_openapi.get_params")
-    def test_list_operation(self, get_params_mock):
-        """Test get_resource_ops generates list operation correctly."""
-        get_params_mock.return_value = []
-        schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string"},
-                },
-            },
-        }
-        ops = cli_rust.get_resource_ops(
-            "foo",
-            schema,
-            "/foo",
-            methods=["get"],
-            descs={},
-        )
-        self.assertIsNotNone(ops)
-        list_ops = [op for op in ops if op["name"] == "list"]
-        self.assertEqual(len(list_ops), 1)
-        list_op = list_ops[0]
+        self.assertTrue(get_op["multi_key"])
+        self.assertFalse(get_op["is_delete"])
+
+    def test_list_operation(self):
+        """Test the list operation."""
+        ops = self._get_ops(resource=["get"], instance=["get"])
+        self.assertEqual([op["name"] for op in ops["resource"]], ["list"])
+        list_op = ops["resource"][0]
         self.assertEqual(list_op["id"], "foo_get")
+        self.assertFalse(list_op["multi_key"])
 
-    @mock.patch("firestone.spec.cli_rust.spec_openapi.get_params")
-    def test_create_operation(self, get_params_mock):
-        """Test get_resource_ops generates create operation correctly."""
-        get_params_mock.return_value = []
-        schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string"},
-                },
-            },
-        }
-        ops = cli_rust.get_resource_ops(
-            "foo",
-            schema,
-            "/foo",
-            methods=["post"],
-            descs={},
-        )
-        self.assertIsNotNone(ops)
-        create_ops = [op for op in ops if op["name"] == "create"]
-        self.assertEqual(len(create_ops), 1)
-        create_op = create_ops[0]
-        self.assertEqual(create_op["id"], "foo_post")
+    def test_create_operation(self):
+        """Test the create operation."""
+        ops = self._get_ops(resource=["post"], instance=["get"])
+        self.assertEqual([op["name"] for op in ops["resource"]], ["create"])
+        self.assertEqual(ops["resource"][0]["id"], "foo_post")
 
 
 class TestCliRustGenerate(unittest.TestCase):
@@ -352,27 +246,7 @@ class TestCliRustGenerate(unittest.TestCase):
 
     def test_basic_generation(self):
         """Test basic Rust CLI generation."""
-        rsrc_data = [
-            {
-                "kind": "foo",
-                "apiVersion": "v1",
-                "schema": {
-                    "type": "array",
-                    "key": {"name": "foo_key", "schema": {"type": "string"}},
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "foo_key": {"type": "string"},
-                            "name": {"type": "string"},
-                        },
-                    },
-                },
-                "methods": {
-                    "resource": ["get", "post"],
-                    "instance": ["get", "put", "delete"],
-                },
-            }
-        ]
+        rsrc_data = [fixtures.get_rsrc()]
         result = cli_rust.generate(
             "test_pkg",
             "test_pkg::apis",
@@ -389,27 +263,7 @@ class TestCliRustGenerate(unittest.TestCase):
 
     def test_generation_with_update_no_duplicate_key(self):
         """Test that update operations don't have duplicate key arguments."""
-        rsrc_data = [
-            {
-                "kind": "foo",
-                "apiVersion": "v1",
-                "schema": {
-                    "type": "array",
-                    "key": {"name": "foo_key", "schema": {"type": "string"}},
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "foo_key": {"type": "string"},
-                            "name": {"type": "string"},
-                        },
-                    },
-                },
-                "methods": {
-                    "resource": ["get", "post"],
-                    "instance": ["get", "put", "delete"],
-                },
-            }
-        ]
+        rsrc_data = [fixtures.get_rsrc()]
         result = cli_rust.generate(
             "test_pkg",
             "test_pkg::apis",
@@ -438,25 +292,7 @@ class TestCliRustGenerate(unittest.TestCase):
 
     def test_generation_includes_required_imports(self):
         """Test that generated Rust code includes required imports."""
-        rsrc_data = [
-            {
-                "kind": "foo",
-                "apiVersion": "v1",
-                "schema": {
-                    "type": "array",
-                    "key": {"name": "foo_key", "schema": {"type": "string"}},
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string"},
-                        },
-                    },
-                },
-                "methods": {
-                    "resource": ["get"],
-                },
-            }
-        ]
+        rsrc_data = [fixtures.get_rsrc(methods={"resource": ["get"]})]
         result = cli_rust.generate(
             "test_pkg",
             "test_pkg::apis",
@@ -474,26 +310,7 @@ class TestCliRustGenerate(unittest.TestCase):
 
     def test_generation_creates_command_structs(self):
         """Test that generated Rust code creates command structs."""
-        rsrc_data = [
-            {
-                "kind": "foo",
-                "apiVersion": "v1",
-                "schema": {
-                    "type": "array",
-                    "key": {"name": "foo_key", "schema": {"type": "string"}},
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string"},
-                        },
-                    },
-                },
-                "methods": {
-                    "resource": ["get", "post"],
-                    "instance": ["get", "put", "delete"],
-                },
-            }
-        ]
+        rsrc_data = [fixtures.get_rsrc()]
         result = cli_rust.generate(
             "test_pkg",
             "test_pkg::apis",
@@ -514,40 +331,366 @@ class TestCliRustGenerate(unittest.TestCase):
 
     def test_generation_creates_command_enum(self):
         """Test that generated Rust code creates command enum."""
+        rsrc_data = [fixtures.get_rsrc()]
+        result = cli_rust.generate(
+            "test_pkg",
+            "test_pkg::apis",
+            rsrc_data,
+            "Test API",
+            "Test API Description",
+            "Test Summary",
+            "1.0",
+            as_modules=True,
+        )
+        rust_code = result["foo"]
+        # Check for command enum
+        self.assertIn("#[derive(Subcommand, Debug)]", rust_code)
+        self.assertIn("pub enum FooCommands", rust_code)
+
+    def test_generation_rate_limit(self):
+        """Test that rate limited resources pace their requests and only retry idempotent ones."""
+        rsrc_data = [
+            fixtures.get_rsrc(
+                rate_limit={"limit": 10, "window": 2},
+                methods={"resource": ["get", "post"], "instance": ["get", "put"]},
+            )
+        ]
+        result = cli_rust.generate(
+            "test_pkg",
+            "test_pkg::apis",
+            rsrc_data,
+            "Test API",
+            "Test API Description",
+            "Test Summary",
+            "1.0",
+            as_modules=True,
+        )
+        rust_code = result["foo"]
+        self.assertIn("tokio::sync::Mutex::new(TokenBucket::new(10, 2 as f64))", rust_code)
+        self.assertIn("pub async fn handle_foo_command(", rust_code)
+        self.assertNotIn("dispatch_foo_command", rust_code)
+        self.assertIn("if idempotent && attempt < MAX_RETRIES", rust_code)
+        self.assertIn("matches!(resp.status.as_u16(), 429 | 503)", rust_code)
+        # Creating has side effects, so it is never retried
+        self.assertIn("send(false, || crate::apis::foo_api::foo_post(", rust_code)
+        self.assertIn("send(true, || crate::apis::foo_api::foo_foo_key_put(", rust_code)
+        self.assertIn("send(true, || crate::apis::foo_api::foo_foo_key_get(", rust_code)
+
+    def test_generation_cache(self):
+        """Test that read commands cache their output and mutating commands invalidate it."""
+        rsrc_data = [
+            fixtures.get_rsrc(methods={"resource": ["get", "post"], "instance": ["get", "delete"]})
+        ]
+        result = cli_rust.generate(
+            "test_pkg",
+            "test_pkg::apis",
+            rsrc_data,
+            "Test API",
+            "Test API Description",
+            "Test Summary",
+            "1.0",
+            as_modules=True,
+        )
+        self.assertNotIn("cache_get", result["foo"])
+
+        result = cli_rust.generate(
+            "test_pkg",
+            "test_pkg::apis",
+            rsrc_data,
+            "Test API",
+            "Test API Description",
+            "Test Summary",
+            "1.0",
+            as_modules=True,
+            cache={"ttl": 60, "max_size": 1024},
+        )
+        rust_code = result["foo"]
+        self.assertIn("Duration::from_secs(60);", rust_code)
+        self.assertIn("const CACHE_MAX_SIZE: u64 = 1024;", rust_code)
+        self.assertIn('Some(home.join("test_pkg"))', rust_code)
+        self.assertEqual(rust_code.count("pub no_cache: bool,"), 2)
+        self.assertEqual(rust_code.count("if let Some(body) = cache_get(&cache_key) {"), 2)
+        self.assertEqual(rust_code.count("cache_put(&cache_key, &json_output);"), 2)
+        self.assertEqual(rust_code.count("cache_invalidate();"), 2)
+
+        # Only the read commands get the flags
+        rsrc_data[0]["schema"]["items"]["properties"]["refresh"] = {"type": "string"}
+        cli_rust.generate(
+            "test_pkg",
+            "test_pkg::apis",
+            rsrc_data,
+            "Test API",
+            "Desc",
+            "Summary",
+            "1.0",
+            cache={"ttl": 60, "max_size": 1024},
+        )
+        rsrc_data[0]["schema"]["query_params"] = [{"name": "refresh", "methods": ["get"]}]
+        with self.assertRaisesRegex(names.NameCollision, "of the 'foo' list command"):
+            cli_rust.generate(
+                "test_pkg",
+                "test_pkg::apis",
+                rsrc_data,
+                "Test API",
+                "Desc",
+                "Summary",
+                "1.0",
+                cache={"ttl": 60, "max_size": 1024},
+            )
+
+    def test_generation_multi_key(self):
+        """Test that the get and delete commands take many keys, run concurrently."""
+        rsrc_data = [fixtures.get_rsrc(methods={})]
+        result = cli_rust.generate(
+            "test_pkg",
+            "test_pkg::apis",
+            rsrc_data,
+            "Test API",
+            "Test API Description",
+            "Test Summary",
+            "1.0",
+            as_modules=True,
+        )
+        rust_code = result["foo"]
+        self.assertEqual(rust_code.count("pub foo_key: Vec<String>,"), 2)
+        self.assertEqual(rust_code.count("pub keys_from: Option<String>,"), 2)
+        self.assertIn("async fn fetch_foo_foo_key_get(", rust_code)
+        self.assertIn("async fn fetch_foo_foo_key_delete(", rust_code)
+        self.assertEqual(rust_code.count("return run_each(keys, args.concurrency, |key|"), 2)
+        self.assertIn(".buffer_unordered(concurrency.max(1));", rust_code)
+        # The error responses are recorded as the Python CLI does
+        self.assertIn(
+            'serde_json::json!({"status": resp.status, "reason": resp.reason, "body": resp.body})',
+            rust_code,
+        )
+        self.assertIn(".await.map_err(api_error)?;", rust_code)
+        self.assertIn("Err(e) => Err(api_error(e)),", rust_code)
+
+        rsrc_data[0]["schema"]["query_params"] = [{"name": "concurrency", "methods": ["get"]}]
+        with self.assertRaisesRegex(names.NameCollision, "of the 'foo' get command"):
+            cli_rust.generate(
+                "test_pkg",
+                "test_pkg::apis",
+                rsrc_data,
+                "Test API",
+                "Desc",
+                "Summary",
+                "1.0",
+            )
+
+    def test_generation_batch(self):
+        """Test that every resource gets a batch command, driven concurrently from stdin."""
+        rsrc_data = [fixtures.get_rsrc(methods={"resource": ["get"], "instance": ["get"]})]
+        args = (
+            "test_pkg",
+            "test_pkg::apis",
+            rsrc_data,
+            "Test API",
+            "Description",
+            "Summary",
+            "1.0",
+        )
+        rust_code = cli_rust.generate(*args)
+        self.assertIn("max_idle_connections: usize,", rust_code)
+        self.assertIn(".pool_max_idle_per_host(cli.max_idle_connections)", rust_code)
+        self.assertIn("builder = http2_prior_knowledge(builder)?;", rust_code)
+        # Only built with reqwest's http2 feature, which the example client turns off
+        self.assertIn(
+            '#[cfg(feature = "http2")]\nfn http2_prior_knowledge(builder: reqwest::ClientBuilder)',
+            rust_code,
+        )
+        self.assertEqual(rust_code.count("builder.http2_prior_knowledge()"), 1)
+        self.assertIn(".timeout(std::time::Duration::from_secs(cli.timeout))", rust_code)
+        self.assertIn("run_batch(cli.concurrency, |argv| async move {", rust_code)
+        self.assertIn(".buffer_unordered(concurrency.max(1));", rust_code)
+        self.assertIn("FooCommands::Batch => Err(", rust_code)
+
+        rust_code = cli_rust.generate(*args, as_modules=True)["foo"]
+        self.assertIn("Batch(BatchArgs),", rust_code)
+        self.assertIn("run_batch(args.concurrency, |argv| async move {", rust_code)
+        self.assertIn("let line = FooBatchLine::try_parse_from(argv)?;", rust_code)
+        self.assertIn("async fn run_foo_command(", rust_code)
+
+    def test_generation_paginated_list(self):
+        """Test that list handlers with limit and offset params stream every page."""
+        rsrc_data = [
+            fixtures.get_rsrc(
+                default_query_params=[
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                    {"name": "offset", "in": "query", "schema": {"type": "integer"}},
+                ],
+                methods={"resource": ["get"]},
+            )
+        ]
+        args = (
+            "test_pkg",
+            "test_pkg::apis",
+            rsrc_data,
+            "Test API",
+            "Description",
+            "Summary",
+            "1.0",
+        )
+        rust_code = cli_rust.generate(*args, as_modules=True)["foo"]
+        self.assertIn("const PAGE_SIZE: i32 = 100;", rust_code)
+        self.assertIn(
+            "let fetch = |limit: i32, offset: i32| crate::apis::foo_api::foo_get("
+            "&ctx.api_client, Some(limit), Some(offset));",
+            rust_code,
+        )
+        self.assertIn("std::io::BufWriter::new(stdout.lock())", rust_code)
+        self.assertIn("tokio::join!(fetch(page_size, offset), write)", rust_code)
+        # A page shorter than page_size is not the last when the server caps the limit
+        self.assertIn(
+            "let more = limit_param.is_none() && !page.is_empty() && page.len() == full_page;",
+            rust_code,
+        )
+        # A JSON array by default, NDJSON only with --output ndjson
+        self.assertIn(
+            "default_value_t = OutputFormat::Json)]\n    pub output: OutputFormat,", rust_code
+        )
+        self.assertIn("let ndjson = args.output == OutputFormat::Ndjson;", rust_code)
+        # Piping to head closes stdout, which stops the listing rather than failing it
+        self.assertIn("e.kind() == std::io::ErrorKind::BrokenPipe", rust_code)
+        self.assertEqual(rust_code.count("if stdout_closed(&written) {"), 2)
+
+        rsrc_data[0]["schema"]["query_params"] = [{"name": "output", "methods": ["get"]}]
+        with self.assertRaisesRegex(names.NameCollision, "--output flag of the 'foo' list command"):
+            cli_rust.generate(*args, as_modules=True)
+        del rsrc_data[0]["schema"]["query_params"]
+
+        del rsrc_data[0]["default_query_params"]
+        rust_code = cli_rust.generate(*args, as_modules=True)["foo"]
+        self.assertNotIn("PAGE_SIZE", rust_code)
+        self.assertNotIn("stdout_closed", rust_code)
+        self.assertNotIn("use std::io::Write;", rust_code)
+
+    def test_generation_name_collision(self):
+        """Test properties converting to the same Rust identifier fail generation."""
+        rsrc_data = [fixtures.get_rsrc(methods={"resource": ["post"]})]
+        rsrc_data[0]["schema"]["items"]["properties"] = {
+            "first-name": {"type": "string"},
+            "first_name": {"type": "string"},
+        }
+        with self.assertRaisesRegex(names.NameCollision, "in the 'foo' create command"):
+            cli_rust.generate(
+                "test_pkg", "test_pkg::apis", rsrc_data, "Test API", "Desc", "Summary", "1.0"
+            )
+
+    def test_generation_cargo_features(self):
+        """Test that each resource module can be gated behind a cargo feature."""
         rsrc_data = [
             {
-                "kind": "foo",
+                "kind": kind,
                 "apiVersion": "v1",
                 "schema": {
                     "type": "array",
-                    "key": {"name": "foo_key", "schema": {"type": "string"}},
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string"},
-                        },
-                    },
-                },
-                "methods": {
-                    "resource": ["get", "post"],
-                    "instance": ["get", "put", "delete"],
+                    "key": {"name": f"{kind}_key", "schema": {"type": "string"}},
+                    "items": {"type": "object", "properties": {"name": {"type": "string"}}},
                 },
+                "methods": {"resource": ["get"]},
             }
+            for kind in ["foo", "bar"]
         ]
-        result = cli_rust.generate(
+        args = (
             "test_pkg",
             "test_pkg::apis",
             rsrc_data,
             "Test API",
-            "Test API Description",
-            "Test Summary",
+            "Description",
+            "Summary",
+            "1.0",
+        )
+        result = cli_rust.generate(*args, as_modules=True)
+        self.assertEqual(sorted(result), ["bar", "foo"])
+
+        result = cli_rust.generate(*args, as_modules=True, cargo_features=True)
+        self.assertEqual(sorted(result), ["bar", "features.toml", "foo", "mod"])
+        self.assertIn('#[cfg(feature = "foo")]\npub mod foo;', result["mod"])
+        self.assertIn("Bar(bar::BarCommands),", result["mod"])
+        self.assertIn("foo::handle_foo_command(&ctx, cmd).await", result["mod"])
+        self.assertTrue(
+            result["features.toml"].endswith('default = ["bar", "foo"]\nbar = []\nfoo = []\n')
+        )
+        self.assertIn("--features native-tls,<resource>,...", result["features.toml"])
+
+
+# The example client crate, whose APIs and models the generated modules are built against
+EXAMPLE_CRATE = os.path.join(os.path.dirname(__file__), "..", "..", "examples", "addressbook_rs")
+
+CARGO_TOML = """
+[package]
+name = "addressbook_rs"
+version = "1.0.0"
+edition = "2021"
+
+[dependencies]
+clap = { version = "4.4", features = ["derive", "env"] }
+futures = "0.3"
+log = "0.4"
+reqwest = { version = "^0.12", default-features = false, features = ["json"] }
+serde = { version = "^1.0", features = ["derive"] }
+serde_json = "^1.0"
+serde_with = { version = "^3.8", default-features = false, features = ["std", "macros"] }
+tokio = { version = "1.35", features = ["full"] }
+url = "^2.5"
+"""
+
+MAIN_RS = """
+#![allow(dead_code)]
+pub mod apis;
+pub mod models;
+mod cli;
+
+fn main() {}
+"""
+
+
+@unittest.skipUnless(shutil.which("cargo"), "cargo is not installed")
+class TestCliRustBuild(unittest.TestCase):
+    """Test the modules of firestone.spec.cli_rust.generate build against a generated client"""
+
+    def test_build(self):
+        """Test the persons module, with every option turned on, type checks."""
+        example = os.path.join(EXAMPLE_CRATE, "..", "addressbook", "person.yaml")
+        rsrc_data = firestone_rsrc.get_resource_schema(os.path.abspath(example))
+        rsrc_data["rate_limit"] = {"limit": 10}
+        modules = cli_rust.generate(
+            "addressbook_rs",
+            "addressbook_rs",
+            [rsrc_data],
+            "Addressbook API",
+            "Example person and addressbook API",
+            "Summary",
             "1.0",
             as_modules=True,
+            cache={"ttl": 60, "max_size": 1024},
         )
-        rust_code = result["foo"]
-        # Check for command enum
-        self.assertIn("#[derive(Subcommand, Debug)]", rust_code)
-        self.assertIn("pub enum FooCommands", rust_code)
+
+        with tempfile.TemporaryDirectory() as crate:
+            for name in ("apis", "models"):
+                shutil.copytree(
+                    os.path.join(EXAMPLE_CRATE, "src", name), os.path.join(crate, "src", name)
+                )
+            os.makedirs(os.path.join(crate, "src", "cli"))
+            files = {"Cargo.toml": CARGO_TOML, "src/main.rs": MAIN_RS}
+            files["src/cli/mod.rs"] = "".join(f"pub mod {name};\n" for name in modules)
+            for name, code in modules.items():
+                files[f"src/cli/{name}.rs"] = code
+            for filename, content in files.items():
+                with open(os.path.join(crate, filename), "w", encoding="utf-8") as fh:
+                    fh.write(content)
+
+            result = subprocess.run(
+                ["cargo", "check", "--quiet"],
+                cwd=crate,
+                capture_output=True,
+                check=False,
+                encoding="utf-8",
+            )
+        if result.returncode and "error[" not in result.stderr:
+            self.skipTest(f"the crates could not be fetched: {result.stderr.strip()}")
+        self.assertEqual(result.returncode, 0, result.stderr)
 
 
 if __name__ == "__main__":
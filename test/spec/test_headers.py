@@ -0,0 +1,116 @@
+"""
+Test the firestone.spec._headers module.
+"""
+
+import unittest
+
+from firestone.spec import _headers as spec_headers
+
+
+# pylint: disable=duplicate-code
+class TestHeadersAddCompression(unittest.TestCase):
+    """Test all aspects of firestone.spec._headers.add_compression"""
+
+    def _paths(self):
+        return {
+            "/foo": {
+                "get": {"responses": {"200": {"content": {"application/json": {}}}}},
+                "post": {
+                    "requestBody": {"content": {"application/json": {}}},
+                    "responses": {"201": {"content": {"application/json": {}}}},
+                },
+            },
+            "/foo/{foo_key}": {
+                "delete": {"responses": {"204": {"description": "Deleted"}}},
+            },
+        }
+
+    def test_response_headers(self):
+        """Test responses with a body document Content-Encoding and Vary."""
+        components = {}
+        paths = spec_headers.add_compression(
+            self._paths(), components, {"encodings": ["gzip", "br"]}
+        )
+
+        self.assertEqual(
+            components["headers"]["Content-Encoding"]["schema"]["enum"], ["gzip", "br"]
+        )
+        self.assertIn("Vary", components["headers"])
+        self.assertEqual(
+            paths["/foo"]["get"]["responses"]["200"]["headers"]["Content-Encoding"],
+            {"$ref": "#/components/headers/Content-Encoding"},
+        )
+        self.assertNotIn("headers", paths["/foo/{foo_key}"]["delete"]["responses"]["204"])
+        self.assertNotIn("x-content-encoding", paths["/foo"]["post"]["requestBody"])
+
+    def test_request_min_size(self):
+        """Test request bodies are marked compressible over the minimum size."""
+        paths = spec_headers.add_compression(
+            self._paths(), {}, {"encodings": ["gzip"], "request_min_size": 1024}
+        )
+
+        self.assertEqual(
+            paths["/foo"]["post"]["requestBody"]["x-content-encoding"],
+            {"encodings": ["gzip"], "minSize": 1024},
+        )
+
+    def test_no_encodings(self):
+        """Test nothing is added without any encodings."""
+        components = {}
+        paths = spec_headers.add_compression(self._paths(), components, {"encodings": []})
+
+        self.assertEqual(components, {})
+        self.assertEqual(paths, self._paths())
+
+
+class TestHeadersAddRateLimit(unittest.TestCase):
+    """Test all aspects of firestone.spec._headers.add_rate_limit"""
+
+    def test_rate_limit(self):
+        """Test the rate limit headers and responses are added to every operation."""
+        components = {}
+        paths = spec_headers.add_rate_limit(
+            {
+                "/foo": {
+                    "get": {"responses": {200: {"content": {"application/json": {}}}}},
+                    "head": {"responses": {"default": {"description": "HEAD"}}},
+                },
+            },
+            components,
+            {"limit": 10},
+        )
+
+        self.assertIn("Retry-After", components["headers"])
+        self.assertIn("RateLimit-Remaining", components["headers"])
+        self.assertEqual(
+            components["responses"]["ServiceUnavailable"]["headers"],
+            {"Retry-After": {"$ref": "#/components/headers/Retry-After"}},
+        )
+        for opr in paths["/foo"].values():
+            self.assertEqual(
+                opr["responses"][429], {"$ref": "#/components/responses/TooManyRequests"}
+            )
+            self.assertEqual(
+                opr["responses"][503], {"$ref": "#/components/responses/ServiceUnavailable"}
+            )
+            self.assertEqual(opr["x-rate-limit"], {"limit": 10, "window": 1})
+
+        self.assertIn("RateLimit-Limit", paths["/foo"]["get"]["responses"][200]["headers"])
+
+    def test_with_compression(self):
+        """Test compression keeps the rate limit response headers."""
+        components = {}
+        paths = spec_headers.add_rate_limit(
+            {"/foo": {"get": {"responses": {200: {"content": {"application/json": {}}}}}}},
+            components,
+            {"limit": 10, "window": 60},
+        )
+        paths = spec_headers.add_compression(paths, components, {"encodings": ["gzip"]})
+
+        headers = paths["/foo"]["get"]["responses"][200]["headers"]
+        self.assertIn("RateLimit-Reset", headers)
+        self.assertIn("Content-Encoding", headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
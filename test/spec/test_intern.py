@@ -0,0 +1,162 @@
+"""
+Test the firestone.spec._intern module.
+"""
+
+import copy
+import json
+import unittest
+
+from firestone.spec import _intern as spec_intern
+from firestone.spec import openapi
+
+
+# pylint: disable=duplicate-code
+class TestInternSchemas(unittest.TestCase):
+    """Test all aspects of firestone.spec._intern.intern_schemas"""
+
+    ADDRESS = {
+        "type": "object",
+        "properties": {
+            "street": {"type": "string", "description": "The street of the address"},
+            "city": {"type": "string", "description": "The city of the address"},
+        },
+    }
+
+    def _paths(self):
+        """Get paths with the same address schema inlined as distinct copies."""
+        person = {
+            "type": "object",
+            "properties": {"name": {"type": "string"}, "address": copy.deepcopy(self.ADDRESS)},
+        }
+        return {
+            "/persons": {
+                "get": {
+                    "operationId": "persons_get",
+                    "responses": {
+                        "200": {
+                            "content": {
+                                "application/json": {
+                                    "schema": {"type": "array", "items": copy.deepcopy(person)}
+                                }
+                            }
+                        }
+                    },
+                },
+            },
+            "/persons/{person_key}/address": {
+                "get": {
+                    "operationId": "persons_person_key_address_get",
+                    "responses": {
+                        "200": {
+                            "content": {"application/json": {"schema": copy.deepcopy(self.ADDRESS)}}
+                        }
+                    },
+                },
+                "put": {
+                    "operationId": "persons_person_key_address_put",
+                    "requestBody": {
+                        "content": {"application/json": {"schema": copy.deepcopy(self.ADDRESS)}}
+                    },
+                    "responses": {"200": {"description": "OK"}},
+                },
+            },
+        }
+
+    def test_intern(self):
+        """Test repeated schemas are hoisted into a component named after the property."""
+        paths = self._paths()
+        components = {"schemas": {}}
+        report = spec_intern.intern_schemas(paths, components, min_size=64)
+
+        ref = {"$ref": "#/components/schemas/address"}
+        self.assertEqual(components["schemas"], {"address": self.ADDRESS})
+        address_path = paths["/persons/{person_key}/address"]
+        self.assertEqual(
+            address_path["get"]["responses"]["200"]["content"]["application/json"]["schema"], ref
+        )
+        self.assertEqual(
+            address_path["put"]["requestBody"]["content"]["application/json"]["schema"], ref
+        )
+        items = paths["/persons"]["get"]["responses"]["200"]["content"]["application/json"][
+            "schema"
+        ]["items"]
+        self.assertEqual(items["properties"]["address"], ref)
+        self.assertEqual(items["properties"]["name"], {"type": "string"})
+
+        self.assertEqual(report["schemas"], 1)
+        self.assertEqual(report["refs"], 3)
+        size = len(json.dumps(self.ADDRESS, sort_keys=True))
+        self.assertEqual(report["bytes_saved"], 2 * size - 3 * len(json.dumps(ref)))
+
+    def test_existing_component(self):
+        """Test schemas equal to an existing component refer to it, with a unique name otherwise."""
+        components = {"schemas": {"location": copy.deepcopy(self.ADDRESS), "address": {}}}
+        paths = self._paths()
+        report = spec_intern.intern_schemas(paths, components, min_size=64)
+        self.assertEqual(report["schemas"], 0)
+        address_path = paths["/persons/{person_key}/address"]
+        self.assertEqual(
+            address_path["get"]["responses"]["200"]["content"]["application/json"]["schema"],
+            {"$ref": "#/components/schemas/location"},
+        )
+
+        del components["schemas"]["location"]
+        paths = self._paths()
+        spec_intern.intern_schemas(paths, components, min_size=64)
+        self.assertEqual(len(components["schemas"]), 2)
+        self.assertTrue(any(name.startswith("address_") for name in components["schemas"]))
+
+    def test_min_size(self):
+        """Test schemas smaller than the minimum size stay inline."""
+        paths = self._paths()
+        components = {"schemas": {}}
+        report = spec_intern.intern_schemas(paths, components, min_size=1024)
+        self.assertEqual(report, {"schemas": 0, "refs": 0, "bytes_saved": 0})
+        self.assertEqual(paths, self._paths())
+
+
+class TestOpenAPIGenerateDedup(unittest.TestCase):
+    """Test firestone.spec.openapi.generate interning repeated schemas"""
+
+    def test_dedup_schemas(self):
+        """Test repeated inline schemas are interned without changing the resource."""
+        address = {
+            "type": "object",
+            "properties": {
+                field: {"type": "string", "description": f"The {field} of the address"}
+                for field in ["street", "city", "country"]
+            },
+        }
+        rsrc = {
+            "kind": "foo",
+            "apiVersion": "1.0",
+            "methods": {"resource": ["get"], "instance_attrs": ["get", "put"]},
+            "schema": {
+                "type": "array",
+                "key": {"name": "foo_key", "schema": {"type": "string"}},
+                "items": {
+                    "type": "object",
+                    "properties": {"home": copy.deepcopy(address), "work": copy.deepcopy(address)},
+                },
+            },
+        }
+        orig_rsrc = copy.deepcopy(rsrc)
+        report = {}
+        spec = openapi.generate(
+            [rsrc],
+            "Foo API",
+            "Some Foo API",
+            "Summary",
+            "1.0",
+            dedup_schemas=True,
+            dedup_report=report,
+        )
+        self.assertEqual(rsrc, orig_rsrc)
+        self.assertEqual(report["schemas"], 1)
+        self.assertGreater(report["bytes_saved"], 0)
+        self.assertIn("$ref: '#/components/schemas/home'", spec)
+        self.assertNotIn("The street of the address", spec.split("paths:")[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
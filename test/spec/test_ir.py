@@ -0,0 +1,96 @@
+"""
+Test the firestone.spec._ir module.
+"""
+
+import copy
+import unittest
+from unittest import mock
+
+from firestone.spec import _base as spec_base
+from firestone.spec import _ir as ir
+
+from . import fixtures
+
+RSRC = fixtures.get_rsrc(
+    versionInPath=True, descriptions={"resource": {"get": "List all the foos"}}
+)
+RSRC["schema"]["query_params"] = [
+    {"name": "limit", "schema": {"type": "integer"}, "methods": ["get"]},
+    {"name": "offset", "schema": {"type": "integer"}, "methods": ["get"]},
+]
+RSRC["schema"]["items"]["required"] = ["name"]
+
+
+# pylint: disable=duplicate-code
+class TestIRGetOpName(unittest.TestCase):
+    """Test all aspects of firestone.spec._ir.get_op_name"""
+
+    def test_op_names(self):
+        """Test the operation name of each HTTP method."""
+        self.assertEqual(ir.get_op_name("get", True), "list")
+        self.assertEqual(ir.get_op_name("get", False), "get")
+        self.assertEqual(ir.get_op_name("post", True), "create")
+        self.assertEqual(ir.get_op_name("put", False), "update")
+        self.assertEqual(ir.get_op_name("patch", False), "update")
+        self.assertEqual(ir.get_op_name("delete", False), "delete")
+        self.assertIsNone(ir.get_op_name("head", False))
+
+
+class TestIRResource(unittest.TestCase):
+    """Test all aspects of firestone.spec._ir.Resource"""
+
+    def test_resource(self):
+        """Test the resource and its operations."""
+        rsrc = ir.Resource(copy.deepcopy(RSRC))
+        self.assertEqual(rsrc.baseurl, "/vv1/foo")
+        self.assertEqual(rsrc.instance_baseurl, "/vv1/foo/{foo_key}")
+        self.assertEqual(rsrc.key_names, ["foo_key"])
+        self.assertEqual([op.name for op in rsrc.resource_ops], ["list", "create"])
+        self.assertEqual([op.name for op in rsrc.instance_ops], ["delete", "get", "update"])
+
+        list_op = rsrc.get_op("list")
+        self.assertEqual(list_op.id, "vv1_foo_get")
+        self.assertEqual(list_op.description, "List all the foos")
+        self.assertEqual([param.name for param in list_op.query_params], ["limit", "offset"])
+        self.assertTrue(list_op.paginated)
+        self.assertEqual(list_op.attrs, ())
+
+        create_op = rsrc.get_op("create")
+        self.assertEqual([attr.name for attr in create_op.attrs], ["foo_key", "name"])
+        self.assertEqual(create_op.required, ["name"])
+        self.assertTrue(create_op.attrs[0].is_key)
+
+        update_op = rsrc.get_op("update", level="instance")
+        self.assertEqual(update_op.description, "Update operation for foo")
+        self.assertEqual(update_op.required, [])
+        self.assertEqual([param.location for param in update_op.params], ["path"])
+        self.assertTrue(rsrc.get_op("delete", level="instance").is_delete)
+        self.assertIsNone(rsrc.get_op("delete"))
+        self.assertEqual([op.name for op in rsrc.operations if op.multi_key], ["delete", "get"])
+
+    def test_missing_key(self):
+        """Test a resource array without a key is rejected."""
+        rsrc = copy.deepcopy(RSRC)
+        del rsrc["schema"]["key"]
+        with self.assertRaises(spec_base.SchemaMissingAttribute):
+            ir.Resource(rsrc)
+
+    @mock.patch("firestone.spec._ir.spec_openapi.get_params", return_value=[])
+    def test_params_once(self, get_params_mock):
+        """Test the params are only computed once per operation."""
+        rsrc = ir.Resource(copy.deepcopy(RSRC))
+        for _ in range(3):
+            for op in rsrc.operations:
+                _ = op.query_params, op.paginated, op.param_specs
+        self.assertEqual(get_params_mock.call_count, len(rsrc.operations))
+
+    def test_views_memoized(self):
+        """Test the derived views are computed on first access only."""
+        op = ir.Resource(copy.deepcopy(RSRC)).get_op("list")
+        self.assertNotIn("query_params", vars(op))
+        self.assertIs(op.query_params, op.query_params)
+        self.assertIn("query_params", vars(op))
+
+
+if __name__ == "__main__":
+    unittest.main()
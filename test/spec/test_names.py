@@ -0,0 +1,64 @@
+"""
+Test the firestone.spec._names module.
+"""
+
+import unittest
+
+from firestone.spec import _names as names
+
+
+class TestNamesConversions(unittest.TestCase):
+    """Test all aspects of the firestone.spec._names conversions"""
+
+    def test_to_snake_case(self):
+        """Test Rust identifiers are snake_case and keywords are escaped."""
+        self.assertEqual(names.to_snake_case("first-name"), "first_name")
+        self.assertEqual(names.to_snake_case("postal code"), "postal_code")
+        self.assertEqual(names.to_snake_case("type"), "r#type")
+        self.assertEqual(names.to_snake_case("loop"), "r#loop")
+
+    def test_to_pascal_case(self):
+        """Test names are converted to PascalCase."""
+        self.assertEqual(names.to_pascal_case("admin-roles"), "AdminRoles")
+        self.assertEqual(names.to_pascal_case("postal_codes"), "PostalCodes")
+        self.assertEqual(names.to_pascal_case("work"), "Work")
+
+    def test_to_upper_snake_case(self):
+        """Test names are converted to UPPER_SNAKE_CASE."""
+        self.assertEqual(names.to_upper_snake_case("read-write"), "READ_WRITE")
+        self.assertEqual(names.to_upper_snake_case("read only"), "READ_ONLY")
+
+    def test_to_python_name(self):
+        """Test Python identifiers replace dashes and escape keywords."""
+        self.assertEqual(names.to_python_name("first-name"), "first_name")
+        self.assertEqual(names.to_python_name("class"), "class_")
+
+    def test_memoized(self):
+        """Test conversions are only computed once per name."""
+        names.to_pascal_case.cache_clear()
+        names.to_pascal_case("foo-bar")
+        names.to_pascal_case("foo-bar")
+        self.assertEqual(names.to_pascal_case.cache_info().hits, 1)
+
+
+class TestNamesCheckCollisions(unittest.TestCase):
+    """Test all aspects of firestone.spec._names.check_collisions"""
+
+    def test_no_collisions(self):
+        """Test the identifier of each name is returned, repeated names being allowed."""
+        idents = names.check_collisions(
+            ["first-name", "last-name", "first-name"], names.to_snake_case, "persons"
+        )
+        self.assertEqual(idents, {"first-name": "first_name", "last-name": "last_name"})
+
+    def test_collision(self):
+        """Test different names converting to the same identifier are reported."""
+        with self.assertRaisesRegex(
+            names.NameCollision,
+            "'first-name' and 'first_name' both convert to 'first_name' in persons",
+        ):
+            names.check_collisions(["first-name", "first_name"], names.to_snake_case, "persons")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -99,6 +99,39 @@ class TestOpenAPIGetResponses(unittest.TestCase):
             {"type": "object", "properties": {"foo": {"type": "string"}}},
         )
 
+    def test_get_is_list_streaming(self):
+        """Test firestone.spec.openapi.get_responses() 'get' list with streaming=True."""
+        responses = openapi.get_responses(
+            "get",
+            {"type": "object", "properties": {"foo": {"type": "string"}}},
+            "application/json",
+            comp_name="bar",
+            is_list=True,
+            streaming=True,
+        )
+
+        content = responses[http.client.OK]["content"]
+        self.assertEqual(
+            content["application/json"]["schema"],
+            {"type": "array", "items": {"$ref": "#/components/schemas/bar"}},
+        )
+        self.assertEqual(
+            content["application/x-ndjson"]["schema"],
+            {"$ref": "#/components/schemas/bar"},
+        )
+
+    def test_get_not_list_streaming(self):
+        """Test firestone.spec.openapi.get_responses() 'get' instance ignores streaming."""
+        responses = openapi.get_responses(
+            "get",
+            {"type": "object", "properties": {"foo": {"type": "string"}}},
+            "application/json",
+            comp_name="bar",
+            streaming=True,
+        )
+
+        self.assertNotIn("application/x-ndjson", responses[http.client.OK]["content"])
+
 
 class TestOpenAPIGetMethodOp(unittest.TestCase):
     """Test all aspects of firestone.spec.openapi.get_method_op"""
@@ -124,6 +157,7 @@ class TestOpenAPIGetMethodOp(unittest.TestCase):
             comp_name=None,
             attr_name=None,
             is_list=None,
+            streaming=None,
         )
 
     @mock.patch("firestone.spec.openapi.get_responses", return_value={})
@@ -614,7 +648,7 @@ class TestOpenAPIAddInstanceAttrMethods(unittest.TestCase):
     @mock.patch("firestone.spec.openapi.get_method_op", return_value={})
     @mock.patch("firestone.spec.openapi.get_params", return_value=[])
     @mock.patch("firestone.spec.openapi.get_paths")
-    def test_with_items(self, _paths_mock, _params_mock, _method_op_mock):
+    def test_with_items(self, paths_mock, _params_mock, _method_op_mock):
         """Test with items, i.e. sub-resoure."""
         paths = {}
         openapi.add_instance_attr_methods(
@@ -647,10 +681,37 @@ class TestOpenAPIAddInstanceAttrMethods(unittest.TestCase):
 
         self.assertIsNotNone(paths)
         self.assertIsInstance(paths["/foo/{foo_key}/bar"], dict)
-        self.assertIsInstance(paths["/foo/{foo_key}/foobar"], dict)
-
         self.assertIn("get", paths["/foo/{foo_key}/bar"])
-        self.assertIn("get", paths["/foo/{foo_key}/foobar"])
+
+        # The sub-resource is expanded once, for all the methods
+        paths_mock.assert_called_once()
+        self.assertEqual(paths_mock.call_args.args[0], "foobar")
+        self.assertEqual(paths_mock.call_args.args[2], "/foo/{foo_key}/foobar")
+
+    def test_nested_expanded_once(self):
+        """Test each level of nested sub-resources is expanded exactly once."""
+
+        def nested(level, depth):
+            props = {f"l{level}_key": {"type": "string"}, "name": {"type": "string"}}
+            if level < depth:
+                props[f"l{level + 1}s"] = {"schema": nested(level + 1, depth)}
+            return {
+                "type": "array",
+                "key": {"name": f"l{level}_key", "schema": {"type": "string"}},
+                "methods": {"resource": ["get", "post"], "instance_attrs": ["get", "put"]},
+                "items": {"type": "object", "properties": props},
+            }
+
+        rsrc = {"kind": "l1s", "apiVersion": "v1", "schema": nested(1, 4)}
+        rsrc["methods"] = rsrc["schema"]["methods"]
+        with mock.patch("firestone.spec.openapi.get_paths", wraps=openapi.get_paths) as paths_mock:
+            spec = openapi.generate([rsrc], "Title", "Description", "Summary", "1.0")
+
+        self.assertEqual(paths_mock.call_count, 4)
+        path = "/l1s/{l1_key}/l2s/{l2_key}/l3s/{l3_key}/l4s"
+        self.assertIn(f"  {path}:", spec)
+        self.assertIn(f"  {path}/{{l4_key}}/name:", spec)
+        self.assertIn("$ref: '#/components/schemas/l4s'", spec)
 
 
 class TestOpenAPIGetPaths(unittest.TestCase):
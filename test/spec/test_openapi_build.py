@@ -0,0 +1,115 @@
+"""
+Test the firestone.spec.openapi module's spec dicts and split documents.
+"""
+
+import copy
+import unittest
+
+import yaml
+
+import firestone
+from firestone.spec import openapi
+
+
+# pylint: disable=duplicate-code
+class TestOpenAPIGetUsedComponents(unittest.TestCase):
+    """Test all aspects of firestone.spec.openapi.get_used_components"""
+
+    def test_used(self):
+        """Test only the components referenced, directly or not, are used."""
+        components = {
+            "schemas": {
+                "foo": {"properties": {"bar": {"$ref": "#/components/schemas/bar"}}},
+                "bar": {"type": "string"},
+                "baz": {"type": "string"},
+            },
+            "headers": {"ETag": {"schema": {"type": "string"}}},
+            "securitySchemes": {"bearer": {"type": "http"}},
+        }
+        paths = {"/foo": {"get": {"schema": {"$ref": "#/components/schemas/foo"}}}}
+
+        self.assertEqual(
+            openapi.get_used_components(paths, components),
+            {
+                "schemas": {"bar": {"type": "string"}, "foo": components["schemas"]["foo"]},
+                "securitySchemes": {"bearer": {"type": "http"}},
+            },
+        )
+
+    def test_path_ref(self):
+        """Test a path item is referenced with an escaped JSON pointer."""
+        self.assertEqual(
+            openapi.get_path_ref("foo.yaml", "/foo/{foo_key}"),
+            {"$ref": "foo.yaml#/paths/~1foo~1%7Bfoo_key%7D"},
+        )
+
+
+class TestOpenAPIBuild(unittest.TestCase):
+    """Test all aspects of firestone.spec.openapi.build"""
+
+    RSRC = {
+        "kind": "foo",
+        "apiVersion": "1.0",
+        "methods": {"resource": ["get"], "instance": ["get"], "instance_attrs": ["get"]},
+        "schema": {
+            "type": "array",
+            "key": {"name": "foo_key", "schema": {"type": "string"}},
+            "items": {"type": "object", "properties": {"bar": {"type": "string"}}},
+        },
+    }
+
+    def test_build(self):
+        """Test the spec is built as a dict, rendered to the spec generated."""
+        args = ("Foo API", "Some Foo API", "Summary", "1.0")
+        doc = firestone.build_openapi([copy.deepcopy(self.RSRC)], *args, prefix="/api")
+
+        self.assertEqual(doc["openapi"], openapi.DEFAULT_VERSION)
+        self.assertEqual(doc["info"]["title"], "Foo API")
+        self.assertEqual(doc["servers"], [{"url": "/api"}])
+        self.assertEqual(list(doc["paths"]), ["/foo", "/foo/{foo_key}", "/foo/{foo_key}/bar"])
+        self.assertEqual(
+            firestone.render_openapi(doc),
+            openapi.generate([copy.deepcopy(self.RSRC)], *args, prefix="/api"),
+        )
+
+
+class TestOpenAPIGenerateSplit(unittest.TestCase):
+    """Test firestone.spec.openapi.generate splitting a document per resource"""
+
+    def test_split(self):
+        """Test a document is generated for each resource, and a root referencing their paths."""
+        rsrcs = [
+            {
+                "kind": kind,
+                "apiVersion": "1.0",
+                "methods": {"resource": ["get"], "instance": ["get"], "instance_attrs": []},
+                "schema": {
+                    "type": "array",
+                    "key": {"name": f"{kind}_key", "schema": {"type": "string"}},
+                    "items": {"type": "object", "properties": {"bar": {"type": "string"}}},
+                },
+            }
+            for kind in ["foo", "baz"]
+        ]
+        whole = openapi.generate(copy.deepcopy(rsrcs), "Foo API", "Some Foo API", "Summary", "1.0")
+        docs = openapi.generate(rsrcs, "Foo API", "Some Foo API", "Summary", "1.0", split=True)
+
+        self.assertEqual(sorted(docs), ["baz.yaml", "foo.yaml", openapi.SPLIT_ROOT])
+        docs = {filename: yaml.safe_load(doc) for filename, doc in docs.items()}
+        root = docs[openapi.SPLIT_ROOT]
+        self.assertNotIn("components", root)
+        self.assertEqual(
+            root["paths"]["/foo/{foo_key}"], {"$ref": "foo.yaml#/paths/~1foo~1%7Bfoo_key%7D"}
+        )
+        self.assertEqual(list(docs["foo.yaml"]["components"]["schemas"]), ["foo"])
+        self.assertEqual(list(docs["foo.yaml"]["paths"]), ["/foo", "/foo/{foo_key}"])
+
+        whole = yaml.safe_load(whole)
+        self.assertEqual(list(root["paths"]), list(whole["paths"]))
+        for path in whole["paths"]:
+            filename = "foo.yaml" if path.startswith("/foo") else "baz.yaml"
+            self.assertEqual(docs[filename]["paths"][path], whole["paths"][path])
+
+
+if __name__ == "__main__":
+    unittest.main()
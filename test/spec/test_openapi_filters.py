@@ -0,0 +1,92 @@
+"""
+Test the firestone.spec.openapi module's filter and sort params.
+"""
+
+import unittest
+
+from firestone.spec import openapi
+
+# pylint: disable=duplicate-code
+FILTER_SCHEMA = {
+    "type": "array",
+    "query_params": [
+        {"name": "city", "description": "Filter by city name", "methods": ["get"]},
+    ],
+    "items": {
+        "type": "object",
+        "properties": {
+            "age": {"type": "integer", "filterable": True, "sortable": True},
+            "city": {"type": "string", "filterable": True},
+            "kind": {"type": "string", "enum": ["a", "b"], "filterable": True},
+            "name": {"type": "string", "sortable": True},
+            "tags": {"type": "array", "items": {"type": "string"}, "filterable": True},
+        },
+    },
+}
+
+
+class TestOpenAPIGetFilterParams(unittest.TestCase):
+    """Test all aspects of firestone.spec.openapi.get_filter_params"""
+
+    def test_no_filters(self):
+        """Test no params without filterable or sortable properties."""
+        params = openapi.get_filter_params(
+            {
+                "type": "array",
+                "items": {"type": "object", "properties": {"foo": {"type": "string"}}},
+            }
+        )
+
+        self.assertEqual(params, [])
+
+    def test_filters(self):
+        """Test the filter params for each property type."""
+        params = openapi.get_filter_params(FILTER_SCHEMA)
+        by_name = {param["name"]: param for param in params}
+
+        self.assertEqual(
+            list(by_name),
+            [
+                "age",
+                "age_in",
+                "age_min",
+                "age_max",
+                "city",
+                "city_in",
+                "city_prefix",
+                "kind",
+                "kind_in",
+                "sort",
+                "order",
+            ],
+        )
+        self.assertEqual(by_name["age"]["schema"], {"type": "integer"})
+        self.assertEqual(
+            by_name["age_in"]["schema"], {"type": "array", "items": {"type": "integer"}}
+        )
+        self.assertFalse(by_name["age_in"]["explode"])
+        self.assertEqual(by_name["kind"]["schema"], {"type": "string", "enum": ["a", "b"]})
+        self.assertEqual(by_name["sort"]["schema"], {"type": "string", "enum": ["age", "name"]})
+        self.assertEqual(by_name["order"]["schema"]["enum"], ["asc", "desc"])
+        for param in params:
+            self.assertEqual(param["in"], "query")
+            self.assertFalse(param["required"])
+
+    def test_get_params_list(self):
+        """Test only listing gets filter params, without duplicating query params."""
+        params = openapi.get_params("/foo", "get", FILTER_SCHEMA, is_list=True)
+        names = [param["name"] for param in params]
+
+        self.assertEqual(names.count("city"), 1)
+        self.assertEqual(params[0]["description"], "Filter by city name")
+        self.assertIn("city_prefix", names)
+
+        params = openapi.get_params("/foo", "post", FILTER_SCHEMA, is_list=True)
+        self.assertEqual(params, [])
+
+        params = openapi.get_params("/foo/{foo}", "get", FILTER_SCHEMA)
+        self.assertEqual([param["name"] for param in params], ["city"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+"""
+Test the firestone.spec.streamlit module.
+"""
+
+import copy
+import unittest
+
+import pycodestyle
+
+from firestone.spec import streamlit
+
+from . import fixtures
+
+PAGE_PARAMS = [
+    {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+    {"name": "offset", "in": "query", "schema": {"type": "integer"}},
+]
+
+
+# pylint: disable=duplicate-code
+class TestStreamlitGetQueryWidgets(unittest.TestCase):
+    """Test all aspects of firestone.spec.streamlit.get_query_widgets"""
+
+    def test_widgets(self):
+        """Test each type of query param gets a matching widget."""
+        params = [
+            {"name": "name", "in": "query", "schema": {"type": "string"}},
+            {"name": "age", "in": "query", "schema": {"type": "integer"}},
+            {"name": "active", "in": "query", "schema": {"type": "boolean"}},
+            {"name": "order", "in": "query", "schema": {"type": "string", "enum": ["asc"]}},
+            {
+                "name": "kind_in",
+                "in": "query",
+                "schema": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}},
+            },
+            {"name": "foo_key", "in": "path", "schema": {"type": "string"}},
+        ]
+        widgets = streamlit.get_query_widgets(params)
+
+        self.assertEqual(
+            [(widget["name"], widget["widget"], widget["options"]) for widget in widgets],
+            [
+                ("name", "text_input", None),
+                ("age", "number_input", None),
+                ("active", "selectbox", ["true", "false"]),
+                ("order", "selectbox", ["asc"]),
+                ("kind_in", "multiselect", ["a", "b"]),
+            ],
+        )
+
+    def test_paginated(self):
+        """Test the page params are left to the page controls when paginated."""
+        widgets = streamlit.get_query_widgets(copy.deepcopy(PAGE_PARAMS), paginated=True)
+        self.assertEqual(widgets, [])
+
+        widgets = streamlit.get_query_widgets(copy.deepcopy(PAGE_PARAMS))
+        self.assertEqual([widget["name"] for widget in widgets], ["limit", "offset"])
+
+
+class TestStreamlitGenerate(unittest.TestCase):
+    """Test all aspects of firestone.spec.streamlit.generate"""
+
+    def _generate(self, as_modules=False, rsrc=None, **kwargs):
+        return streamlit.generate(
+            [rsrc or fixtures.get_rsrc()],
+            "Test API",
+            "Test API Description",
+            "Test Summary",
+            "1.0",
+            backend_url="http://localhost",
+            as_modules=as_modules,
+            **kwargs,
+        )
+
+    def test_cache(self):
+        """Test fetched resources are cached for the default TTL."""
+        result = self._generate()
+        self.assertIn("CACHE_TTL = 60", result)
+        self.assertIn("@st.cache_data(ttl=CACHE_TTL, show_spinner=False)", result)
+        self.assertIn("return fetch_resources(self, self.api_url, generation, query)", result)
+        compile(result, "streamlit.py", "exec")
+
+    def test_cache_ttl_as_modules(self):
+        """Test the cache TTL and invalidation of page modules."""
+        result = self._generate(as_modules=True, cache_ttl=300)
+        page = result["foo"]
+        self.assertIn("CACHE_TTL = 300", page)
+        self.assertEqual(page.count("self.invalidate()"), 1)
+        self.assertIn("df = page.get_resources(query)", page)
+        compile(page, "foo.py", "exec")
+
+    def test_change_detection(self):
+        """Test only the rows changed in the editor are dispatched, as one batch."""
+        result = self._generate()
+        self.assertNotIn("dictdiffer", result)
+        self.assertNotIn("iterrows", result)
+        self.assertIn("changes = self.pending_changes(editor_key)", result)
+        self.assertIn("self.update_resources({row[key_name]: row for row in rows})", result)
+        compile(result, "streamlit.py", "exec")
+
+        page = self._generate(as_modules=True)["foo"]
+        self.assertNotIn("print(", page)
+        self.assertIn('page.update_resources({row["foo_key"]: row for row in rows})', page)
+        compile(page, "foo.py", "exec")
+
+    def test_pagination(self):
+        """Test paginated resources only fetch the visible page, filtered and sorted."""
+        rsrc = fixtures.get_rsrc()
+        rsrc["default_query_params"] = copy.deepcopy(PAGE_PARAMS)
+        rsrc["schema"]["items"]["properties"]["name"]["filterable"] = True
+        rsrc["schema"]["items"]["properties"]["name"]["sortable"] = True
+        result = self._generate(rsrc=rsrc)
+        self.assertIn("PAGE_SIZES = [25, 50, 100, 250]", result)
+        self.assertIn(
+            '"name_prefix": self.st.text_input("Name Prefix", key="foo_name_prefix")', result
+        )
+        self.assertIn('"sort": self.st.selectbox("Sort", [None, \'name\'], key="foo_sort")', result)
+        self.assertIn("query = self.page_query(query)", result)
+        self.assertIn("df = self.get_resources(query)", result)
+        compile(result, "streamlit.py", "exec")
+
+        page = self._generate(as_modules=True, rsrc=copy.deepcopy(rsrc))["foo"]
+        self.assertIn("query = page.page_query(query)", page)
+        compile(page, "foo.py", "exec")
+
+        result = self._generate()
+        self.assertNotIn("PAGE_SIZES", result)
+        self.assertNotIn("page_query(", result)
+
+    def test_pooled_session(self):
+        """Test pages share a pooled session and send batches of mutations concurrently."""
+        result = self._generate()
+        self.assertIn("def pooled_session() -> requests.Session:", result)
+        self.assertIn("self.session = pooled_session()", result)
+        self.assertIn("concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)", result)
+        self.assertIn('self.create_resources(changes["added_rows"])', result)
+        self.assertNotIn("requests.Session()\n        self.bucket", result)
+        compile(result, "streamlit.py", "exec")
+
+        rsrc = fixtures.get_rsrc()
+        rsrc["rate_limit"] = {"limit": 5}
+        page = self._generate(as_modules=True, rsrc=rsrc)["foo"]
+        self.assertIn("def pooled_session(rate_limited: bool = False) -> requests.Session:", page)
+        self.assertIn("self.session = pooled_session(rate_limited=True)", page)
+        self.assertIn("with self.lock:", page)
+        compile(page, "foo.py", "exec")
+
+    def test_page_style(self):
+        """Test the pages are laid out as per PEP 8, with no unused create form variables."""
+        rsrc = fixtures.get_rsrc(rate_limit={"limit": 5})
+        rsrc["default_query_params"] = copy.deepcopy(PAGE_PARAMS)
+        rsrc["schema"]["items"]["properties"]["name"]["filterable"] = True
+        compression = {"encodings": ["gzip"], "request_min_size": 1024}
+        for page in [
+            self._generate(as_modules=True)["foo"],
+            self._generate(as_modules=True, rsrc=rsrc, compression=compression)["foo"],
+        ]:
+            self.assertNotIn("submit = ", page)
+            # The page is written as rendered, without a final newline
+            checker = pycodestyle.Checker(
+                lines=(page + "\n").splitlines(True), max_line_length=100, quiet=True
+            )
+            self.assertEqual(checker.check_all(), 0)
+
+    def test_compression(self):
+        """Test only decodable encodings are advertised, keeping the defaults of requests."""
+        compression = {"encodings": ["zstd", "gzip"], "request_min_size": None}
+        result = self._generate(compression=compression)
+        page = self._generate(as_modules=True, compression=compression)["foo"]
+        for code in (result, page):
+            self.assertIn(
+                "for enc in ['zstd', 'gzip'] if enc in urllib3_request.ACCEPT_ENCODING", code
+            )
+            self.assertIn(
+                'HEADERS = {"Accept-Encoding": ACCEPT_ENCODING} if ACCEPT_ENCODING else {}', code
+            )
+            compile(code, "streamlit.py", "exec")
+
+    def test_cached_page_config(self):
+        """Test column configs and pages are built once, and listed in a page registry."""
+        result = self._generate()
+        self.assertIn(
+            "    @staticmethod\n    @st.cache_resource\n    def column_config() -> dict:", result
+        )
+        self.assertIn('PAGES = {\n    "foo": FooPage,\n}', result)
+        self.assertIn("def get_page(resource_type: str) -> PageBase:", result)
+        compile(result, "streamlit.py", "exec")
+
+        result = self._generate(as_modules=True)
+        self.assertEqual(sorted(result), ["app", "foo"])
+        self.assertIn("def get_column_config() -> dict:", result["foo"])
+        self.assertIn("column_config=get_column_config(),", result["foo"])
+        self.assertIn("page = get_page()", result["foo"])
+        self.assertIn('"foo": {"title": "Foo", "module": "foo.py"},', result["app"])
+        compile(result["app"], "app.py", "exec")
+
+
+if __name__ == "__main__":
+    unittest.main()